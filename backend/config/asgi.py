@@ -0,0 +1,14 @@
+"""ASGI config for support ticket system.
+
+Served by gunicorn with uvicorn workers (``SERVER_INTERFACE=asgi``). The
+async list, stats and classify views are enabled unless ``TICKET_ASYNC_VIEWS``
+is set to ``0``.
+"""
+import os
+
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+os.environ.setdefault("TICKET_ASYNC_VIEWS", "1")
+
+application = get_asgi_application()
@@ -26,6 +26,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Outermost, so its timings cover the whole middleware stack
+    'tickets.middleware.RequestMetricsMiddleware',
+    # Before anything reads tickets; also sets the read-your-writes cookie
+    'tickets.middleware.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -57,11 +61,74 @@ TEMPLATES = [
 WSGI_APPLICATION = 'config.wsgi.application'
 
 # Database
+# DATABASE_POOL_ENABLED=1 swaps in the pooled engines (tickets.pool): each
+# worker shares up to MAX_SIZE connections per database between its threads
+# and returns them to the pool at the end of every request.
+DATABASE_POOL = {
+    'ENABLED': os.environ.get('DATABASE_POOL_ENABLED', '0') == '1',
+    'MAX_SIZE': int(os.environ.get('DATABASE_POOL_MAX_SIZE', '10')),
+    'TIMEOUT': float(os.environ.get('DATABASE_POOL_TIMEOUT', '5')),
+    'HEALTH_CHECK_INTERVAL': float(os.environ.get('DATABASE_POOL_HEALTH_CHECK_INTERVAL', '30')),
+    'MAX_IDLE': float(os.environ.get('DATABASE_POOL_MAX_IDLE', '300')),
+    'MAX_LIFETIME': float(os.environ.get('DATABASE_POOL_MAX_LIFETIME', '3600')),
+}
+POOLED_ENGINES = {
+    'django.db.backends.postgresql': 'tickets.backends.postgresql',
+    'django.db.backends.sqlite3': 'tickets.backends.sqlite3',
+}
+
+
+def database(config):
+    if DATABASE_POOL['ENABLED'] and config['ENGINE'] in POOLED_ENGINES:
+        config.update(
+            ENGINE=POOLED_ENGINES[config['ENGINE']], CONN_MAX_AGE=0, POOL=DATABASE_POOL
+        )
+    return config
+
+
 DATABASES = {
-    'default': dj_database_url.config(
+    'default': database(dj_database_url.config(
         default='postgres://postgres:postgres@db:5432/support_tickets',
         conn_max_age=600
-    )
+    ))
+}
+
+# Read replicas: comma-separated database URLs, added as replica_1, replica_2...
+# TicketViewSet reads (list, retrieve, export, stats) go to them through
+# tickets.replicas.ReplicaRouter; a client that wrote in the last
+# STICKY_SECONDS keeps reading from the primary.
+DATABASE_REPLICA_URLS = [
+    url.strip() for url in os.environ.get('DATABASE_REPLICA_URLS', '').split(',') if url.strip()
+]
+for number, url in enumerate(DATABASE_REPLICA_URLS, start=1):
+    DATABASES[f'replica_{number}'] = {
+        **database(dj_database_url.parse(url, conn_max_age=600)),
+        'TEST': {'MIRROR': 'default'},
+    }
+DATABASE_ROUTING = {
+    'REPLICAS': [f'replica_{number}' for number in range(1, len(DATABASE_REPLICA_URLS) + 1)],
+    'STICKY_SECONDS': int(os.environ.get('DATABASE_STICKY_SECONDS', '5')),
+    'COOKIE': 'tickets_primary',
+}
+DATABASE_ROUTERS = ['tickets.replicas.ReplicaRouter']
+
+# Container start (manage.py boot): MIGRATE is auto (migrate only when some
+# migration is unapplied), always or never; COLLECTSTATIC refreshes the
+# static volume.
+BOOT = {
+    'MIGRATE': os.environ.get('BOOT_MIGRATE', 'auto'),
+    'COLLECTSTATIC': os.environ.get('BOOT_COLLECTSTATIC', '1') == '1',
+}
+
+# Cache: per-process memory by default. Point CACHE_BACKEND/CACHE_LOCATION at
+# a shared backend (redis, memcached) so gunicorn workers share entries.
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get(
+            'CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.environ.get('CACHE_LOCATION', ''),
+    }
 }
 
 # Password validation
@@ -94,6 +161,11 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # REST Framework
 REST_FRAMEWORK = {
+    # orjson-backed JSON when installed (tickets.renderers)
+    'DEFAULT_RENDERER_CLASSES': [
+        'tickets.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',
     ],
@@ -105,6 +177,50 @@ REST_FRAMEWORK = {
     'PAGE_SIZE': 50,
 }
 
+# Ticket list pagination: seconds to reuse a COUNT(*) for the same query, and
+# the table size above which unfiltered Postgres counts use planner estimates.
+TICKET_COUNT_CACHE_TIMEOUT = int(os.environ.get('TICKET_COUNT_CACHE_TIMEOUT', '30'))
+TICKET_COUNT_ESTIMATE_MIN = int(os.environ.get('TICKET_COUNT_ESTIMATE_MIN', '100000'))
+
+# Bulk ingestion (POST /api/tickets/bulk/, manage.py ingest_tickets): rows per
+# validated chunk, error details kept per run, and COPY on PostgreSQL.
+TICKET_INGEST_BATCH_SIZE = int(os.environ.get('TICKET_INGEST_BATCH_SIZE', '1000'))
+TICKET_INGEST_MAX_ERRORS = int(os.environ.get('TICKET_INGEST_MAX_ERRORS', '1000'))
+TICKET_INGEST_USE_COPY = os.environ.get('TICKET_INGEST_USE_COPY', '1') == '1'
+
+# Bulk updates (PATCH /api/tickets/bulk/): max ids per request, and tickets
+# per UPDATE statement
+TICKET_BULK_UPDATE_MAX_IDS = int(os.environ.get('TICKET_BULK_UPDATE_MAX_IDS', '1000'))
+TICKET_BULK_UPDATE_CHUNK_SIZE = int(
+    os.environ.get('TICKET_BULK_UPDATE_CHUNK_SIZE', '1000')
+)
+
+# Streaming export: rows fetched per server-side cursor round trip
+TICKET_EXPORT_CHUNK_SIZE = int(os.environ.get('TICKET_EXPORT_CHUNK_SIZE', '2000'))
+
+# Archival (manage.py archive_tickets, tickets.archive): resolved and closed
+# tickets created more than AFTER_DAYS ago move to the archive table, at most
+# BATCH_SIZE per transaction
+TICKET_ARCHIVE = {
+    'AFTER_DAYS': int(os.environ.get('TICKET_ARCHIVE_AFTER_DAYS', '180')),
+    'BATCH_SIZE': int(os.environ.get('TICKET_ARCHIVE_BATCH_SIZE', '1000')),
+}
+
+# Near-duplicate detection on create and classify (tickets.duplicates):
+# MinHash agreement needed for a match, how far back and how many tickets
+# each worker indexes, and how often it reads tickets other workers created
+TICKET_DUPLICATES = {
+    'ENABLED': os.environ.get('TICKET_DUPLICATES_ENABLED', '1') == '1',
+    'THRESHOLD': float(os.environ.get('TICKET_DUPLICATES_THRESHOLD', '0.7')),
+    'WINDOW_DAYS': int(os.environ.get('TICKET_DUPLICATES_WINDOW_DAYS', '7')),
+    'CAPACITY': int(os.environ.get('TICKET_DUPLICATES_CAPACITY', '50000')),
+    'SYNC_INTERVAL': float(os.environ.get('TICKET_DUPLICATES_SYNC_INTERVAL', '1.0')),
+}
+
+# Full-text search backend for ?search= on the ticket list. Empty picks one by
+# database vendor (see tickets.search); set a dotted path to override.
+TICKET_SEARCH_BACKEND = os.environ.get('TICKET_SEARCH_BACKEND', '')
+
 # CORS
 CORS_ALLOW_ALL_ORIGINS = True # For development simplicity
 # CORS_ALLOWED_ORIGINS = [
@@ -115,6 +231,121 @@ CORS_ALLOW_ALL_ORIGINS = True # For development simplicity
 # Groq LLM API Key
 GROQ_API_KEY = os.environ.get('GROQ_API_KEY', '')
 
+# Groq client: one pooled client per worker process (see tickets.llm).
+# BASE_URL is empty for the real API; tests point it at a local stub server.
+GROQ_CLIENT = {
+    'BASE_URL': os.environ.get('GROQ_BASE_URL', ''),
+    'TIMEOUT': float(os.environ.get('GROQ_TIMEOUT', '15')),
+    'CONNECT_TIMEOUT': float(os.environ.get('GROQ_CONNECT_TIMEOUT', '3')),
+    'MAX_CONNECTIONS': int(os.environ.get('GROQ_MAX_CONNECTIONS', '10')),
+    'MAX_KEEPALIVE': int(os.environ.get('GROQ_MAX_KEEPALIVE', '5')),
+    'MAX_RETRIES': int(os.environ.get('GROQ_MAX_RETRIES', '2')),
+    'BACKOFF_BASE': 0.5,
+    'BACKOFF_MAX': 4.0,
+    'RETRY_BUDGET': float(os.environ.get('GROQ_RETRY_BUDGET', '20')),
+    'WARMUP_CONNECT': os.environ.get('GROQ_WARMUP_CONNECT', '0') == '1',
+}
+
+# Keyword pre-classifier (tickets.rules): answers locally when both the
+# category and priority confidence reach MIN_CONFIDENCE, else asks Groq
+CLASSIFY_RULES = {
+    'ENABLED': os.environ.get('CLASSIFY_RULES_ENABLED', '1') == '1',
+    'MIN_CONFIDENCE': float(os.environ.get('CLASSIFY_RULES_MIN_CONFIDENCE', '0.6')),
+}
+
+# Offline-trained classifier (manage.py train_classifier; tickets.local_model).
+# MODE: "llm" ignores it, "hybrid" uses it at MIN_CONFIDENCE or above before
+# the cache and Groq, "local" uses it for everything the rules do not answer.
+TICKET_CLASSIFIER = {
+    'MODE': os.environ.get('TICKET_CLASSIFIER_MODE', 'llm'),
+    'MODEL_PATH': os.environ.get(
+        'TICKET_CLASSIFIER_MODEL_PATH', str(BASE_DIR / 'models' / 'ticket_classifier.tknb')
+    ),
+    'MIN_CONFIDENCE': float(os.environ.get('TICKET_CLASSIFIER_MIN_CONFIDENCE', '0.9')),
+}
+
+# Batch classification: max descriptions per request and concurrent LLM calls
+# per request (keep at or below GROQ_MAX_CONNECTIONS).
+CLASSIFY_BATCH_MAX_ITEMS = int(os.environ.get('CLASSIFY_BATCH_MAX_ITEMS', '100'))
+CLASSIFY_BATCH_CONCURRENCY = int(os.environ.get('CLASSIFY_BATCH_CONCURRENCY', '8'))
+
+# Classification result cache: in-process LRU in front of CACHES[CACHE_ALIAS]
+CLASSIFICATION_CACHE = {
+    'MAX_ENTRIES': int(os.environ.get('CLASSIFICATION_CACHE_MAX_ENTRIES', '1024')),
+    'TIMEOUT': int(os.environ.get('CLASSIFICATION_CACHE_TIMEOUT', '3600')),
+    'CACHE_ALIAS': 'default',
+}
+
+# Cached list/stats responses with ETag/Last-Modified (tickets.response_cache).
+# Writes invalidate entries through a counter in CACHES[CACHE_ALIAS], so the
+# cache is off by default unless that backend is shared by all workers and
+# increments the counter atomically (redis, memcached).
+PROCESS_LOCAL_CACHE_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+# incr() is a read followed by a write: concurrent bumps can be lost
+NON_ATOMIC_INCR_CACHE_BACKENDS = (
+    'django.core.cache.backends.filebased.FileBasedCache',
+    'django.core.cache.backends.db.DatabaseCache',
+)
+atomic_shared_cache = CACHES['default']['BACKEND'] not in (
+    *PROCESS_LOCAL_CACHE_BACKENDS, *NON_ATOMIC_INCR_CACHE_BACKENDS
+)
+RESPONSE_CACHE = {
+    'ENABLED': os.environ.get(
+        'RESPONSE_CACHE_ENABLED', '1' if atomic_shared_cache else '0'
+    ) == '1',
+    'TIMEOUT': int(os.environ.get('RESPONSE_CACHE_TIMEOUT', '300')),
+    'CACHE_ALIAS': 'default',
+}
+
+# Live update feed (GET /api/tickets/events/, tickets.events)
+TICKET_EVENTS = {
+    'RETENTION': int(os.environ.get('TICKET_EVENTS_RETENTION', '86400')),
+    'PRUNE_EVERY': 1000,
+    'BATCH_SIZE': 500,
+    # ASGI streams: log poll interval per worker, keep-alive and max lifetime
+    'POLL_INTERVAL': float(os.environ.get('TICKET_EVENTS_POLL_INTERVAL', '1.0')),
+    'HEARTBEAT': 15,
+    'MAX_AGE': int(os.environ.get('TICKET_EVENTS_MAX_AGE', '300')),
+    'QUEUE_SIZE': 100,
+    # Reconnect delay hint; under WSGI this is the effective poll interval
+    'RETRY_MS': int(os.environ.get('TICKET_EVENTS_RETRY_MS', '5000')),
+}
+
+# Route list/stats/events/classify and job status to the async views
+# (tickets.async_views). On by default under config.asgi; under WSGI each
+# call would spin up an event loop.
+TICKET_ASYNC_VIEWS = os.environ.get('TICKET_ASYNC_VIEWS', '0') == '1'
+
+# Asynchronous classification jobs (POST classify/?async=1, run_classification_worker)
+CLASSIFY_JOBS = {
+    'CONCURRENCY': int(os.environ.get('CLASSIFY_WORKER_CONCURRENCY', '4')),
+    'POLL_INTERVAL': float(os.environ.get('CLASSIFY_WORKER_POLL_INTERVAL', '1.0')),
+    'QUEUE_TTL': int(os.environ.get('CLASSIFY_JOB_QUEUE_TTL', '600')),
+    'RESULT_TTL': int(os.environ.get('CLASSIFY_JOB_RESULT_TTL', '3600')),
+    'STALE_AFTER': int(os.environ.get('CLASSIFY_JOB_STALE_AFTER', '300')),
+    'MAX_ATTEMPTS': int(os.environ.get('CLASSIFY_JOB_MAX_ATTEMPTS', '3')),
+    # ?wait= on the async job view; sync workers wait at most SYNC_MAX_WAIT
+    'MAX_WAIT': float(os.environ.get('CLASSIFY_JOB_MAX_WAIT', '25')),
+    'SYNC_MAX_WAIT': float(os.environ.get('CLASSIFY_JOB_SYNC_MAX_WAIT', '1')),
+    'RETRY_AFTER': 1,
+    'WAIT_POLL_INTERVAL': 0.25,
+}
+
+# Per-view latency, query and LLM histograms served at /metrics (tickets.metrics)
+REQUEST_METRICS = {
+    'ENABLED': os.environ.get('REQUEST_METRICS_ENABLED', '1') == '1',
+    # Requests at least this slow are logged with their slowest SQL statements
+    'SLOW_REQUEST_SECONDS': float(os.environ.get('SLOW_REQUEST_SECONDS', '1.0')),
+    'SLOW_REQUEST_MAX_QUERIES': int(os.environ.get('SLOW_REQUEST_MAX_QUERIES', '20')),
+}
+
+# Windowed stats (?from=&to=&bucket=, tickets.windows): most buckets one
+# request may ask for
+TICKET_STATS_MAX_BUCKETS = int(os.environ.get('TICKET_STATS_MAX_BUCKETS', '1000'))
+
 # Logging
 LOGGING = {
     'version': 1,
@@ -128,4 +359,8 @@ LOGGING = {
         'handlers': ['console'],
         'level': 'INFO',
     },
+    'loggers': {
+        # The Groq SDK's HTTP client logs every request at INFO
+        'httpx': {'level': 'WARNING'},
+    },
 }
@@ -17,19 +17,11 @@ print('Database connection successful')
   sleep 2
 done
 
-echo "Generating migrations for tickets app..."
-python manage.py makemigrations tickets --noinput
-
-echo "Applying all migrations..."
-python manage.py migrate --noinput
-
-echo "Collecting static files..."
-python manage.py collectstatic --noinput 2>/dev/null || true
+# Migrations are committed; this applies them only when some are unapplied
+# (BOOT_MIGRATE=auto), then fills empty rollups and refreshes static files,
+# all in one Django process
+echo "Running boot tasks..."
+python manage.py boot
 
 echo "Starting server..."
-exec gunicorn config.wsgi:application \
-    --bind 0.0.0.0:8000 \
-    --workers 3 \
-    --timeout 120 \
-    --access-logfile - \
-    --error-logfile -
+exec gunicorn -c gunicorn.conf.py
@@ -0,0 +1,62 @@
+"""Gunicorn configuration (``gunicorn -c gunicorn.conf.py``).
+
+``SERVER_INTERFACE=wsgi`` (default) serves ``config.wsgi`` with sync workers;
+``asgi`` serves ``config.asgi`` with uvicorn workers, where the async views
+handle many concurrent classify calls per worker.
+
+With ``preload_app`` (``GUNICORN_PRELOAD_APP=1``, the default) the master
+imports Django, the URLconf and the Groq SDK once and forks the workers from
+it, so a new or restarted worker serves its first request without importing
+anything. Nothing that owns a socket or thread is created before the fork:
+``when_ready`` closes the master's database connections, and the Groq client,
+connection pools and local classifier are built in each worker.
+"""
+import os
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(os.environ.get("GUNICORN_WORKERS", "3"))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "120"))
+accesslog = "-"
+errorlog = "-"
+# Load the app in the master and fork workers from it (see when_ready)
+preload_app = os.environ.get("GUNICORN_PRELOAD_APP", "1") == "1"
+
+if os.environ.get("SERVER_INTERFACE", "wsgi") == "asgi":
+    wsgi_app = "config.asgi:application"
+    worker_class = "uvicorn_worker.UvicornWorker"
+else:
+    wsgi_app = "config.wsgi:application"
+
+
+def when_ready(server):
+    # Runs in the master after the app is loaded and before the first fork
+    if not server.cfg.preload_app:
+        return
+    from django.db import connections
+    from django.urls import get_resolver
+
+    from tickets import llm, pool
+
+    # Django imports the URLconf, and with it every view, on the first request
+    get_resolver().url_patterns
+    llm.import_sdk()
+    connections.close_all()
+    pool.close_all()
+
+
+def post_worker_init(worker):
+    # Build the pooled Groq client in each worker before it accepts requests,
+    # so the first classify call is not an outlier. Likewise map the local
+    # classifier once per worker when it is in use, and load the
+    # near-duplicate index.
+    from django.conf import settings
+    from django.db import connections
+
+    from tickets import duplicates, llm, local_model
+
+    llm.warm_up()
+    if settings.TICKET_CLASSIFIER["MODE"] != "llm":
+        local_model.get_model()
+    duplicates.warm()
+    # Request threads open their own connections
+    connections.close_all()
@@ -1,7 +1,15 @@
 from django.apps import AppConfig
+from django.core import checks
+from django.db.backends.signals import connection_created
 
 
 class TicketsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "tickets"
     verbose_name = "Support Tickets"
+
+    def ready(self):
+        from . import metrics, response_cache, signals  # noqa: F401
+
+        checks.register(response_cache.check_shared_cache, checks.Tags.caches)
+        connection_created.connect(metrics.install)
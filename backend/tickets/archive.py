@@ -0,0 +1,109 @@
+"""Tiered ticket storage: old resolved and closed tickets leave the hot table.
+
+``archive`` (``manage.py archive_tickets``) moves tickets that are resolved
+or closed and were created more than ``TICKET_ARCHIVE['AFTER_DAYS']`` ago
+from ``Ticket`` to ``ArchivedTicket``, keeping their ids. Each batch of up
+to ``TICKET_ARCHIVE['BATCH_SIZE']`` tickets is its own short transaction
+that copies the rows and deletes them. Rows locked by another transaction,
+such as a PATCH reopening the ticket, are skipped until the next run.
+Writers never wait for more than one batch.
+
+The list, search, export and detail endpoints read only the hot table.
+``?include_archived=1`` reads ``AnyTicket`` instead. That is a
+``UNION ALL`` view over both tables, created by migration
+``0003_search_index_and_anyticket_view``. Filters are applied to each
+table, using its own indexes.
+
+Archiving does not change a ticket. The rollups keep counting archived
+tickets and no event is logged, so the stats stay correct across both
+tiers. ``rollups.rebuild``/``check`` and windowed stats read the view.
+"""
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from . import response_cache
+from .models import ArchivedTicket, Ticket
+
+PARAM = "include_archived"
+ARCHIVED_STATUSES = (Ticket.Status.RESOLVED, Ticket.Status.CLOSED)
+COLUMNS = (
+    "id",
+    "title",
+    "description",
+    "category",
+    "priority",
+    "status",
+    "created_at",
+    "duplicate_of",
+)
+
+
+@dataclass
+class ArchiveResult:
+    archived: int = 0
+    batches: int = 0
+
+
+def requested(request) -> bool:
+    return request.query_params.get(PARAM) in ("1", "true")
+
+
+def cutoff(after_days=None):
+    """Tickets created before this are old enough to archive."""
+    if after_days is None:
+        after_days = settings.TICKET_ARCHIVE["AFTER_DAYS"]
+    return timezone.now() - timedelta(days=after_days)
+
+
+def eligible(before):
+    return Ticket.objects.filter(status__in=ARCHIVED_STATUSES, created_at__lt=before)
+
+
+def archive_batch(before, batch_size=None) -> int:
+    """Move up to ``batch_size`` eligible tickets; returns how many moved."""
+    batch_size = batch_size or settings.TICKET_ARCHIVE["BATCH_SIZE"]
+    with transaction.atomic():
+        rows = list(
+            eligible(before)
+            .order_by()
+            .select_for_update(skip_locked=True)
+            .values_list(*COLUMNS)[:batch_size]
+        )
+        if not rows:
+            return 0
+        ArchivedTicket.objects.bulk_create(
+            ArchivedTicket(**dict(zip(COLUMNS, row))) for row in rows
+        )
+        # A plain DELETE: the post_delete signal would take the tickets out
+        # of the rollups and log them as deleted
+        ids = [row[0] for row in rows]
+        table = connection.ops.quote_name(Ticket._meta.db_table)
+        placeholders = ", ".join(["%s"] * len(ids))
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {table} WHERE id IN ({placeholders})", ids)
+        response_cache.tickets_changed()
+    return len(rows)
+
+
+def archive(before=None, batch_size=None, pause=0.0, max_batches=None) -> ArchiveResult:
+    """Archive every eligible ticket, one ``archive_batch`` at a time.
+
+    ``pause`` seconds between batches give replicas and vacuum room to
+    keep up; ``max_batches`` bounds a run.
+    """
+    before = cutoff() if before is None else before
+    result = ArchiveResult()
+    while max_batches is None or result.batches < max_batches:
+        moved = archive_batch(before, batch_size)
+        if not moved:
+            break
+        result.archived += moved
+        result.batches += 1
+        if pause:
+            time.sleep(pause)
+    return result
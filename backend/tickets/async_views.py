@@ -0,0 +1,176 @@
+"""Async implementations of the I/O-bound ticket endpoints.
+
+Routed ahead of the DRF router when ``TICKET_ASYNC_VIEWS`` is on (the
+default under ``config.asgi``), so a slow Groq call or query waits on the
+event loop instead of holding a worker:
+
+- ``GET /api/tickets/``: same filters, search, pagination and JSON as
+  ``TicketViewSet.list``; rows are read with the async ORM.
+- ``GET /api/tickets/stats/``: ``rollups.asummary``, or ``windows.summary``
+  in a thread for ``?from=&to=&bucket=``.
+- ``GET /api/tickets/events/``: a long-lived Server-Sent Events stream fed
+  by the worker's ``events.Broadcaster``.
+- ``POST /api/tickets/classify/``: ``services.aclassify_ticket`` through the
+  loop's pooled ``AsyncGroq`` client.
+- ``GET /api/tickets/classify/jobs/<id>/``: ``?wait=`` long-polls with
+  ``jobs.await_job``, sleeping on the loop between polls.
+
+Other methods on these URLs (ticket creation, OPTIONS, ``classify/?async=1``)
+are handed to the DRF viewset in a thread.
+"""
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.urls import path, re_path
+from rest_framework import status
+from rest_framework.exceptions import APIException, NotFound
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from . import events, jobs, metrics, response_cache, rollups, rows, services, windows
+from .renderers import FastJSONRenderer
+from .serializers import ClassificationJobSerializer, ClassifyRequestSerializer
+from .views import UNKNOWN_JOB, TicketViewSet, requested_wait
+
+
+def json_response(data, status=status.HTTP_200_OK):
+    """Render with the API's JSON renderer, so both stacks return identical bodies."""
+    return HttpResponse(
+        FastJSONRenderer().render(data), status=status, content_type="application/json"
+    )
+
+
+async def cached_json_response(request, name, build):
+    """Async counterpart of ``TicketViewSet.cached_response``."""
+    if not response_cache.enabled(request):
+        return json_response(await build())
+    found = await response_cache.alookup(request, name, "application/json")
+    if found.not_modified:
+        response = HttpResponseNotModified()
+    else:
+        if found.data is None:
+            await response_cache.astore(found, await build())
+        response = json_response(found.data)
+    for header, value in found.headers.items():
+        response[header] = value
+    return response
+
+
+def async_endpoint(methods, fallback):
+    """Serve ``methods`` with the decorated coroutine, anything else with ``fallback``.
+
+    The coroutine receives a DRF ``Request``; ``APIException``\\ s are turned
+    into the same error payloads DRF's exception handler produces.
+    """
+
+    def decorator(view):
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            if request.method not in methods:
+                return await sync_to_async(fallback)(request, *args, **kwargs)
+            request = Request(
+                request, parsers=[p() for p in api_settings.DEFAULT_PARSER_CLASSES]
+            )
+            try:
+                return await view(request, *args, **kwargs)
+            except APIException as exc:
+                detail = exc.detail
+                if not isinstance(detail, (list, dict)):
+                    detail = {"detail": detail}
+                return json_response(detail, status=exc.status_code)
+
+        # Metrics label the async methods with the viewset's action names
+        wrapper.actions = fallback.actions
+        # django.views.decorators.csrf.csrf_exempt only wraps sync views on 4.2;
+        # DRF views are exempt too (they rely on SessionAuthentication instead).
+        wrapper.csrf_exempt = True
+        return wrapper
+
+    return decorator
+
+
+def _viewset(request, action):
+    view = TicketViewSet(request=request, action=action, args=(), kwargs={})
+    view.format_kwarg = None
+    return view
+
+
+@async_endpoint(
+    methods=("GET",),
+    fallback=TicketViewSet.as_view({"get": "list", "post": "create"}),
+)
+async def ticket_list(request):
+    async def build():
+        view = _viewset(request, "list")
+        fields = rows.requested_fields(request)
+        queryset = rows.values(view.filter_queryset(view.get_queryset()), fields)
+        page = await view.paginator.apaginate_queryset(queryset, request, view)
+        with metrics.phase("serialize"):
+            data = rows.encode(page, fields)
+        return view.paginator.get_paginated_response(data).data
+
+    return await cached_json_response(request, "list", build)
+
+
+@async_endpoint(methods=("GET",), fallback=TicketViewSet.as_view({"get": "stats"}))
+async def ticket_stats(request):
+    if windows.requested(request):
+        window = windows.requested_window(request)
+        build = sync_to_async(lambda: windows.summary(window))
+        if window.relative:
+            return json_response(await build())
+        return await cached_json_response(request, "stats", build)
+    return await cached_json_response(request, "stats", rollups.asummary)
+
+
+@async_endpoint(
+    methods=("GET",), fallback=TicketViewSet.as_view({"get": "event_stream"})
+)
+async def ticket_events(request):
+    response = StreamingHttpResponse(
+        events.stream(request), content_type="text/event-stream"
+    )
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+@async_endpoint(methods=("POST",), fallback=TicketViewSet.as_view({"post": "classify"}))
+async def ticket_classify(request):
+    if request.query_params.get("async") in ("1", "true"):
+        # Job queueing is a couple of quick writes; reuse the sync action
+        return await sync_to_async(TicketViewSet.as_view({"post": "classify"}))(
+            request._request
+        )
+    serializer = ClassifyRequestSerializer(data=request.data)
+    if not serializer.is_valid():
+        return json_response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    result = await services.aclassify_ticket(serializer.validated_data["description"])
+    return json_response(result)
+
+
+@async_endpoint(
+    methods=("GET",), fallback=TicketViewSet.as_view({"get": "classify_job"})
+)
+async def ticket_classify_job(request, job_id):
+    try:
+        job = await jobs.await_job(job_id, requested_wait(request))
+    except DjangoValidationError:
+        job = None
+    if job is None:
+        raise NotFound(UNKNOWN_JOB)
+    response = json_response(ClassificationJobSerializer(job).data)
+    for header, value in jobs.poll_headers(job).items():
+        response[header] = value
+    return response
+
+
+urlpatterns = [
+    path("tickets/", ticket_list),
+    path("tickets/stats/", ticket_stats),
+    path("tickets/events/", ticket_events),
+    path("tickets/classify/", ticket_classify),
+    re_path(r"^tickets/classify/jobs/(?P<job_id>[0-9a-f-]+)/$", ticket_classify_job),
+]
@@ -0,0 +1,255 @@
+"""Seeded synthetic tickets and request scenarios for the benchmark commands.
+
+``TicketGenerator`` produces the same tickets for the same seed. The skew
+approximates a real support queue:
+
+- categories and priorities follow ``CATEGORY_WEIGHTS``/``PRIORITY_WEIGHTS``
+  (technical and low/medium dominate, critical is rare),
+- ``created_at`` decays exponentially into the past, so recent days are
+  dense and the tail is long,
+- older tickets are mostly resolved or closed, recent ones mostly open,
+- text mixes a category phrase with pseudo-words drawn with Zipf-like
+  weights, so searches hit both very common and rare terms.
+
+``seed_tickets`` bulk-inserts them and rebuilds the stats rollups.
+``SCENARIOS`` are the request mixes ``bench_api`` replays in-process.
+"""
+import math
+import random
+import string
+from contextlib import contextmanager
+from datetime import timedelta
+from itertools import accumulate
+
+from django.db import connection
+from django.utils import timezone
+from rest_framework.settings import api_settings
+
+from . import rollups
+from .models import Ticket
+
+VOCABULARY_SIZE = 5000
+
+CATEGORY_WEIGHTS = {"technical": 40, "billing": 25, "account": 20, "general": 15}
+PRIORITY_WEIGHTS = {"low": 35, "medium": 35, "high": 20, "critical": 10}
+
+PHRASES = {
+    "billing": ["charged twice", "refund for my invoice", "card was declined"],
+    "technical": ["export fails with an error", "app crashes on sync", "slow dashboard"],
+    "account": ["cannot log in", "password reset email", "locked out of my account"],
+    "general": ["question about plans", "feature request", "where do I find settings"],
+}
+
+
+def build_vocabulary(rng, size=VOCABULARY_SIZE):
+    """Pseudo-words with Zipf-like weights, so queries hit both very common
+    and rare terms the way real ticket text does."""
+    words = sorted(
+        {
+            "".join(rng.choice(string.ascii_lowercase) for _ in range(7))
+            for _ in range(size)
+        }
+    )
+    rng.shuffle(words)
+    cum_weights = list(accumulate(1 / rank for rank in range(1, len(words) + 1)))
+    return words, cum_weights
+
+
+class TicketGenerator:
+    """Deterministic tickets for ``seed``, ``days`` back from ``now``."""
+
+    def __init__(self, seed=42, days=365, now=None):
+        self.rng = random.Random(seed)
+        self.words, self.cum_weights = build_vocabulary(self.rng)
+        self.days = days
+        self.now = now or timezone.now()
+
+    def text(self, length):
+        return " ".join(self.rng.choices(self.words, cum_weights=self.cum_weights, k=length))
+
+    def choice(self, weights):
+        return self.rng.choices(list(weights), weights=list(weights.values()))[0]
+
+    def description(self, category, length=40):
+        return f"{self.rng.choice(PHRASES[category])} {self.text(length)}"
+
+    def status(self, age_days):
+        # About half of the tickets are done after a week, nearly all after a month
+        if self.rng.random() < 1 - math.exp(-age_days / 7):
+            return self.choice({"resolved": 40, "closed": 60})
+        return self.choice({"open": 70, "in_progress": 30})
+
+    def ticket(self):
+        category = self.choice(CATEGORY_WEIGHTS)
+        age_days = min(self.rng.expovariate(4 / self.days), self.days)
+        return Ticket(
+            title=self.text(4),
+            description=self.description(category),
+            category=category,
+            priority=self.choice(PRIORITY_WEIGHTS),
+            status=self.status(age_days),
+            created_at=self.now - timedelta(days=age_days),
+        )
+
+    def tickets(self, count):
+        for _ in range(count):
+            yield self.ticket()
+
+
+@contextmanager
+def explicit_created_at():
+    """Let ``bulk_create`` keep ``created_at`` instead of stamping now."""
+    field = Ticket._meta.get_field("created_at")
+    field.auto_now_add = False
+    try:
+        yield
+    finally:
+        field.auto_now_add = True
+
+
+def seed_tickets(generator, count, batch_size=5000):
+    """Insert ``count`` generated tickets and rebuild the rollups.
+
+    Writes bypass the signals and log no ticket events; callers normally
+    roll the whole run back.
+    """
+    with explicit_created_at():
+        while count > 0:
+            batch = min(batch_size, count)
+            Ticket.objects.bulk_create(generator.tickets(batch), batch_size=batch)
+            count -= batch
+    rollups.rebuild()
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE tickets_ticket")
+
+
+class Scenario:
+    """One request shape; ``request()`` returns ``(method, path, data)``."""
+
+    name = ""
+
+    def __init__(self, generator, total):
+        self.generator = generator
+        self.rng = generator.rng
+        self.total = total
+
+    def request(self):
+        raise NotImplementedError
+
+    def done(self, response):
+        """Called with each response, for scenarios that follow links."""
+
+
+class FilteredList(Scenario):
+    name = "list_filtered"
+
+    def request(self):
+        params = {
+            "status": self.generator.choice({"open": 3, "in_progress": 1}),
+            "category": self.generator.choice(CATEGORY_WEIGHTS),
+        }
+        if self.rng.random() < 0.5:
+            params["priority"] = self.generator.choice(PRIORITY_WEIGHTS)
+        query = "&".join(f"{k}={v}" for k, v in params.items())
+        return "GET", f"/api/tickets/?{query}", None
+
+
+class DeepPage(Scenario):
+    name = "list_deep_page"
+
+    def request(self):
+        pages = max(1, self.total // api_settings.PAGE_SIZE)
+        page = self.rng.randint(max(1, pages // 2), pages)
+        return "GET", f"/api/tickets/?page={page}", None
+
+
+class CursorWalk(Scenario):
+    name = "list_cursor_walk"
+
+    def __init__(self, generator, total):
+        super().__init__(generator, total)
+        self.next = None
+
+    def request(self):
+        return "GET", self.next or "/api/tickets/?pagination=cursor", None
+
+    def done(self, response):
+        self.next = response.json().get("next")
+
+
+class Search(Scenario):
+    name = "search"
+
+    def request(self):
+        words = self.generator.words
+        term = self.rng.choice(
+            [words[0], words[50], words[2000], words[100][:4], f"{words[3]} {words[40]}"]
+        )
+        return "GET", f"/api/tickets/?search={term.replace(' ', '+')}", None
+
+
+class Stats(Scenario):
+    name = "stats"
+
+    def request(self):
+        return "GET", "/api/tickets/stats/", None
+
+
+class Create(Scenario):
+    name = "create"
+
+    def request(self):
+        category = self.generator.choice(CATEGORY_WEIGHTS)
+        return (
+            "POST",
+            "/api/tickets/",
+            {
+                "title": self.generator.text(4),
+                "description": self.generator.description(category),
+                "category": category,
+                "priority": self.generator.choice(PRIORITY_WEIGHTS),
+            },
+        )
+
+
+class Patch(Scenario):
+    name = "patch"
+
+    def __init__(self, generator, total):
+        super().__init__(generator, total)
+        self.ids = list(Ticket.objects.values_list("id", flat=True)[:10000])
+
+    def request(self):
+        status = self.generator.choice({"in_progress": 2, "resolved": 1, "closed": 1})
+        return "PATCH", f"/api/tickets/{self.rng.choice(self.ids)}/", {"status": status}
+
+
+class Classify(Scenario):
+    name = "classify"
+
+    def __init__(self, generator, total):
+        super().__init__(generator, total)
+        self.sent = 0
+
+    def request(self):
+        # A new description each time, so the result cache never answers
+        self.sent += 1
+        category = self.generator.choice(CATEGORY_WEIGHTS)
+        description = f"{self.generator.description(category, 12)} #{self.sent}"
+        return "POST", "/api/tickets/classify/", {"description": description}
+
+
+SCENARIOS = {
+    scenario.name: scenario
+    for scenario in (
+        FilteredList,
+        DeepPage,
+        CursorWalk,
+        Search,
+        Stats,
+        Create,
+        Patch,
+        Classify,
+    )
+}
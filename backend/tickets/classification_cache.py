@@ -0,0 +1,191 @@
+"""Two-tier cache for LLM classification results.
+
+Tier 1 is a per-process LRU with TTL, so repeated descriptions from the
+debounced auto-classify are answered without leaving the worker. Tier 2 is
+Django's cache framework, shared by all gunicorn workers when ``CACHES`` points
+at a shared backend (file, memcached, redis, database).
+
+Keys are a SHA-256 over the normalized description plus the prompt and model
+versions, so changing either invalidates old entries automatically.
+"""
+import hashlib
+import logging
+import re
+import threading
+import time
+from collections import Counter, OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize(description: str) -> str:
+    """Case- and whitespace-insensitive form of a description."""
+    return _WHITESPACE_RE.sub(" ", description).strip().lower()
+
+
+def make_key(description: str, prompt_version: str, model: str) -> str:
+    digest = hashlib.sha256(
+        "\0".join((prompt_version, model, normalize(description))).encode()
+    ).hexdigest()
+    return f"tickets:classify:{digest}"
+
+
+class LRUCache:
+    """Thread-safe, size-bounded LRU mapping whose entries expire after ``ttl``."""
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class ClassificationCache:
+    def __init__(self, max_entries: int, ttl: int, alias: str = "default"):
+        self.local = LRUCache(max_entries, ttl)
+        self.ttl = ttl
+        self.alias = alias
+        self.counters = Counter()
+        # Classification runs on many threads (batch fan-out, job workers)
+        self._lock = threading.Lock()
+
+    @property
+    def shared(self):
+        return caches[self.alias]
+
+    def get(self, key):
+        value = self._get_local(key)
+        if value is not None:
+            return value
+        try:
+            value = self.shared.get(key)
+        except Exception:
+            # An unreachable shared cache must not fail classification
+            logger.exception("Shared classification cache lookup failed.")
+            self._count("shared_errors")
+            value = None
+        return self._record_shared(key, value)
+
+    async def aget(self, key):
+        """``get`` for async views; the shared tier is queried with ``aget``."""
+        value = self._get_local(key)
+        if value is not None:
+            return value
+        try:
+            value = await self.shared.aget(key)
+        except Exception:
+            logger.exception("Shared classification cache lookup failed.")
+            self._count("shared_errors")
+            value = None
+        return self._record_shared(key, value)
+
+    def _get_local(self, key):
+        value = self.local.get(key)
+        if value is not None:
+            self._count("local_hits")
+        return value
+
+    def _record_shared(self, key, value):
+        if value is not None:
+            self._count("shared_hits")
+            self.local.set(key, value)
+            return value
+        self._count("misses")
+        return None
+
+    def set(self, key, value):
+        self._count("stores")
+        self.local.set(key, value)
+        try:
+            self.shared.set(key, value, self.ttl)
+        except Exception:
+            logger.exception("Shared classification cache store failed.")
+            self._count("shared_errors")
+
+    async def aset(self, key, value):
+        self._count("stores")
+        self.local.set(key, value)
+        try:
+            await self.shared.aset(key, value, self.ttl)
+        except Exception:
+            logger.exception("Shared classification cache store failed.")
+            self._count("shared_errors")
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def clear(self):
+        """Drop the in-process tier and reset counters (shared tier untouched)."""
+        self.local.clear()
+        with self._lock:
+            self.counters.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = Counter(self.counters)
+        hits = counters["local_hits"] + counters["shared_hits"]
+        lookups = hits + counters["misses"]
+        return {
+            "local_hits": counters["local_hits"],
+            "shared_hits": counters["shared_hits"],
+            "misses": counters["misses"],
+            "stores": counters["stores"],
+            "shared_errors": counters["shared_errors"],
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+            "local_entries": len(self.local),
+            "max_entries": self.local.max_entries,
+            "ttl": self.ttl,
+        }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> ClassificationCache:
+    """Return the process-wide cache configured by ``CLASSIFICATION_CACHE``."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                config = settings.CLASSIFICATION_CACHE
+                _cache = ClassificationCache(
+                    max_entries=config["MAX_ENTRIES"],
+                    ttl=config["TIMEOUT"],
+                    alias=config["CACHE_ALIAS"],
+                )
+    return _cache
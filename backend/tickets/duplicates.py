@@ -0,0 +1,430 @@
+"""Near-duplicate detection for new tickets with MinHash and LSH.
+
+During an incident many customers report the same problem in almost the
+same words. ``check`` compares a new description with every recent ticket
+in well under a millisecond:
+
+- ``signature`` splits the description into word bigrams and hashes each
+  one once to 64 bits. The low bits pick one of ``NUM_PERM`` bins, and each
+  bin keeps the smallest hash it receives (one-permutation MinHash). An
+  empty bin borrows from the next filled bin. Two signatures agree at a
+  position with probability close to the Jaccard similarity of the two
+  bigram sets. Signing costs one hash per bigram instead of ``NUM_PERM``,
+  which keeps it in the tens of microseconds in pure Python.
+- ``SignatureIndex`` holds the signatures of the last
+  ``TICKET_DUPLICATES['CAPACITY']`` tickets in flat arrays used as a ring
+  buffer. It buckets them by ``BANDS`` bands of ``ROWS`` values each (LSH),
+  so only tickets that share a whole band are compared. A match needs at
+  least ``THRESHOLD`` of the signature positions to agree.
+
+``TicketViewSet.create`` stores the signature on the ticket. On a match it
+sets ``duplicate_of`` to the first ticket of the group. ``services``
+answers classification with the matched ticket's category and priority
+(tier ``duplicate``) instead of calling Groq. Edits and bulk updates
+(``ticket_saved``, ``tickets_updated``) relabel the indexed ticket when
+they commit, so a match answers with its current category and priority.
+
+Each worker builds its index when it starts (``warm``, from gunicorn's
+``post_worker_init``) from the stored signatures of tickets created in the
+last ``WINDOW_DAYS``. After that one thread at a time reads tickets newer
+than the last one seen, at most every ``SYNC_INTERVAL`` seconds, so it also
+finds tickets created by other workers; lower ids that commit late are
+picked up too. Tickets without a stored signature, such as bulk-ingested
+or older rows, are signed while loading. ``manage.py
+rebuild_duplicate_index`` stores their signatures, so workers start
+quickly.
+"""
+import hashlib
+import operator
+import re
+import threading
+import time
+from array import array
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Ticket
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+# Descriptions shorter than this say too little to call anything a duplicate
+MIN_TOKENS = 4
+# Bottom-k of the bigram hashes, which keeps similar texts' samples similar
+MAX_SHINGLES = 200
+# Candidates compared per band, newest first
+MAX_CHAIN = 64
+
+_TOKEN_RE = re.compile(r"[a-z0-9']+")
+_MASK = 0xFFFFFFFF
+_EMPTY = 1 << 64
+# Offsets borrowed values by their distance, so they never look like a
+# bin's own minimum to the other signature
+_BORROW_STEP = 0x9E3779B1
+CATEGORIES = tuple(Ticket.Category.values)
+PRIORITIES = tuple(Ticket.Priority.values)
+
+
+def _hash(gram: str) -> int:
+    return int.from_bytes(hashlib.blake2b(gram.encode(), digest_size=8).digest(), "little")
+
+
+def shingles(text: str) -> list:
+    """64-bit hashes of the word bigrams in ``text`` (empty when too short)."""
+    tokens = _TOKEN_RE.findall(text.lower())
+    if len(tokens) < MIN_TOKENS:
+        return []
+    hashes = {_hash(f"{a} {b}") for a, b in zip(tokens, tokens[1:])}
+    return sorted(hashes)[:MAX_SHINGLES]
+
+
+def signature(text: str):
+    """The MinHash signature of ``text`` as ``array("I")``, or None."""
+    hashes = shingles(text)
+    if not hashes:
+        return None
+    bins = [_EMPTY] * NUM_PERM
+    for h in hashes:
+        slot, value = h % NUM_PERM, h // NUM_PERM
+        if value < bins[slot]:
+            bins[slot] = value
+    sig = array("I", bytes(4 * NUM_PERM))
+    for slot in range(NUM_PERM):
+        distance = 0
+        while bins[(slot + distance) % NUM_PERM] == _EMPTY:
+            distance += 1
+        sig[slot] = (bins[(slot + distance) % NUM_PERM] + distance * _BORROW_STEP) & _MASK
+    return sig
+
+
+def from_bytes(raw):
+    """A stored signature, or None if missing or from another ``NUM_PERM``."""
+    if raw is None or len(raw) != NUM_PERM * 4:
+        return None
+    return array("I", bytes(raw))
+
+
+def band_keys(sig) -> list:
+    return [hash((band, *sig[band * ROWS : (band + 1) * ROWS])) for band in range(BANDS)]
+
+
+@dataclass(frozen=True)
+class Match:
+    ticket_id: int
+    duplicate_of: int
+    similarity: float
+    category: str
+    priority: str
+
+
+class SignatureIndex:
+    """LSH buckets over a fixed-size ring of signatures.
+
+    Each slot owns one node per band. A bucket is a chain from ``heads``
+    through ``next``, newest first. Slots are reused oldest first, so a
+    chain is cut where a node's key or insertion order no longer fits. Any
+    entries past that point are older still and already gone.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.signatures = array("I", bytes(4 * capacity * NUM_PERM))
+        self.ids = array("q", bytes(8 * capacity))
+        self.roots = array("q", bytes(8 * capacity))
+        self.seq = array("q", bytes(8 * capacity))
+        self.categories = array("B", bytes(capacity))
+        self.priorities = array("B", bytes(capacity))
+        self.node_keys = array("q", bytes(8 * capacity * BANDS))
+        self.next = array("i", [-1]) * (capacity * BANDS)
+        self.heads = {}
+        self.positions = {}
+        self.inserted = 0
+
+    def __len__(self):
+        return len(self.positions)
+
+    def add(self, ticket_id, sig, category, priority, duplicate_of=None):
+        if ticket_id in self.positions:
+            return
+        slot = self.inserted % self.capacity
+        self.inserted += 1
+        if self.ids[slot]:
+            self._evict(slot)
+        self.ids[slot] = ticket_id
+        self.roots[slot] = duplicate_of or ticket_id
+        self.seq[slot] = self.inserted
+        self.categories[slot] = CATEGORIES.index(category)
+        self.priorities[slot] = PRIORITIES.index(priority)
+        self.signatures[slot * NUM_PERM : (slot + 1) * NUM_PERM] = sig
+        for band, key in enumerate(band_keys(sig)):
+            node = slot * BANDS + band
+            self.node_keys[node] = key
+            self.next[node] = self.heads.get(key, -1)
+            self.heads[key] = slot
+        self.positions[ticket_id] = slot
+
+    def _evict(self, slot):
+        del self.positions[self.ids[slot]]
+        # The oldest entry is last in its chains; a bucket it heads holds only it
+        for band in range(BANDS):
+            key = self.node_keys[slot * BANDS + band]
+            if self.heads.get(key) == slot:
+                del self.heads[key]
+
+    def relabel(self, ticket_id, category=None, priority=None):
+        """Set an indexed ticket's labels; None leaves one as it is."""
+        slot = self.positions.get(ticket_id)
+        if slot is None:
+            return
+        if category is not None:
+            self.categories[slot] = CATEGORIES.index(category)
+        if priority is not None:
+            self.priorities[slot] = PRIORITIES.index(priority)
+
+    def query(self, sig, threshold):
+        """The most similar indexed ticket at or above ``threshold``, or None."""
+        best_slot, best_agree = -1, 0
+        seen = set()
+        signatures = self.signatures
+        for band, key in enumerate(band_keys(sig)):
+            slot = self.heads.get(key, -1)
+            newer = self.inserted + 1
+            for _ in range(MAX_CHAIN):
+                if slot < 0:
+                    break
+                node = slot * BANDS + band
+                if self.node_keys[node] != key or self.seq[slot] >= newer:
+                    break
+                newer = self.seq[slot]
+                if slot not in seen:
+                    seen.add(slot)
+                    base = slot * NUM_PERM
+                    agree = sum(map(operator.eq, sig, signatures[base : base + NUM_PERM]))
+                    if agree > best_agree:
+                        best_slot, best_agree = slot, agree
+                slot = self.next[node]
+        similarity = best_agree / NUM_PERM
+        if best_slot < 0 or similarity < threshold:
+            return None
+        return Match(
+            ticket_id=self.ids[best_slot],
+            duplicate_of=self.roots[best_slot],
+            similarity=round(similarity, 4),
+            category=CATEGORIES[self.categories[best_slot]],
+            priority=PRIORITIES[self.priorities[best_slot]],
+        )
+
+
+def _config(name):
+    return settings.TICKET_DUPLICATES[name]
+
+
+def enabled() -> bool:
+    return _config("ENABLED")
+
+
+# Ids below the highest one seen that may still commit: a sequence hands
+# them out at INSERT, so a slower transaction can commit a lower id later.
+# Each sync asks for them again until they appear or GAP_TIMEOUT passes
+# (rolled back, deleted or archived); at most MAX_GAPS are tracked.
+GAP_TIMEOUT = 60.0
+MAX_GAPS = 500
+
+_index = None
+_max_id = 0
+_gaps = {}  # ticket id -> monotonic time it was first missed
+_synced_at = 0.0
+_lock = threading.Lock()  # the index contents
+_sync_lock = threading.Lock()  # held by the one thread reading the database
+
+
+def fetch(after_id=0, ids=(), limit=None) -> list:
+    """Tickets from the last ``WINDOW_DAYS`` with ids above ``after_id`` or in
+    ``ids``, oldest first, as ``(id, signature, category, priority,
+    duplicate_of)``. Unsigned tickets are signed; the signature is None when
+    the description is too short."""
+    since = timezone.now() - timedelta(days=_config("WINDOW_DAYS"))
+    selected = Q(id__gt=after_id)
+    if ids:
+        selected |= Q(id__in=ids)
+    rows = list(
+        Ticket.objects.filter(selected, created_at__gte=since)
+        .order_by("-id")
+        .values_list("id", "signature", "category", "priority", "duplicate_of")[
+            : limit or _config("CAPACITY")
+        ]
+    )
+    unsigned = [row[0] for row in rows if from_bytes(row[1]) is None]
+    descriptions = dict(
+        Ticket.objects.filter(pk__in=unsigned).values_list("id", "description")
+    )
+    entries = []
+    for ticket_id, raw, category, priority, duplicate_of in reversed(rows):
+        sig = from_bytes(raw)
+        if sig is None:
+            sig = signature(descriptions.get(ticket_id, ""))
+        entries.append((ticket_id, sig, category, priority, duplicate_of))
+    return entries
+
+
+def _add_all(index, entries):
+    for ticket_id, sig, category, priority, duplicate_of in entries:
+        if sig is not None:
+            index.add(ticket_id, sig, category, priority, duplicate_of)
+
+
+def load(index, after_id=0, limit=None) -> int:
+    """Add tickets from the last ``WINDOW_DAYS`` with ids above ``after_id``,
+    oldest first. Returns the highest id seen."""
+    entries = fetch(after_id, limit=limit or index.capacity)
+    _add_all(index, entries)
+    return max([after_id] + [entry[0] for entry in entries])
+
+
+def _current():
+    """This worker's index, loaded or caught up as needed.
+
+    Only one thread reads the database at a time. Other threads keep
+    querying the index meanwhile, except before the first load, which
+    ``warm`` runs when the worker starts.
+    """
+    if _index is None:
+        with _sync_lock:
+            if _index is None:
+                _sync()
+    elif time.monotonic() - _synced_at >= _config("SYNC_INTERVAL"):
+        if _sync_lock.acquire(blocking=False):
+            try:
+                _sync()
+            finally:
+                _sync_lock.release()
+    return _index
+
+
+def _sync():
+    """Read tickets this worker has not indexed (hold ``_sync_lock``)."""
+    global _index, _max_id, _synced_at
+    now = time.monotonic()
+    # Queries and signing run without _lock; only adding to a live index
+    # takes it
+    if _index is None:
+        index = SignatureIndex(_config("CAPACITY"))
+        entries = fetch()
+        _add_all(index, entries)
+    else:
+        index = _index
+        entries = fetch(_max_id, ids=list(_gaps))
+        with _lock:
+            _add_all(index, entries)
+
+    seen = {entry[0] for entry in entries}
+    highest = max([_max_id, *seen])
+    for ticket_id in seen:
+        _gaps.pop(ticket_id, None)
+    for ticket_id in range(max(_max_id, highest - MAX_GAPS) + 1, highest):
+        if ticket_id not in seen:
+            _gaps.setdefault(ticket_id, now)
+    for ticket_id, missed_at in list(_gaps.items()):
+        if now - missed_at >= GAP_TIMEOUT:
+            del _gaps[ticket_id]
+    for ticket_id in sorted(_gaps)[: max(0, len(_gaps) - MAX_GAPS)]:
+        del _gaps[ticket_id]
+    _max_id, _synced_at = highest, now
+    with _lock:
+        _index = index
+
+
+def warm() -> None:
+    """Load this worker's index now (``post_worker_init``), not in the first
+    create or classify request."""
+    if enabled():
+        _current()
+
+
+@dataclass(frozen=True)
+class Check:
+    signature: array = None
+    match: Match = None
+
+    def fields(self) -> dict:
+        """Ticket field values recording this check."""
+        return {
+            "signature": self.signature.tobytes() if self.signature is not None else None,
+            "duplicate_of_id": self.match.duplicate_of if self.match else None,
+        }
+
+
+def check(description: str) -> Check:
+    """Sign ``description`` and look for a recent near-duplicate."""
+    if not enabled():
+        return Check()
+    sig = signature(description)
+    if sig is None:
+        return Check()
+    index = _current()
+    with _lock:
+        match = index.query(sig, _config("THRESHOLD"))
+    return Check(sig, match)
+
+
+def classify(description: str):
+    """A recent near-duplicate's category and priority, or None."""
+    match = check(description).match
+    if match is None:
+        return None
+    return {
+        "suggested_category": match.category,
+        "suggested_priority": match.priority,
+        "duplicate_of": match.duplicate_of,
+    }
+
+
+def ticket_saved(ticket, created) -> None:
+    """Keep this worker's index in step with a ticket write."""
+    if not enabled():
+        return
+    if created:
+        sig = from_bytes(ticket.signature)
+        if sig is not None:
+            transaction.on_commit(lambda: _remember(ticket, sig))
+    else:
+        category, priority = ticket.category, ticket.priority
+        transaction.on_commit(lambda: _relabel([ticket.pk], category, priority))
+
+
+def tickets_updated(ids, changes) -> None:
+    """Relabel this worker's entries for a bulk update once it commits;
+    ``QuerySet.update`` sends no ``post_save``."""
+    if not enabled() or not {"category", "priority"} & changes.keys():
+        return
+    category, priority = changes.get("category"), changes.get("priority")
+    transaction.on_commit(lambda: _relabel(ids, category, priority))
+
+
+def _relabel(ids, category, priority):
+    # After commit, so a rolled-back write never changes the answers
+    with _lock:
+        if _index is not None:
+            for ticket_id in ids:
+                _index.relabel(ticket_id, category, priority)
+
+
+def _remember(ticket, sig):
+    # Found by this worker's next check at once, without waiting for a sync
+    with _lock:
+        if _index is not None:
+            _index.add(
+                ticket.pk, sig, ticket.category, ticket.priority, ticket.duplicate_of_id
+            )
+
+
+def reset() -> None:
+    global _index, _max_id, _synced_at
+    with _sync_lock, _lock:
+        _index, _max_id, _synced_at = None, 0, 0.0
+        _gaps.clear()
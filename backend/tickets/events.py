@@ -0,0 +1,306 @@
+"""Ticket change notifications and the live update feed.
+
+Every ticket write is reported here (signal handlers, bulk ingestion and
+updates), which
+
+- invalidates cached list/stats responses (``tickets.response_cache``), and
+- appends a ``TicketEvent`` once the write commits, carrying the serialized
+  ticket and the change to the stats counters (``rollups.summary_delta``).
+  Inserts are serialized, so event ids become visible in increasing order
+  and a reader resuming after id N cannot skip a lower id committed later.
+
+Clients follow the log with Server-Sent Events on ``GET /api/tickets/events/``
+and resume from the last event id they saw (``Last-Event-ID``, or ``?after=``).
+A client that falls behind the retained log gets a ``reset`` event and
+should refetch.
+
+- ASGI (``async_views``): streams stay open. One ``Broadcaster`` per worker
+  polls the log and fans new events out to every stream, so the number of
+  queries does not grow with the number of idle connections.
+- WSGI: the response carries the pending events and a ``retry`` hint, then
+  closes; ``EventSource`` reconnects, which makes it a cheap indexed poll
+  instead of a sync worker pinned per console.
+"""
+import asyncio
+import json
+import logging
+import time
+import weakref
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import DatabaseError, connections, router, transaction
+from django.db.models import Max, Min
+from django.utils import timezone
+from rest_framework.renderers import BaseRenderer
+
+from . import response_cache, rollups
+from .models import TicketEvent
+from .serializers import TicketSerializer
+
+logger = logging.getLogger(__name__)
+
+
+# pg_advisory_xact_lock key serializing event inserts, so ids commit in order
+INSERT_LOCK_ID = 0x74657674
+
+
+def _config(name):
+    return settings.TICKET_EVENTS[name]
+
+
+# ─── Write side ───
+
+
+def ticket_created(ticket, deltas) -> None:
+    _record(TicketEvent.Kind.CREATED, ticket, deltas)
+
+
+def ticket_updated(ticket, deltas) -> None:
+    _record(TicketEvent.Kind.UPDATED, ticket, deltas)
+
+
+def ticket_deleted(ticket, deltas) -> None:
+    _record(TicketEvent.Kind.DELETED, ticket, deltas)
+
+
+def tickets_bulk_created(deltas) -> None:
+    """One event per bulk write; clients refetch instead of patching rows."""
+    _record(TicketEvent.Kind.BULK_CREATED, None, deltas)
+
+
+def tickets_bulk_updated(deltas) -> None:
+    _record(TicketEvent.Kind.BULK_UPDATED, None, deltas)
+
+
+def _record(kind, ticket, deltas):
+    response_cache.tickets_changed()
+    event = TicketEvent(
+        kind=kind,
+        ticket_id=ticket.pk if ticket is not None else None,
+        ticket=(
+            dict(TicketSerializer(ticket).data)
+            if ticket is not None and kind != TicketEvent.Kind.DELETED
+            else None
+        ),
+        stats=rollups.summary_delta(deltas),
+    )
+    transaction.on_commit(lambda: _save(event), robust=True)
+
+
+def _save(event):
+    using = router.db_for_write(TicketEvent)
+    connection = connections[using]
+    if connection.vendor != "postgresql":
+        # SQLite runs one write transaction at a time: ids commit in order
+        event.save(using=using)
+    else:
+        with transaction.atomic(using=using):
+            # A sequence hands out ids at INSERT, not at commit: without the
+            # lock, id N+1 can commit first and a reader that moved past it
+            # never sees N
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT pg_advisory_xact_lock(%s)", [INSERT_LOCK_ID])
+            event.save(using=using)
+    if event.id % _config("PRUNE_EVERY") == 0:
+        prune()
+
+
+def prune() -> int:
+    cutoff = timezone.now() - timedelta(seconds=_config("RETENTION"))
+    deleted, _ = TicketEvent.objects.filter(created_at__lt=cutoff).delete()
+    return deleted
+
+
+# ─── Read side ───
+
+
+def as_dict(event) -> dict:
+    return {
+        "id": event.id,
+        "kind": event.kind,
+        "ticket_id": event.ticket_id,
+        "ticket": event.ticket,
+        "stats": event.stats,
+        "created_at": event.created_at.isoformat(),
+    }
+
+
+def latest_id() -> int:
+    return TicketEvent.objects.aggregate(latest=Max("id"))["latest"] or 0
+
+
+def fetch_after(after: int, limit: int) -> list:
+    return [
+        as_dict(event)
+        for event in TicketEvent.objects.filter(id__gt=after).order_by("id")[:limit]
+    ]
+
+
+def read_after(after: int, limit: int) -> tuple:
+    """Return ``(events, reset)``; ``reset`` means events after ``after`` were
+    pruned (or the log was recreated) and the client must refetch."""
+    bounds = TicketEvent.objects.aggregate(oldest=Min("id"), latest=Max("id"))
+    oldest, latest = bounds["oldest"], bounds["latest"] or 0
+    if after > latest or (oldest is not None and after < oldest - 1):
+        return [], True
+    return fetch_after(after, limit), False
+
+
+def last_event_id(request):
+    """The id to resume after, from ``Last-Event-ID`` or ``?after=``."""
+    value = request.META.get("HTTP_LAST_EVENT_ID") or request.GET.get("after")
+    try:
+        return max(0, int(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def sse(name, data, event_id=None) -> str:
+    lines = [] if event_id is None else [f"id: {event_id}"]
+    lines.append(f"event: {name}")
+    lines.append("data: " + json.dumps(data, separators=(",", ":")))
+    return "\n".join(lines) + "\n\n"
+
+
+def _start(after, read):
+    """Opening frames for a connection resuming after ``after`` (or None)."""
+    frames = [f"retry: {_config('RETRY_MS')}\n\n"]
+    if after is None:
+        latest = latest_id()
+        frames.append(sse("ready", {"last_id": latest}, latest))
+        return frames, latest
+    events, reset = read(after)
+    if reset:
+        latest = latest_id()
+        frames.append(sse("reset", {"last_id": latest}, latest))
+        return frames, latest
+    frames.extend(sse(e["kind"], e, e["id"]) for e in events)
+    return frames, events[-1]["id"] if events else after
+
+
+def poll_response_body(request) -> str:
+    """WSGI: pending events plus a retry hint; the client reconnects."""
+    frames, _ = _start(
+        last_event_id(request), lambda after: read_after(after, _config("BATCH_SIZE"))
+    )
+    return "".join(frames)
+
+
+class EventStreamRenderer(BaseRenderer):
+    """Lets DRF negotiate ``Accept: text/event-stream`` for the feed action."""
+
+    media_type = "text/event-stream"
+    format = "sse"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, (str, bytes)):
+            return data
+        return sse("error", data)
+
+
+# ─── ASGI fan-out ───
+
+
+class Broadcaster:
+    """Polls the event log for one event loop and fans out to subscribers.
+
+    Each subscriber is a bounded queue; one that cannot keep up is emptied
+    and handed ``None``, which its stream turns into a ``reset``.
+    """
+
+    def __init__(self):
+        self.subscribers = set()
+        self.last_id = 0
+        self._task = None
+        self._lock = asyncio.Lock()
+
+    async def subscribe(self) -> asyncio.Queue:
+        async with self._lock:
+            if self._task is None or self._task.done():
+                self.last_id = await sync_to_async(latest_id)()
+                self._task = asyncio.create_task(self._poll())
+            queue = asyncio.Queue(maxsize=_config("QUEUE_SIZE"))
+            self.subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue) -> None:
+        self.subscribers.discard(queue)
+
+    async def _poll(self):
+        while self.subscribers:
+            await asyncio.sleep(_config("POLL_INTERVAL"))
+            try:
+                events = await sync_to_async(fetch_after)(
+                    self.last_id, _config("BATCH_SIZE")
+                )
+            except DatabaseError:
+                logger.exception("Reading ticket events failed.")
+                continue
+            if events:
+                self.last_id = events[-1]["id"]
+                self.publish(events)
+
+    def publish(self, events) -> None:
+        for queue in list(self.subscribers):
+            try:
+                queue.put_nowait(events)
+            except asyncio.QueueFull:
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(None)
+
+
+_broadcasters = weakref.WeakKeyDictionary()  # event loop -> Broadcaster
+
+
+def get_broadcaster() -> Broadcaster:
+    loop = asyncio.get_running_loop()
+    broadcaster = _broadcasters.get(loop)
+    if broadcaster is None:
+        broadcaster = _broadcasters[loop] = Broadcaster()
+    return broadcaster
+
+
+async def stream(request):
+    """ASGI: SSE frames until ``MAX_AGE`` seconds, then the client reconnects.
+
+    The age limit also bounds streams whose client vanished without the
+    server noticing.
+    """
+    broadcaster = get_broadcaster()
+    queue = await broadcaster.subscribe()
+    try:
+        frames, after = await sync_to_async(_start)(
+            last_event_id(request), lambda after: _read_all_after(after)
+        )
+        for frame in frames:
+            yield frame
+
+        deadline = time.monotonic() + _config("MAX_AGE")
+        while time.monotonic() < deadline:
+            try:
+                batch = await asyncio.wait_for(queue.get(), _config("HEARTBEAT"))
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            if batch is None:
+                after = broadcaster.last_id
+                yield sse("reset", {"last_id": after}, after)
+                continue
+            for event in batch:
+                if event["id"] > after:
+                    after = event["id"]
+                    yield sse(event["kind"], event, after)
+    finally:
+        broadcaster.unsubscribe(queue)
+
+
+def _read_all_after(after):
+    """Catch-up for a resuming stream; past one batch it is cheaper to refetch."""
+    events, reset = read_after(after, _config("BATCH_SIZE") + 1)
+    if len(events) > _config("BATCH_SIZE"):
+        return [], True
+    return events, reset
@@ -1,15 +1,43 @@
 import django_filters
+from django.db import connections
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import SearchFilter
 
 from .models import Ticket
+from .search import get_backend, search_terms
 
 
 class TicketFilter(django_filters.FilterSet):
-    """FilterSet for ticket list endpoint with combinable filters."""
+    """FilterSet for ticket list endpoint with combinable filters.
+
+    Every filter is declared, with no ``Meta.model``, so the same set
+    applies to ``Ticket`` and to ``AnyTicket`` (``?include_archived=1``).
+    """
 
     category = django_filters.ChoiceFilter(choices=Ticket.Category.choices)
     priority = django_filters.ChoiceFilter(choices=Ticket.Priority.choices)
     status = django_filters.ChoiceFilter(choices=Ticket.Status.choices)
 
-    class Meta:
-        model = Ticket
-        fields = ["category", "priority", "status"]
+
+def filter_tickets(params, queryset=None):
+    """Apply list-style filter parameters (``TicketFilter`` fields and
+    ``search``) given as a dict, e.g. from a request body."""
+    queryset = Ticket.objects.all() if queryset is None else queryset
+    filterset = TicketFilter(data=params, queryset=queryset)
+    if not filterset.is_valid():
+        raise ValidationError(filterset.errors)
+    queryset = filterset.qs
+    terms = search_terms(params.get("search", ""))
+    if terms:
+        queryset = get_backend(connections[queryset.db]).search(queryset, terms)
+    return queryset
+
+
+class TicketSearchFilter(SearchFilter):
+    """``?search=`` backed by the configured full-text search backend."""
+
+    def filter_queryset(self, request, queryset, view):
+        terms = search_terms(request.query_params.get(self.search_param, ""))
+        if not terms:
+            return queryset
+        return get_backend(connections[queryset.db]).search(queryset, terms)
@@ -0,0 +1,141 @@
+"""Streaming bulk ticket ingestion from NDJSON or CSV.
+
+Input is read line by line and processed in chunks of ``batch_size`` rows:
+each chunk is validated with ``TicketSerializer`` (model choices, required
+fields, lengths), then written with one ``bulk_create`` (or ``COPY`` on
+PostgreSQL) together with its stats rollup deltas. Only the current chunk and
+at most ``max_errors`` error details are held in memory, so input size does
+not affect memory use.
+"""
+import csv
+import io
+import json
+import logging
+from dataclasses import dataclass, field
+from itertools import islice
+
+from django.conf import settings
+from django.db import DatabaseError, connection, transaction
+from django.utils import timezone
+
+from . import events, rollups
+from .models import Ticket
+from .serializers import TicketSerializer
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ("ndjson", "csv")
+COPY_FIELDS = ("title", "description", "category", "priority", "status", "created_at")
+
+
+@dataclass
+class IngestResult:
+    created: int = 0
+    failed: int = 0
+    errors: list = field(default_factory=list)
+
+    def add_error(self, line, errors, max_errors):
+        self.failed += 1
+        if len(self.errors) < max_errors:
+            self.errors.append({"line": line, "errors": errors})
+
+    def as_dict(self):
+        return {"created": self.created, "failed": self.failed, "errors": self.errors}
+
+
+def decode_lines(stream):
+    """Decode a binary line iterator (file, request) as UTF-8, dropping a BOM."""
+    for number, raw in enumerate(stream):
+        line = raw.decode("utf-8", errors="replace")
+        yield line.lstrip("\ufeff") if number == 0 else line
+
+
+def iter_rows(stream, fmt):
+    """Yield ``(line_number, row_or_error_message)`` from a binary stream."""
+    lines = decode_lines(stream)
+    if fmt == "csv":
+        reader = csv.DictReader(lines)
+        for row in reader:
+            yield reader.line_num, row
+        return
+
+    for line_number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as exc:
+            yield line_number, f"Invalid JSON: {exc}"
+            continue
+        if not isinstance(row, dict):
+            yield line_number, "Expected a JSON object."
+            continue
+        yield line_number, row
+
+
+def ingest(rows, batch_size=None, max_errors=None) -> IngestResult:
+    """Validate and insert ``rows`` (from ``iter_rows``) chunk by chunk."""
+    batch_size = batch_size or settings.TICKET_INGEST_BATCH_SIZE
+    max_errors = settings.TICKET_INGEST_MAX_ERRORS if max_errors is None else max_errors
+    result = IngestResult()
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, batch_size))
+        if not chunk:
+            return result
+        tickets = []
+        for line, row in chunk:
+            if isinstance(row, str):
+                result.add_error(line, {"non_field_errors": [row]}, max_errors)
+                continue
+            serializer = TicketSerializer(data=row)
+            if serializer.is_valid():
+                tickets.append((line, Ticket(**serializer.validated_data)))
+            else:
+                result.add_error(line, serializer.errors, max_errors)
+        if tickets:
+            _write_chunk(tickets, result, max_errors)
+
+
+def _write_chunk(tickets, result, max_errors):
+    objs = [ticket for _, ticket in tickets]
+    try:
+        with transaction.atomic():
+            if connection.vendor == "postgresql" and settings.TICKET_INGEST_USE_COPY:
+                _copy(objs)
+            else:
+                Ticket.objects.bulk_create(objs)
+            events.tickets_bulk_created(rollups.record_created(objs))
+        result.created += len(objs)
+        return
+    except DatabaseError:
+        logger.warning("Bulk insert failed, retrying chunk row by row.", exc_info=True)
+
+    # Isolate the offending rows; save() keeps rollups in sync via signals
+    for line, ticket in tickets:
+        ticket.pk = None
+        ticket._state.adding = True
+        try:
+            with transaction.atomic():
+                ticket.save()
+        except DatabaseError as exc:
+            result.add_error(line, {"non_field_errors": [str(exc)]}, max_errors)
+        else:
+            result.created += 1
+
+
+def _copy(objs):
+    """Insert with PostgreSQL ``COPY FROM STDIN`` (fastest bulk path)."""
+    now = timezone.now()
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for ticket in objs:
+        ticket.created_at = now
+        writer.writerow([getattr(ticket, name) for name in COPY_FIELDS])
+    buffer.seek(0)
+    with connection.cursor() as cursor:
+        cursor.copy_expert(
+            f"COPY {Ticket._meta.db_table} ({', '.join(COPY_FIELDS)}) "
+            "FROM STDIN WITH (FORMAT csv)",
+            buffer,
+        )
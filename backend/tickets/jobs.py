@@ -0,0 +1,207 @@
+"""Database-backed queue for asynchronous ticket classification.
+
+``POST /api/tickets/classify/?async=1`` enqueues a ``ClassificationJob`` and
+returns immediately; ``run_classification_worker`` claims pending jobs and
+runs them on a bounded thread pool, outside the gunicorn request workers.
+
+- Deduplication: a partial unique constraint allows one pending/running job
+  per classification cache key, so identical in-flight descriptions share a
+  job. Descriptions the keyword rules answer, or already in the
+  classification cache, complete at once.
+- Claiming is a conditional ``UPDATE ... WHERE status = 'pending'``, so any
+  number of worker processes can poll the same table safely.
+- Expiry: pending jobs nobody picked up within ``QUEUE_TTL`` and finished
+  jobs older than ``RESULT_TTL`` are purged; jobs stuck in ``running`` (a
+  worker died) are re-queued up to ``MAX_ATTEMPTS`` times.
+- Long-poll (``GET classify/jobs/<id>/?wait=N``): the async view
+  (``tickets.async_views``) waits up to ``MAX_WAIT`` seconds on the event
+  loop. A sync worker waits at most ``SYNC_MAX_WAIT``, so polling clients
+  cannot hold every gunicorn worker; it answers with ``Retry-After``.
+"""
+import asyncio
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import classification_cache, services
+from .models import ClassificationJob
+
+logger = logging.getLogger(__name__)
+
+IN_FLIGHT = (ClassificationJob.Status.PENDING, ClassificationJob.Status.RUNNING)
+
+
+def _config(name):
+    return settings.CLASSIFY_JOBS[name]
+
+
+def enqueue(description: str) -> tuple:
+    """Return ``(job, created)`` for ``description``, reusing in-flight jobs."""
+    key = classification_cache.make_key(
+        description, services.PROMPT_VERSION, services.GROQ_MODEL
+    )
+    now = timezone.now()
+
+    answer = services.classify_locally(description)
+    if answer is not None:
+        job = ClassificationJob.objects.create(
+            description=description,
+            cache_key=key,
+            status=ClassificationJob.Status.DONE,
+            result=answer,
+            finished_at=now,
+            expires_at=now + timedelta(seconds=_config("RESULT_TTL")),
+        )
+        return job, True
+
+    for _ in range(2):
+        existing = ClassificationJob.objects.filter(
+            cache_key=key, status__in=IN_FLIGHT, expires_at__gt=now
+        ).first()
+        if existing is not None:
+            return existing, False
+        # An expired pending job is never claimed, but holds the in-flight
+        # slot until purge_expired runs
+        ClassificationJob.objects.filter(
+            cache_key=key, status=ClassificationJob.Status.PENDING, expires_at__lte=now
+        ).delete()
+        try:
+            with transaction.atomic():
+                job = ClassificationJob.objects.create(
+                    description=description,
+                    cache_key=key,
+                    expires_at=now + timedelta(seconds=_config("QUEUE_TTL")),
+                )
+            return job, True
+        except IntegrityError:
+            # Lost the race to another request enqueuing the same description
+            continue
+    raise RuntimeError("Could not enqueue classification job.")
+
+
+def claim(limit: int) -> list:
+    """Atomically move up to ``limit`` oldest pending jobs to running."""
+    if limit <= 0:
+        return []
+    now = timezone.now()
+    candidates = ClassificationJob.objects.filter(
+        status=ClassificationJob.Status.PENDING, expires_at__gt=now
+    ).values_list("id", flat=True)[:limit]
+
+    claimed = [
+        job_id
+        for job_id in list(candidates)
+        if ClassificationJob.objects.filter(
+            id=job_id, status=ClassificationJob.Status.PENDING
+        ).update(
+            status=ClassificationJob.Status.RUNNING,
+            started_at=now,
+            attempts=F("attempts") + 1,
+            # Stay visible to get_job and enqueue while a worker holds it
+            expires_at=now + timedelta(seconds=_config("QUEUE_TTL")),
+        )
+    ]
+    return list(ClassificationJob.objects.filter(id__in=claimed))
+
+
+def run(job: ClassificationJob) -> None:
+    """Classify a claimed job and store its result."""
+    result = services.classify_ticket(job.description)
+    now = timezone.now()
+    ClassificationJob.objects.filter(
+        id=job.id, status=ClassificationJob.Status.RUNNING
+    ).update(
+        status=ClassificationJob.Status.DONE,
+        result=result,
+        finished_at=now,
+        expires_at=now + timedelta(seconds=_config("RESULT_TTL")),
+    )
+
+
+def recover_stale() -> int:
+    """Re-queue jobs whose worker disappeared; give up after MAX_ATTEMPTS."""
+    now = timezone.now()
+    stale = ClassificationJob.objects.filter(
+        status=ClassificationJob.Status.RUNNING,
+        started_at__lt=now - timedelta(seconds=_config("STALE_AFTER")),
+    )
+    exhausted = stale.filter(attempts__gte=_config("MAX_ATTEMPTS")).update(
+        status=ClassificationJob.Status.DONE,
+        result=services.FALLBACK_RESPONSE,
+        finished_at=now,
+        expires_at=now + timedelta(seconds=_config("RESULT_TTL")),
+    )
+    requeued = stale.update(
+        status=ClassificationJob.Status.PENDING,
+        expires_at=now + timedelta(seconds=_config("QUEUE_TTL")),
+    )
+    if exhausted or requeued:
+        logger.warning(
+            "Recovered stale classification jobs: %d re-queued, %d abandoned.",
+            requeued,
+            exhausted,
+        )
+    return requeued + exhausted
+
+
+def purge_expired() -> int:
+    deleted, _ = (
+        ClassificationJob.objects.filter(expires_at__lte=timezone.now())
+        .exclude(status=ClassificationJob.Status.RUNNING)
+        .delete()
+    )
+    return deleted
+
+
+def _live(job_id):
+    return ClassificationJob.objects.filter(id=job_id, expires_at__gt=timezone.now())
+
+
+def get_job(job_id):
+    """Return the job unless it does not exist or has expired."""
+    return _live(job_id).first()
+
+
+async def aget_job(job_id):
+    return await _live(job_id).afirst()
+
+
+def _settled(job, deadline) -> bool:
+    return (
+        job is None
+        or job.status == ClassificationJob.Status.DONE
+        or time.monotonic() >= deadline
+    )
+
+
+def wait_for(job_id, timeout: float):
+    """Long-poll in a sync worker: return the job once done, or as it is
+    after ``timeout`` seconds, at most ``SYNC_MAX_WAIT``."""
+    deadline = time.monotonic() + min(timeout, _config("SYNC_MAX_WAIT"))
+    while True:
+        job = get_job(job_id)
+        if _settled(job, deadline):
+            return job
+        time.sleep(_config("WAIT_POLL_INTERVAL"))
+
+
+def poll_headers(job) -> dict:
+    """``Retry-After`` while ``job`` is still in flight."""
+    if job.status == ClassificationJob.Status.DONE:
+        return {}
+    return {"Retry-After": str(_config("RETRY_AFTER"))}
+
+
+async def await_job(job_id, timeout: float):
+    """``wait_for`` on the event loop, for up to ``MAX_WAIT`` seconds."""
+    deadline = time.monotonic() + min(timeout, _config("MAX_WAIT"))
+    while True:
+        job = await aget_job(job_id)
+        if _settled(job, deadline):
+            return job
+        await asyncio.sleep(_config("WAIT_POLL_INTERVAL"))
@@ -0,0 +1,222 @@
+"""Process-wide Groq client with a bounded, persistent connection pool.
+
+One client per process keeps TLS connections alive between classify calls
+instead of paying the SDK import, a new connection and a handshake on every
+request. The client is rebuilt lazily in a forked child (gunicorn workers)
+and whenever a ``GROQ_*`` setting changes.
+
+Retries are handled here rather than by the SDK so that they are bounded by
+both an attempt count and a wall-clock budget (``GROQ_CLIENT['RETRY_BUDGET']``).
+
+Async views (ASGI) use ``achat_completion``, backed by an ``AsyncGroq``
+client with the same pool limits. httpx async pools are bound to the event
+loop that created them, so there is one async client per running loop.
+"""
+import asyncio
+import logging
+import os
+import random
+import threading
+import time
+import weakref
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+_client = None
+_client_pid = None
+_lock = threading.Lock()
+_async_clients = weakref.WeakKeyDictionary()  # event loop -> AsyncGroq
+
+
+def _pool_options():
+    import httpx
+
+    config = settings.GROQ_CLIENT
+    return {
+        "limits": httpx.Limits(
+            max_connections=config["MAX_CONNECTIONS"],
+            max_keepalive_connections=config["MAX_KEEPALIVE"],
+        ),
+        "timeout": httpx.Timeout(config["TIMEOUT"], connect=config["CONNECT_TIMEOUT"]),
+    }
+
+
+def build_client():
+    """Create a Groq client backed by a dedicated httpx connection pool."""
+    import groq
+
+    return groq.Groq(
+        api_key=settings.GROQ_API_KEY,
+        base_url=settings.GROQ_CLIENT["BASE_URL"] or None,
+        max_retries=0,
+        http_client=groq.DefaultHttpxClient(**_pool_options()),
+    )
+
+
+def build_async_client():
+    """Async counterpart of ``build_client`` for use inside an event loop."""
+    import groq
+
+    return groq.AsyncGroq(
+        api_key=settings.GROQ_API_KEY,
+        base_url=settings.GROQ_CLIENT["BASE_URL"] or None,
+        max_retries=0,
+        http_client=groq.DefaultAsyncHttpxClient(**_pool_options()),
+    )
+
+
+def import_sdk() -> None:
+    """Import the Groq SDK without building a client (no sockets, no threads).
+
+    Called in a preloading gunicorn master, so the workers it forks share the
+    imported modules instead of each paying for the import on first use.
+    """
+    try:
+        import groq  # noqa: F401
+    except ImportError:
+        logger.warning("groq is not installed; classification will use the fallback")
+
+
+def get_client():
+    """Return this process's client, building it on first use or after a fork."""
+    global _client, _client_pid
+    pid = os.getpid()
+    if _client is None or _client_pid != pid:
+        with _lock:
+            if _client is None or _client_pid != pid:
+                _client = build_client()
+                _client_pid = pid
+    return _client
+
+
+def get_async_client():
+    """Return the async client for the running event loop."""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = _async_clients[loop] = build_async_client()
+    return client
+
+
+def reset():
+    """Close and drop the client; the next call builds a fresh one."""
+    global _client, _client_pid
+    with _lock:
+        client, owner = _client, _client_pid
+        _client = _client_pid = None
+        # Async clients can only be closed from their own loop; drop them
+        _async_clients.clear()
+    # Sockets inherited across fork belong to the parent; never close those
+    if client is not None and owner == os.getpid():
+        client.close()
+
+
+def _forget_after_fork():
+    global _client, _client_pid, _lock
+    _client = _client_pid = None
+    _async_clients.clear()
+    _lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_forget_after_fork)
+
+
+@receiver(setting_changed)
+def _reset_on_setting_change(setting, **kwargs):
+    if setting.startswith("GROQ_"):
+        reset()
+
+
+def warm_up():
+    """Build the client (importing the SDK) and optionally open a connection.
+
+    Called from gunicorn's ``post_worker_init`` hook so a worker's first
+    classify request does not pay for the import, pool setup or handshake.
+    """
+    if not settings.GROQ_API_KEY:
+        return
+    start = time.perf_counter()
+    client = get_client()
+    if settings.GROQ_CLIENT["WARMUP_CONNECT"]:
+        try:
+            client.models.list()
+        except Exception:
+            logger.warning("Groq warm-up request failed.", exc_info=True)
+    logger.info("Groq client warmed up in %.0f ms.", (time.perf_counter() - start) * 1000)
+
+
+def _retry_delay(attempt, exc, config):
+    delay = min(config["BACKOFF_MAX"], config["BACKOFF_BASE"] * 2 ** (attempt - 1))
+    delay *= random.uniform(0.5, 1.0)
+    response = getattr(exc, "response", None)
+    if response is not None:
+        try:
+            delay = max(delay, float(response.headers.get("retry-after", 0)))
+        except ValueError:
+            pass
+    return delay
+
+
+def _retryable_errors():
+    import groq
+
+    return (groq.APIConnectionError, groq.RateLimitError, groq.InternalServerError)
+
+
+def _next_retry(attempt, exc, config, deadline):
+    """Return the delay before retry ``attempt``, or None to give up."""
+    delay = _retry_delay(attempt, exc, config)
+    if attempt > config["MAX_RETRIES"] or time.monotonic() + delay > deadline:
+        return None
+    logger.warning(
+        "Groq request failed (%s), retry %d in %.2fs.",
+        type(exc).__name__,
+        attempt,
+        delay,
+    )
+    return delay
+
+
+def chat_completion(**kwargs):
+    """``client.chat.completions.create`` with bounded retries and backoff.
+
+    Connection errors, timeouts, 429s and 5xx responses are retried until
+    ``MAX_RETRIES`` attempts or ``RETRY_BUDGET`` seconds are used up; the
+    last error is then re-raised.
+    """
+    config = settings.GROQ_CLIENT
+    deadline = time.monotonic() + config["RETRY_BUDGET"]
+    attempt = 0
+    with metrics.llm_call("sync"):
+        while True:
+            try:
+                return get_client().chat.completions.create(**kwargs)
+            except _retryable_errors() as exc:
+                attempt += 1
+                delay = _next_retry(attempt, exc, config, deadline)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+
+
+async def achat_completion(**kwargs):
+    """Async ``chat_completion``: same retry policy, without blocking the loop."""
+    config = settings.GROQ_CLIENT
+    deadline = time.monotonic() + config["RETRY_BUDGET"]
+    attempt = 0
+    with metrics.llm_call("async"):
+        while True:
+            try:
+                return await get_async_client().chat.completions.create(**kwargs)
+            except _retryable_errors() as exc:
+                attempt += 1
+                delay = _next_retry(attempt, exc, config, deadline)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
@@ -0,0 +1,115 @@
+"""Local HTTP stand-in for the Groq chat completions API.
+
+Used by the test suite to exercise the real client, connection pool and
+retry path without network access. Point ``GROQ_CLIENT['BASE_URL']`` at
+``StubLLMServer.base_url``.
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so connection reuse is visible
+    # Headers and body are separate writes; without this, delayed ACKs add
+    # ~40 ms to every response on a kept-alive connection
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        with self.server.stub.lock:
+            self.server.stub.connections += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self.send_json(200, {"object": "list", "data": []})
+
+    def do_POST(self):
+        stub = self.server.stub
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with stub.lock:
+            stub.requests += 1
+            failure = stub.failures.pop(0) if stub.failures else None
+        if failure is not None:
+            self.send_json(failure, {"error": {"message": "stub failure"}})
+            return
+        if stub.latency:
+            time.sleep(stub.latency)
+
+        prompt = request["messages"][-1]["content"]
+        reply = stub.reply(prompt) if callable(stub.reply) else stub.reply
+        content = reply if isinstance(reply, str) else json.dumps(reply)
+        self.send_json(
+            200,
+            {
+                "id": f"stub-{stub.requests}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": request.get("model", "stub"),
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": content},
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+            },
+        )
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients that time out and hang up are expected, not errors
+        pass
+
+
+class StubLLMServer:
+    """Threaded local server answering chat completions with ``reply``.
+
+    ``reply`` is a dict/str, or a callable receiving the prompt. ``failures``
+    is a list of HTTP status codes returned (in order) before succeeding.
+    """
+
+    def __init__(self, reply=None, latency=0.0):
+        self.reply = reply or {"category": "technical", "priority": "medium"}
+        self.latency = latency
+        self.failures = []
+        self.requests = 0
+        self.connections = 0
+        self.lock = threading.Lock()
+        self._server = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._server = _Server(("127.0.0.1", 0), _Handler)
+        self._server.stub = self
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
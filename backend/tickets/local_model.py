@@ -0,0 +1,266 @@
+"""Offline-trained ticket classifier served from a memory-mapped artifact.
+
+``manage.py train_classifier`` learns category and priority from the labels
+already on stored tickets (set or corrected by agents) and writes a
+versioned artifact. Workers map it read-only once and classify in well
+under a millisecond, without the network. ``TICKET_CLASSIFIER['MODE']`` selects how
+``services`` uses it:
+
+- ``llm`` (default): not used.
+- ``hybrid``: answers when its confidence reaches ``MIN_CONFIDENCE``; other
+  descriptions go to the cache and Groq.
+- ``local``: answers every description the keyword rules do not.
+
+Model: multinomial naive Bayes over the presence of word unigrams and
+bigrams, hashed with CRC-32 into ``2**hash_bits`` buckets, with additive
+smoothing. One model per head (category, priority).
+
+Artifact layout (little-endian)::
+
+    b"TKNB" | uint32 format version | uint32 header length | header JSON
+    | zero padding to a multiple of 4 | float32 tables
+
+Each head stores a ``n_features x n_labels`` table of log P(feature | label),
+row-major so one feature's scores are adjacent. The header holds labels, log
+priors, table offsets and training metadata.
+"""
+import json
+import logging
+import math
+import mmap
+import os
+import re
+import struct
+import sys
+import tempfile
+import threading
+import zlib
+from array import array
+from dataclasses import dataclass
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"TKNB"
+FORMAT_VERSION = 1
+HEADS = ("category", "priority")
+_PREAMBLE = struct.Struct("<4sII")
+_TOKEN_RE = re.compile(r"[a-z0-9']+")
+
+
+class ArtifactError(ValueError):
+    """The file is not a classifier artifact this code can read."""
+
+
+def features(text: str, n_features: int) -> set:
+    """Hashed unigram and bigram buckets present in ``text``."""
+    tokens = _TOKEN_RE.findall(text.lower())
+    grams = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    return {zlib.crc32(gram.encode()) % n_features for gram in grams}
+
+
+class Trainer:
+    """Accumulates per-label feature counts; ``save`` writes the artifact."""
+
+    def __init__(self, labels: dict, hash_bits: int = 18, alpha: float = 1.0):
+        self.labels = {head: list(labels[head]) for head in HEADS}
+        self.n_features = 1 << hash_bits
+        self.alpha = alpha
+        self.samples = 0
+        self._index = {
+            head: {label: i for i, label in enumerate(values)}
+            for head, values in self.labels.items()
+        }
+        self._counts = {
+            head: array("I", bytes(4 * self.n_features * len(values)))
+            for head, values in self.labels.items()
+        }
+        self._docs = {head: [0] * len(values) for head, values in self.labels.items()}
+        self._totals = {head: [0] * len(values) for head, values in self.labels.items()}
+
+    def add(self, text: str, targets: dict) -> None:
+        buckets = features(text, self.n_features)
+        self.samples += 1
+        for head in HEADS:
+            label = self._index[head][targets[head]]
+            width = len(self.labels[head])
+            counts = self._counts[head]
+            for bucket in buckets:
+                counts[bucket * width + label] += 1
+            self._docs[head][label] += 1
+            self._totals[head][label] += len(buckets)
+
+    def _tables(self):
+        for head in HEADS:
+            width = len(self.labels[head])
+            counts = self._counts[head]
+            # Labels with no training tickets keep a flat, very low prior
+            priors = [
+                math.log((docs + self.alpha) / (self.samples + self.alpha * width))
+                for docs in self._docs[head]
+            ]
+            denominators = [
+                total + self.alpha * self.n_features for total in self._totals[head]
+            ]
+            table = array("f", bytes(4 * len(counts)))
+            for base in range(0, len(counts), width):
+                row = counts[base : base + width]
+                # Buckets never seen in training carry no evidence either way
+                if any(row):
+                    for i, count in enumerate(row):
+                        table[base + i] = math.log(
+                            (count + self.alpha) / denominators[i]
+                        )
+            yield head, priors, table
+
+    def save(self, path, metadata=None) -> dict:
+        """Write the artifact atomically (readers keep their old mapping)."""
+        heads, tables, offset = {}, [], 0
+        for head, priors, table in self._tables():
+            heads[head] = {"labels": self.labels[head], "priors": priors, "offset": offset}
+            offset += len(table)
+            tables.append(table)
+        header = {
+            "format": FORMAT_VERSION,
+            "n_features": self.n_features,
+            "alpha": self.alpha,
+            "samples": self.samples,
+            "heads": heads,
+            **(metadata or {}),
+        }
+        encoded = json.dumps(header).encode()
+        padding = -(_PREAMBLE.size + len(encoded)) % 4
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as out:
+                out.write(_PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(encoded)))
+                out.write(encoded + b"\0" * padding)
+                for table in tables:
+                    if sys.byteorder != "little":
+                        table.byteswap()
+                    table.tofile(out)
+            # mkstemp creates 0600; other users' workers may map it
+            os.chmod(tmp, 0o644)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        return header
+
+
+@dataclass(frozen=True)
+class Prediction:
+    category: str
+    priority: str
+    confidence: float
+
+    def as_result(self) -> dict:
+        return {
+            "suggested_category": self.category,
+            "suggested_priority": self.priority,
+        }
+
+
+class LocalModel:
+    """A read-only, memory-mapped artifact written by ``Trainer.save``."""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, length = _PREAMBLE.unpack_from(self._mmap)
+        except struct.error:
+            raise ArtifactError(f"{path} is too short to be a classifier artifact.")
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ArtifactError(
+                f"{path} is not a version {FORMAT_VERSION} classifier artifact."
+            )
+        start = _PREAMBLE.size
+        self.header = json.loads(self._mmap[start : start + length])
+        start += length + (-(start + length) % 4)
+        if sys.byteorder != "little":
+            raise ArtifactError("Classifier artifacts are little-endian.")
+        self._floats = memoryview(self._mmap)[start:].cast("f")
+        self.n_features = self.header["n_features"]
+        self.heads = {
+            head: (spec["labels"], spec["priors"], spec["offset"])
+            for head, spec in self.header["heads"].items()
+        }
+
+    @property
+    def version(self) -> str:
+        return self.header.get("version", "")
+
+    def _predict_head(self, head, buckets):
+        labels, priors, offset = self.heads[head]
+        width = len(labels)
+        scores = list(priors)
+        floats = self._floats
+        for bucket in buckets:
+            base = offset + bucket * width
+            for i in range(width):
+                scores[i] += floats[base + i]
+        best = max(range(width), key=scores.__getitem__)
+        top = scores[best]
+        # Posterior of the winner: softmax over the label scores
+        confidence = 1.0 / sum(math.exp(score - top) for score in scores)
+        return labels[best], confidence
+
+    def predict(self, text: str) -> Prediction:
+        buckets = features(text, self.n_features)
+        category, category_confidence = self._predict_head("category", buckets)
+        priority, priority_confidence = self._predict_head("priority", buckets)
+        return Prediction(
+            category=category,
+            priority=priority,
+            confidence=round(min(category_confidence, priority_confidence), 4),
+        )
+
+
+_loaded = None  # (path, LocalModel or None)
+_lock = threading.Lock()
+
+
+def get_model():
+    """This worker's model for ``TICKET_CLASSIFIER['MODEL_PATH']``, or None.
+
+    Loaded on first use and kept; restart workers after retraining.
+    """
+    global _loaded
+    path = str(settings.TICKET_CLASSIFIER["MODEL_PATH"])
+    loaded = _loaded
+    if loaded is not None and loaded[0] == path:
+        return loaded[1]
+    with _lock:
+        if _loaded is None or _loaded[0] != path:
+            try:
+                model = LocalModel(path)
+            except (OSError, ArtifactError, ValueError):
+                logger.exception("Could not load the local classifier from %s.", path)
+                model = None
+            _loaded = (path, model)
+        return _loaded[1]
+
+
+def reset() -> None:
+    global _loaded
+    with _lock:
+        _loaded = None
+
+
+def classify(description: str):
+    """The model's ``Prediction`` when the configured mode lets it answer."""
+    config = settings.TICKET_CLASSIFIER
+    if config["MODE"] not in ("local", "hybrid"):
+        return None
+    model = get_model()
+    if model is None:
+        return None
+    prediction = model.predict(description)
+    if config["MODE"] == "hybrid" and prediction.confidence < config["MIN_CONFIDENCE"]:
+        return None
+    return prediction
@@ -0,0 +1,48 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from tickets import archive
+
+
+class Command(BaseCommand):
+    help = (
+        "Move resolved and closed tickets older than --older-than days to the "
+        "archive table, in short batches. Archived tickets stay in the stats "
+        "and are listed with ?include_archived=1."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--older-than",
+            type=int,
+            default=settings.TICKET_ARCHIVE["AFTER_DAYS"],
+            help="Archive tickets created more than this many days ago.",
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=settings.TICKET_ARCHIVE["BATCH_SIZE"]
+        )
+        parser.add_argument(
+            "--pause", type=float, default=0.0, help="Seconds to sleep between batches."
+        )
+        parser.add_argument("--max-batches", type=int, default=None)
+        parser.add_argument(
+            "--dry-run", action="store_true", help="Only count eligible tickets."
+        )
+
+    def handle(self, *args, **options):
+        before = archive.cutoff(options["older_than"])
+        if options["dry_run"]:
+            count = archive.eligible(before).count()
+            self.stdout.write(f"{count} ticket(s) created before {before:%Y-%m-%d} to archive.")
+            return
+        result = archive.archive(
+            before,
+            batch_size=options["batch_size"],
+            pause=options["pause"],
+            max_batches=options["max_batches"],
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Archived {result.archived} ticket(s) in {result.batches} batch(es)."
+            )
+        )
@@ -0,0 +1,223 @@
+import re
+import statistics
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection, models, transaction
+from django.test import Client, override_settings
+from rest_framework.settings import api_settings
+
+from tickets.benchmarks import TicketGenerator, seed_tickets
+from tickets.models import Ticket
+
+# The index set before the list-shaped indexes: db_index on
+# title and every enum column, plus two composites
+LEGACY_INDEXES = [
+    models.Index(fields=["title"], name="legacy_title_idx"),
+    models.Index(fields=["category"], name="legacy_category_idx"),
+    models.Index(fields=["priority"], name="legacy_priority_idx"),
+    models.Index(fields=["status"], name="legacy_status_idx"),
+    models.Index(fields=["created_at"], name="legacy_created_at_idx"),
+    models.Index(fields=["category", "priority"], name="legacy_cat_pri_idx"),
+    models.Index(fields=["status", "created_at"], name="legacy_status_created_idx"),
+]
+
+EXPLAIN = {
+    "sqlite": "EXPLAIN QUERY PLAN ",
+    "postgresql": "EXPLAIN ",
+}
+# Plan fragments worth flagging: reading the whole table, or sorting it
+FULL_SCANS = {
+    "sqlite": re.compile(r"\bSCAN tickets_ticket\b(?! USING)"),
+    "postgresql": re.compile(r"\bSeq Scan on tickets_ticket\b"),
+}
+SORTS = {
+    "sqlite": re.compile(r"\bUSE TEMP B-TREE FOR (ORDER|GROUP) BY\b"),
+    "postgresql": re.compile(r"\bSort\b"),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed synthetic tickets, replay the query shapes the list, stats and "
+        "export views issue, and print each statement's EXPLAIN plan with "
+        "read latency and insert throughput. --compare repeats the "
+        "measurements with the previous index set. Runs inside a transaction "
+        "that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tickets", type=int, default=100_000)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--repeat", type=int, default=20)
+        parser.add_argument("--inserts", type=int, default=500)
+        parser.add_argument(
+            "--compare",
+            action="store_true",
+            help="Also measure with the previous (single-column) index set.",
+        )
+        parser.add_argument(
+            "--analyze",
+            action="store_true",
+            help="EXPLAIN ANALYZE on PostgreSQL (runs each statement).",
+        )
+        parser.add_argument("--no-plans", action="store_true")
+
+    def handle(self, *args, **options):
+        self.vendor = connection.vendor
+        overrides = {
+            "ALLOWED_HOSTS": [*settings.ALLOWED_HOSTS, "testserver"],
+            "RESPONSE_CACHE": {**settings.RESPONSE_CACHE, "ENABLED": False},
+            "TICKET_COUNT_CACHE_TIMEOUT": 0,
+        }
+        with override_settings(**overrides), transaction.atomic():
+            generator = TicketGenerator(options["seed"])
+            seed_tickets(generator, options["tickets"])
+            self.client = Client()
+            shapes = self.shapes(generator)
+            self.stdout.write(f"{Ticket.objects.count()} tickets on {self.vendor}")
+
+            current = [index.name for index in Ticket._meta.indexes]
+            results = {"current": self.measure(shapes, options, current)}
+            if options["compare"]:
+                self.swap(Ticket._meta.indexes, LEGACY_INDEXES)
+                options = {**options, "no_plans": True}
+                legacy = [index.name for index in LEGACY_INDEXES]
+                results["legacy"] = self.measure(shapes, options, legacy)
+                self.compare(results["legacy"], results["current"])
+            transaction.set_rollback(True)
+
+    def shapes(self, generator):
+        """(name, path) for the requests whose SQL is audited."""
+        pages = Ticket.objects.count() // api_settings.PAGE_SIZE
+        first = self.client.get("/api/tickets/?pagination=cursor&status=open").json()
+        return [
+            ("list", "/api/tickets/"),
+            ("list_open", "/api/tickets/?status=open"),
+            ("list_triage", "/api/tickets/?status=open&category=billing&priority=high"),
+            ("list_cat_status", "/api/tickets/?category=technical&status=in_progress"),
+            ("list_closed", "/api/tickets/?status=closed"),
+            ("cursor_open_p2", first["next"] or "/api/tickets/?pagination=cursor"),
+            ("deep_page", f"/api/tickets/?page={max(1, pages // 2)}"),
+            ("search", f"/api/tickets/?search={generator.words[50]}"),
+            ("stats", "/api/tickets/stats/"),
+            ("stats_7d", "/api/tickets/stats/?from=7d&bucket=day"),
+            ("export_open", "/api/tickets/export/?status=open&export_format=ndjson"),
+        ]
+
+    def get(self, path):
+        cache.clear()
+        response = self.client.get(path)
+        if response.streaming:
+            b"".join(response.streaming_content)
+        return response
+
+    def capture(self, path):
+        statements = []
+
+        def record(execute, sql, params, many, context):
+            if sql.lstrip().upper().startswith(("SELECT", "WITH")):
+                statements.append((sql, params))
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(record):
+            self.get(path)
+        return statements
+
+    def explain(self, sql, params, analyze):
+        prefix = EXPLAIN.get(self.vendor, "EXPLAIN ")
+        if analyze and self.vendor == "postgresql":
+            prefix = "EXPLAIN (ANALYZE, BUFFERS) "
+        with connection.cursor() as cursor:
+            cursor.execute(prefix + sql, params)
+            rows = cursor.fetchall()
+        return [row[-1] for row in rows]
+
+    def measure(self, shapes, options, indexes):
+        self.stdout.write(f"\n== Indexes: {', '.join(indexes)}")
+        self.stdout.write(
+            f"{'shape':>16} {'p50 ms':>8} {'queries':>8} {'full scans':>11} {'sorts':>6}"
+        )
+        full_scan = FULL_SCANS.get(self.vendor, FULL_SCANS["postgresql"])
+        sort = SORTS.get(self.vendor, SORTS["postgresql"])
+        results = {}
+        for name, path in shapes:
+            statements = self.capture(path)
+            plans = [
+                (sql, self.explain(sql, params, options["analyze"]))
+                for sql, params in statements
+            ]
+            lines = [line for _sql, plan in plans for line in plan]
+            timings = []
+            for _ in range(options["repeat"]):
+                start = time.perf_counter()
+                self.get(path)
+                timings.append((time.perf_counter() - start) * 1000)
+            result = results[name] = {
+                "p50_ms": statistics.median(timings),
+                "queries": len(statements),
+                "full_scans": sum(bool(full_scan.search(line)) for line in lines),
+                "sorts": sum(bool(sort.search(line)) for line in lines),
+            }
+            self.stdout.write(
+                f"{name:>16} {result['p50_ms']:>8.2f} {result['queries']:>8} "
+                f"{result['full_scans']:>11} {result['sorts']:>6}"
+            )
+            if not options["no_plans"]:
+                for sql, plan in plans:
+                    self.stdout.write(f"{'':>18}{sql[:160]}")
+                    for line in plan:
+                        self.stdout.write(f"{'':>20}{line}")
+
+        results["inserts"] = self.inserts(options)
+        self.stdout.write(
+            f"Inserts: create() {results['inserts']['create_per_s']:.0f}/s, "
+            f"bulk_create {results['inserts']['bulk_per_s']:.0f}/s"
+        )
+        return results
+
+    def inserts(self, options):
+        """Single-row creates (signals, rollups, events) and bulk inserts per second."""
+        generator = TicketGenerator(options["seed"] + 1)
+        count = options["inserts"]
+        start = time.perf_counter()
+        for ticket in generator.tickets(count):
+            Ticket.objects.create(
+                title=ticket.title,
+                description=ticket.description,
+                category=ticket.category,
+                priority=ticket.priority,
+                status=ticket.status,
+            )
+        create_rate = count / (time.perf_counter() - start)
+        start = time.perf_counter()
+        Ticket.objects.bulk_create(generator.tickets(count * 10), batch_size=1000)
+        bulk_rate = count * 10 / (time.perf_counter() - start)
+        return {"create_per_s": create_rate, "bulk_per_s": bulk_rate}
+
+    def swap(self, drop, create):
+        editor = connection.schema_editor()
+        with connection.cursor() as cursor:
+            for index in drop:
+                cursor.execute(str(index.remove_sql(Ticket, editor)))
+            for index in create:
+                cursor.execute(str(index.create_sql(Ticket, editor)))
+            cursor.execute("ANALYZE tickets_ticket" if self.vendor != "sqlite" else "ANALYZE")
+
+    def compare(self, before, after):
+        self.stdout.write("\n== Previous -> current index set")
+        for name, result in after.items():
+            if name == "inserts":
+                continue
+            old = before[name]
+            self.stdout.write(
+                f"{name:>16} {old['p50_ms']:>8.2f} -> {result['p50_ms']:>8.2f} ms "
+                f"({old['p50_ms'] / result['p50_ms']:.1f}x)"
+            )
+        for key, label in (("create_per_s", "create()"), ("bulk_per_s", "bulk_create")):
+            self.stdout.write(
+                f"{label:>16} {before['inserts'][key]:>8.0f} -> "
+                f"{after['inserts'][key]:>8.0f} rows/s"
+            )
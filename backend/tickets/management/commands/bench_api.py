@@ -0,0 +1,172 @@
+import json
+import platform
+import statistics
+import time
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from tickets import llm
+from tickets.benchmarks import SCENARIOS, TicketGenerator, seed_tickets
+from tickets.llm_stub import StubLLMServer
+from tickets.models import Ticket
+
+COMPARED = ("p50_ms", "p95_ms", "p99_ms", "queries_mean")
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed N synthetic tickets (tickets.benchmarks) and replay request "
+        "scenarios in-process through the full Django stack, reporting "
+        "p50/p95/p99 latency and queries per request. Groq is replaced by a "
+        "local stub. Uses the configured database (SQLite or PostgreSQL) "
+        "inside a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tickets", type=int, default=100_000)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument(
+            "--scenarios", nargs="+", default=list(SCENARIOS), choices=list(SCENARIOS)
+        )
+        parser.add_argument("--requests", type=int, default=200)
+        parser.add_argument("--warmup", type=int, default=10)
+        parser.add_argument("--llm-latency", type=float, default=0.0)
+        parser.add_argument(
+            "--response-cache",
+            action="store_true",
+            help="Keep the list/stats response cache on (off by default, so "
+            "every request does the work).",
+        )
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--label", default="", help="Stored with the results.")
+        parser.add_argument("--output", help="Write results as JSON to this path.")
+        parser.add_argument(
+            "--compare", help="Print changes against a previous --output file."
+        )
+
+    def handle(self, *args, **options):
+        baseline = self.load(options["compare"]) if options["compare"] else None
+        generator = TicketGenerator(options["seed"])
+        overrides = {
+            "ALLOWED_HOSTS": [*settings.ALLOWED_HOSTS, "testserver"],
+            "GROQ_API_KEY": "bench",
+            "RESPONSE_CACHE": {
+                **settings.RESPONSE_CACHE,
+                "ENABLED": options["response_cache"],
+            },
+        }
+        results = {}
+
+        with StubLLMServer(latency=options["llm_latency"]) as stub:
+            overrides["GROQ_CLIENT"] = {**settings.GROQ_CLIENT, "BASE_URL": stub.base_url}
+            with override_settings(**overrides), transaction.atomic():
+                llm.reset()
+                start = time.perf_counter()
+                seed_tickets(generator, options["tickets"], options["batch_size"])
+                total = Ticket.objects.count()
+                self.stdout.write(
+                    f"Seeded {options['tickets']} tickets ({total} in table) on "
+                    f"{connection.vendor} in {time.perf_counter() - start:.1f}s"
+                )
+                self.stdout.write(
+                    f"{'scenario':>18} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+                    f"{'max ms':>8} {'queries':>8} {'errors':>7}"
+                )
+                client = Client()
+                for name in options["scenarios"]:
+                    scenario = SCENARIOS[name](generator, total)
+                    stats = self.run(client, scenario, options)
+                    results[name] = stats
+                    self.stdout.write(
+                        f"{name:>18} {stats['p50_ms']:>8.2f} {stats['p95_ms']:>8.2f} "
+                        f"{stats['p99_ms']:>8.2f} {stats['max_ms']:>8.2f} "
+                        f"{stats['queries_mean']:>8.1f} {stats['errors']:>7}"
+                    )
+                transaction.set_rollback(True)
+            llm.reset()
+
+        report = {
+            "meta": {
+                "label": options["label"],
+                "finished_at": timezone.now().isoformat(),
+                "database": connection.vendor,
+                "django": django.get_version(),
+                "python": platform.python_version(),
+                "tickets": total,
+                **{
+                    key: options[key]
+                    for key in ("seed", "requests", "warmup", "llm_latency", "response_cache")
+                },
+            },
+            "scenarios": results,
+        }
+        if options["output"]:
+            with open(options["output"], "w") as handle:
+                json.dump(report, handle, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
+        if baseline is not None:
+            self.compare(baseline, report)
+
+    def run(self, client, scenario, options):
+        timings, queries, errors = [], [], 0
+        for i in range(options["warmup"] + options["requests"]):
+            method, path, data = scenario.request()
+            kwargs = {}
+            if data is not None:
+                kwargs = {"data": json.dumps(data), "content_type": "application/json"}
+            with CaptureQueriesContext(connection) as captured:
+                start = time.perf_counter()
+                response = client.generic(method, path, **kwargs)
+                elapsed = (time.perf_counter() - start) * 1000
+            scenario.done(response)
+            if i < options["warmup"]:
+                continue
+            if response.status_code >= 400:
+                errors += 1
+            timings.append(elapsed)
+            queries.append(len(captured))
+
+        cuts = (
+            statistics.quantiles(timings, n=100, method="inclusive")
+            if len(timings) > 1
+            else timings * 99
+        )
+        return {
+            "requests": len(timings),
+            "errors": errors,
+            "p50_ms": round(statistics.median(timings), 3),
+            "p95_ms": round(cuts[94], 3),
+            "p99_ms": round(cuts[98], 3),
+            "max_ms": round(max(timings), 3),
+            "queries_mean": round(statistics.fmean(queries), 2),
+            "queries_max": max(queries),
+        }
+
+    def load(self, path):
+        try:
+            with open(path) as handle:
+                return json.load(handle)
+        except (OSError, ValueError) as exc:
+            raise CommandError(f"Cannot read baseline {path}: {exc}")
+
+    def compare(self, baseline, report):
+        meta = baseline["meta"]
+        self.stdout.write(
+            f"Against {meta.get('label') or meta['finished_at']} "
+            f"({meta['tickets']} tickets on {meta['database']}):"
+        )
+        for name, stats in report["scenarios"].items():
+            before = baseline["scenarios"].get(name)
+            if before is None:
+                continue
+            changes = []
+            for key in COMPARED:
+                change = (stats[key] - before[key]) / before[key] * 100 if before[key] else 0.0
+                changes.append(f"{key} {before[key]:g} -> {stats[key]:g} ({change:+.0f}%)")
+            self.stdout.write(f"{name:>18} " + ", ".join(changes))
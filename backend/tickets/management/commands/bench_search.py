@@ -0,0 +1,77 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from tickets.benchmarks import TicketGenerator, seed_tickets
+from tickets.models import Ticket
+from tickets.search import BasicSearchBackend, get_backend, search_terms
+
+
+def build_queries(words):
+    return [
+        words[0],  # most common term
+        words[50],
+        words[2000],  # rare term
+        f"{words[3]} {words[40]}",
+        words[100][:4],  # prefix, as typed in the search box
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare ticket search latency of the configured full-text backend "
+        "against icontains at several table sizes. Runs inside a transaction "
+        "that is rolled back, so seeded tickets are never kept."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes", type=int, nargs="+", default=[100_000, 1_000_000]
+        )
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        generator = TicketGenerator(options["seed"])
+        queries = build_queries(generator.words)
+        backends = [
+            ("fulltext", get_backend(connection)),
+            ("icontains", BasicSearchBackend()),
+        ]
+        self.stdout.write(
+            f"{'tickets':>10} {'backend':>10} {'query':>16} "
+            f"{'p50 ms':>9} {'max ms':>9} {'hits':>8}"
+        )
+
+        with transaction.atomic():
+            seeded = Ticket.objects.count()
+            for size in sorted(options["sizes"]):
+                if size > seeded:
+                    seed_tickets(generator, size - seeded, options["batch_size"])
+                seeded = max(seeded, size)
+
+                for query in queries:
+                    for name, backend in backends:
+                        timings, hits = self.measure(backend, query, options["repeat"])
+                        self.stdout.write(
+                            f"{seeded:>10} {name:>10} {query:>16} "
+                            f"{statistics.median(timings):>9.2f} "
+                            f"{max(timings):>9.2f} {hits:>8}"
+                        )
+            transaction.set_rollback(True)
+
+    def measure(self, backend, query, repeat):
+        terms = search_terms(query)
+        timings = []
+        hits = 0
+        for _ in range(repeat):
+            start = time.perf_counter()
+            # Same work as an uncached list request: total count + first page
+            queryset = backend.search(Ticket.objects.all(), terms)
+            hits = queryset.count()
+            list(queryset[:50])
+            timings.append((time.perf_counter() - start) * 1000)
+        return timings, hits
@@ -0,0 +1,72 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from tickets import rows
+from tickets.benchmarks import TicketGenerator, seed_tickets
+from tickets.models import Ticket
+from tickets.renderers import FastJSONRenderer
+from tickets.serializers import TicketSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare list page encoding through TicketSerializer + JSONRenderer "
+        "against the values() fast path (tickets.rows) + FastJSONRenderer, "
+        "with and without ?fields= selection. Runs inside a transaction that "
+        "is rolled back, so seeded tickets are never kept."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--page-sizes", type=int, nargs="+", default=[50, 500, 5000])
+        parser.add_argument("--fields", default="id,title,status,created_at")
+        parser.add_argument("--repeat", type=int, default=20)
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        fields = tuple(f for f in rows.FIELDS if f in options["fields"].split(","))
+        paths = [
+            ("serializer", self.serializer_path),
+            ("rows", lambda qs: self.rows_path(qs, rows.FIELDS)),
+            ("rows+fields", lambda qs: self.rows_path(qs, fields)),
+        ]
+        self.stdout.write(
+            f"{'page':>6} {'path':>12} {'p50 ms':>9} {'max ms':>9} "
+            f"{'rows/s':>10} {'KiB':>8}"
+        )
+
+        with transaction.atomic():
+            seed_tickets(TicketGenerator(options["seed"]), max(options["page_sizes"]))
+            for size in sorted(options["page_sizes"]):
+                queryset = Ticket.objects.order_by("-created_at", "-id")[:size]
+                baseline = None
+                for name, path in paths:
+                    timings, body = self.measure(path, queryset, options["repeat"])
+                    p50 = statistics.median(timings)
+                    baseline = baseline or p50
+                    self.stdout.write(
+                        f"{size:>6} {name:>12} {p50:>9.2f} {max(timings):>9.2f} "
+                        f"{size / p50 * 1000:>10.0f} {len(body) / 1024:>8.1f}"
+                        + ("" if p50 == baseline else f"  ({baseline / p50:.1f}x)")
+                    )
+            transaction.set_rollback(True)
+
+    def serializer_path(self, queryset):
+        data = TicketSerializer(list(queryset), many=True).data
+        return JSONRenderer().render(data)
+
+    def rows_path(self, queryset, fields):
+        data = rows.encode(rows.values(queryset, fields), fields)
+        return FastJSONRenderer().render(data)
+
+    def measure(self, path, queryset, repeat):
+        # Query, encode and render, as one uncached list page costs
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            body = path(queryset.all())
+            timings.append((time.perf_counter() - start) * 1000)
+        return timings, body
@@ -0,0 +1,161 @@
+import asyncio
+import itertools
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from tickets.llm_stub import StubLLMServer
+
+ENDPOINTS = {
+    "classify": ("POST", "/api/tickets/classify/"),
+    "list": ("GET", "/api/tickets/?page=1"),
+    "stats": ("GET", "/api/tickets/stats/"),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-test the API under gunicorn with sync (WSGI) and uvicorn (ASGI) "
+        "workers at the same worker count. Groq is replaced by a local stub "
+        "with --llm-latency, and every classify request uses a new description "
+        "so the result cache never answers. Uses the configured database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--interfaces", nargs="+", default=["wsgi", "asgi"])
+        parser.add_argument("--endpoints", nargs="+", default=list(ENDPOINTS))
+        parser.add_argument("--workers", type=int, default=2)
+        parser.add_argument("--concurrency", type=int, default=32)
+        parser.add_argument("--duration", type=float, default=10.0)
+        parser.add_argument("--llm-latency", type=float, default=0.3)
+        parser.add_argument("--port", type=int, default=8765)
+
+    def handle(self, *args, **options):
+        unknown = set(options["endpoints"]) - set(ENDPOINTS)
+        if unknown:
+            raise CommandError(f"Unknown endpoint(s): {', '.join(sorted(unknown))}")
+
+        self.stdout.write(
+            f"{options['workers']} worker(s), {options['concurrency']} concurrent "
+            f"clients, {options['duration']:.0f}s per run, "
+            f"LLM latency {options['llm_latency'] * 1000:.0f} ms"
+        )
+        self.stdout.write(
+            f"{'server':>6} {'endpoint':>9} {'req/s':>8} {'p50 ms':>8} "
+            f"{'p95 ms':>8} {'p99 ms':>8} {'errors':>7}"
+        )
+        with StubLLMServer(latency=options["llm_latency"]) as stub:
+            for interface in options["interfaces"]:
+                with self.server(interface, stub, options) as base_url:
+                    for endpoint in options["endpoints"]:
+                        stats = asyncio.run(self.load(base_url, endpoint, options))
+                        self.stdout.write(
+                            f"{interface:>6} {endpoint:>9} {stats['rps']:>8.1f} "
+                            f"{stats['p50']:>8.1f} {stats['p95']:>8.1f} "
+                            f"{stats['p99']:>8.1f} {stats['errors']:>7}"
+                        )
+
+    def server(self, interface, stub, options):
+        return _Gunicorn(
+            interface=interface,
+            port=options["port"],
+            workers=options["workers"],
+            env={
+                "GROQ_API_KEY": "bench",
+                "GROQ_BASE_URL": stub.base_url,
+                "GROQ_MAX_CONNECTIONS": str(options["concurrency"]),
+                "GROQ_MAX_KEEPALIVE": str(options["concurrency"]),
+            },
+        )
+
+    async def load(self, base_url, endpoint, options):
+        method, path = ENDPOINTS[endpoint]
+        counter = itertools.count()
+        latencies, errors = [], 0
+        limits = httpx.Limits(max_connections=options["concurrency"])
+        client = httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60)
+        async with client:
+
+            async def user():
+                nonlocal errors
+                deadline = time.monotonic() + options["duration"]
+                while time.monotonic() < deadline:
+                    kwargs = {}
+                    if method == "POST":
+                        description = f"Benchmark ticket {next(counter)} cannot log in"
+                        kwargs["json"] = {"description": description}
+                    start = time.perf_counter()
+                    try:
+                        response = await client.request(method, path, **kwargs)
+                        ok = response.status_code == 200
+                    except httpx.HTTPError:
+                        ok = False
+                    if ok:
+                        latencies.append((time.perf_counter() - start) * 1000)
+                    else:
+                        errors += 1
+
+            started = time.monotonic()
+            await asyncio.gather(*(user() for _ in range(options["concurrency"])))
+            elapsed = time.monotonic() - started
+
+        if len(latencies) < 2:
+            return {"rps": 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0, "errors": errors}
+        cuts = statistics.quantiles(latencies, n=100)
+        return {
+            "rps": len(latencies) / elapsed,
+            "p50": cuts[49],
+            "p95": cuts[94],
+            "p99": cuts[98],
+            "errors": errors,
+        }
+
+
+class _Gunicorn:
+    """Run ``gunicorn -c gunicorn.conf.py`` in a subprocess for one benchmark."""
+
+    def __init__(self, interface, port, workers, env):
+        self.interface = interface
+        self.base_url = f"http://127.0.0.1:{port}"
+        self.env = {
+            **os.environ,
+            **env,
+            "SERVER_INTERFACE": interface,
+            "GUNICORN_WORKERS": str(workers),
+            "GUNICORN_BIND": f"127.0.0.1:{port}",
+            "TICKET_ASYNC_VIEWS": "1" if interface == "asgi" else "0",
+        }
+
+    def __enter__(self):
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py"],
+            cwd=Path(settings.BASE_DIR),
+            env=self.env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise CommandError(f"gunicorn ({self.interface}) exited on startup.")
+            try:
+                httpx.get(f"{self.base_url}/api/tickets/stats/", timeout=1)
+                return self.base_url
+            except httpx.HTTPError:
+                time.sleep(0.2)
+        self.__exit__()
+        raise CommandError(f"gunicorn ({self.interface}) did not start within 30s.")
+
+    def __exit__(self, *exc):
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
@@ -0,0 +1,126 @@
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.migrations.executor import MigrationExecutor
+
+# pg_advisory_lock key, so containers starting together migrate one at a time
+MIGRATE_LOCK_ID = 0x7469636B
+
+
+def pending_migrations(connection):
+    """Unapplied migrations on ``connection``, in the order they would run."""
+    executor = MigrationExecutor(connection)
+    targets = executor.loader.graph.leaf_nodes()
+    return [migration for migration, _backwards in executor.migration_plan(targets)]
+
+
+def missing_schema(connection):
+    """Tables, views and columns of the tickets models that ``connection``
+    lacks, as ``table`` or ``table.column``. Non-empty when the recorded
+    migrations do not describe the real schema."""
+    introspection = connection.introspection
+    missing = []
+    with connection.cursor() as cursor:
+        tables = set(introspection.table_names(cursor, include_views=True))
+        for model in apps.get_app_config("tickets").get_models():
+            if model._meta.proxy:
+                continue
+            table = model._meta.db_table
+            if table not in tables:
+                missing.append(table)
+                continue
+            columns = {
+                column.name for column in introspection.get_table_description(cursor, table)
+            }
+            missing.extend(
+                f"{table}.{field.column}"
+                for field in model._meta.local_concrete_fields
+                if field.column not in columns
+            )
+    return missing
+
+
+class Command(BaseCommand):
+    help = (
+        "Prepare a web container in one process: apply migrations only when "
+        "some are unapplied, populate the stats rollups if they are empty, and "
+        "collect static files. It stops if the schema lacks tables or columns "
+        "the models need. --check only reports unapplied migrations and "
+        "missing schema."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--migrate",
+            choices=("auto", "always", "never"),
+            default=settings.BOOT["MIGRATE"],
+            help="auto (default) runs migrate only when migrations are unapplied.",
+        )
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Exit non-zero if migrations are unapplied or the schema is "
+            "incomplete; change nothing.",
+        )
+        parser.add_argument(
+            "--skip-static",
+            action="store_true",
+            default=not settings.BOOT["COLLECTSTATIC"],
+        )
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        connection = connections[options["database"]]
+        if options["check"]:
+            pending = pending_migrations(connection)
+            for migration in pending:
+                self.stdout.write(f"Unapplied: {migration.app_label}.{migration.name}")
+            if pending:
+                raise CommandError(f"{len(pending)} unapplied migration(s).")
+            self.check_schema(connection)
+            self.stdout.write("Schema is current.")
+            return
+
+        if options["migrate"] != "never":
+            self.migrate(connection, always=options["migrate"] == "always")
+            self.check_schema(connection)
+        call_command("rebuild_stats", if_empty=True, stdout=self.stdout)
+        if not options["skip_static"]:
+            call_command("collectstatic", interactive=False, verbosity=0)
+        self.stdout.write(f"Boot tasks done in {time.perf_counter() - start:.2f}s.")
+
+    def check_schema(self, connection):
+        missing = missing_schema(connection)
+        for name in missing:
+            self.stdout.write(f"Missing: {name}")
+        if missing:
+            raise CommandError(
+                f"{len(missing)} table(s) or column(s) missing although no migration "
+                "is unapplied; the recorded migrations do not match this database "
+                "(see 'Upgrading an existing database' in the README)."
+            )
+
+    def migrate(self, connection, always=False):
+        locked = connection.vendor == "postgresql"
+        if locked:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT pg_advisory_lock(%s)", [MIGRATE_LOCK_ID])
+        try:
+            # Checked under the lock: another container may have just migrated
+            pending = pending_migrations(connection)
+            if not pending and not always:
+                self.stdout.write("Schema is current; skipping migrate.")
+                return
+            self.stdout.write(f"Applying {len(pending)} migration(s)...")
+            call_command(
+                "migrate", database=connection.alias, interactive=False, stdout=self.stdout
+            )
+        finally:
+            if locked:
+                with connection.cursor() as cursor:
+                    cursor.execute("SELECT pg_advisory_unlock(%s)", [MIGRATE_LOCK_ID])
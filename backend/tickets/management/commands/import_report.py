@@ -0,0 +1,177 @@
+import os
+import re
+import subprocess
+import sys
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# What a worker imports before its first request: settings and apps
+# (django.setup), the WSGI handler and the URLconf with every view
+BOOT_IMPORTS = "import django; django.setup(); import config.wsgi, config.urls"
+# -X importtime only sees the import statement. Django loads settings, app
+# configs and models with importlib.import_module, so send absolute names
+# through __import__ to have them reported too.
+SCRIPT = """
+import importlib, sys
+_import_module = importlib.import_module
+def import_module(name, package=None):
+    if name.startswith("."):
+        return _import_module(name, package)
+    __import__(name)
+    return sys.modules[name]
+importlib.import_module = import_module
+""" + BOOT_IMPORTS
+# Imported on first use in a worker; by the master when gunicorn preloads
+LAZY_MODULES = ("groq",)
+
+LINE_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+@dataclass
+class Module:
+    name: str
+    self_us: int
+    cumulative_us: int
+    children: list = field(default_factory=list)
+    parent: "Module" = None
+
+
+def parse_importtime(text):
+    """Top-level modules of ``python -X importtime`` output, as trees.
+
+    The interpreter prints a module after the modules it imported, indented
+    one level (two spaces) deeper.
+    """
+    pending = {}  # depth -> modules waiting for their importer
+    for line in text.splitlines():
+        match = LINE_RE.match(line)
+        if match is None:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        depth = (len(indent) - 1) // 2
+        module = Module(name, int(self_us), int(cumulative_us))
+        module.children = pending.pop(depth + 1, [])
+        for child in module.children:
+            child.parent = module
+        pending.setdefault(depth, []).append(module)
+    return pending.get(0, [])
+
+
+def ms(microseconds):
+    return microseconds / 1000
+
+
+def walk(modules):
+    for module in modules:
+        yield module
+        yield from walk(module.children)
+
+
+def is_own(name, packages):
+    return any(name == package or name.startswith(package + ".") for package in packages)
+
+
+def summarize(roots, packages):
+    """Own time of ``packages`` and what they pull in, in microseconds."""
+    own = [module for module in walk(roots) if is_own(module.name, packages)]
+    # Imports of our code by code that is not ours: their cumulative times add up
+    entry = [m for m in own if m.parent is None or not is_own(m.parent.name, packages)]
+    pulled = [
+        (child, module)
+        for module in own
+        for child in module.children
+        if not is_own(child.name, packages)
+    ]
+    return {
+        "self_us": sum(module.self_us for module in own),
+        "cumulative_us": sum(module.cumulative_us for module in entry),
+        "modules": sorted(own, key=lambda module: -module.self_us),
+        "dependencies": sorted(pulled, key=lambda pair: -pair[0].cumulative_us),
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Run python -X importtime over a worker's boot imports and report the "
+        "time spent in the settings module and in the tickets app, the "
+        "dependencies they pull in, and lazily imported SDKs. Exits non-zero "
+        "when the settings or tickets budget is exceeded."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--settings-budget-ms",
+            type=float,
+            default=50.0,
+            help="Cumulative import time allowed for the settings module.",
+        )
+        parser.add_argument(
+            "--budget-ms",
+            type=float,
+            default=75.0,
+            help="Own (self) import time allowed for the tickets modules.",
+        )
+        parser.add_argument("--repeat", type=int, default=3, help="Runs; the fastest counts.")
+        parser.add_argument("--top", type=int, default=10)
+
+    def handle(self, *args, **options):
+        settings_module = os.environ.get("DJANGO_SETTINGS_MODULE", "config.settings")
+        runs = [self.run_importtime(settings_module) for _ in range(max(1, options["repeat"]))]
+        roots = min(runs, key=lambda run: sum(module.cumulative_us for module in run))
+        boot = [module for module in roots if module.name not in LAZY_MODULES]
+        lazy = [module for module in roots if module.name in LAZY_MODULES]
+
+        settings_us = sum(
+            module.cumulative_us for module in walk(boot) if module.name == settings_module
+        )
+        app = summarize(boot, ("tickets",))
+        total_us = sum(module.cumulative_us for module in boot)
+        self.stdout.write(f"Boot imports: {ms(total_us):.1f} ms ({BOOT_IMPORTS})")
+        self.stdout.write(
+            f"  {settings_module}: {ms(settings_us):.1f} ms "
+            f"(budget {options['settings_budget_ms']:.0f} ms)"
+        )
+        self.stdout.write(
+            f"  tickets own code: {ms(app['self_us']):.1f} ms "
+            f"(budget {options['budget_ms']:.0f} ms), "
+            f"{ms(app['cumulative_us']):.1f} ms with the imports it triggers"
+        )
+        self.stdout.write(f"\n{'tickets module':<40} {'self ms':>8} {'cumul. ms':>10}")
+        for module in app["modules"][: options["top"]]:
+            self.stdout.write(
+                f"{module.name:<40} {ms(module.self_us):>8.1f} {ms(module.cumulative_us):>10.1f}"
+            )
+        self.stdout.write(f"\n{'first imported by tickets':<40} {'cumul. ms':>8}  via")
+        for child, module in app["dependencies"][: options["top"]]:
+            self.stdout.write(f"{child.name:<40} {ms(child.cumulative_us):>8.1f}  {module.name}")
+        if lazy:
+            self.stdout.write("\nLazy imports (paid once by a preloading gunicorn master):")
+            for module in lazy:
+                self.stdout.write(f"  {module.name}: {ms(module.cumulative_us):.1f} ms")
+
+        over = []
+        if ms(settings_us) > options["settings_budget_ms"]:
+            over.append(f"{settings_module} {ms(settings_us):.1f} ms")
+        if ms(app["self_us"]) > options["budget_ms"]:
+            over.append(f"tickets {ms(app['self_us']):.1f} ms")
+        if over:
+            raise CommandError(f"Import time over budget: {', '.join(over)}.")
+
+    def run_importtime(self, settings_module):
+        # A missing optional SDK should not hide the rest of the report
+        script = SCRIPT + "".join(
+            f"\ntry:\n    import {name}\nexcept ImportError:\n    pass" for name in LAZY_MODULES
+        )
+        env = {**os.environ, "DJANGO_SETTINGS_MODULE": settings_module}
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", script],
+            cwd=settings.BASE_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode != 0:
+            raise CommandError(f"Importing the app failed:\n{result.stderr[-2000:]}")
+        return parse_importtime(result.stderr)
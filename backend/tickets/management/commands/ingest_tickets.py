@@ -0,0 +1,53 @@
+import json
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from tickets import ingest
+
+
+class Command(BaseCommand):
+    help = "Bulk-load tickets from an NDJSON or CSV file (or '-' for stdin)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Input file, or '-' to read stdin.")
+        parser.add_argument(
+            "--format",
+            dest="fmt",
+            choices=ingest.FORMATS,
+            help="Input format (default: inferred from the file extension).",
+        )
+        parser.add_argument("--batch-size", type=int, default=None)
+        parser.add_argument(
+            "--max-errors",
+            type=int,
+            default=None,
+            help="Number of row errors to print (all rows are still processed).",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        fmt = options["fmt"] or ("csv" if path.endswith(".csv") else "ndjson")
+
+        if path == "-":
+            result = self.load(sys.stdin.buffer, fmt, options)
+        else:
+            try:
+                with open(path, "rb") as stream:
+                    result = self.load(stream, fmt, options)
+            except OSError as exc:
+                raise CommandError(str(exc))
+
+        for error in result.errors:
+            self.stderr.write(f"line {error['line']}: {json.dumps(error['errors'])}")
+        self.stdout.write(
+            self.style.SUCCESS(f"Created {result.created} ticket(s)")
+            + f", {result.failed} row(s) rejected."
+        )
+
+    def load(self, stream, fmt, options):
+        return ingest.ingest(
+            ingest.iter_rows(stream, fmt),
+            batch_size=options["batch_size"],
+            max_errors=options["max_errors"],
+        )
@@ -0,0 +1,103 @@
+import statistics
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from tickets import duplicates
+from tickets.models import Ticket
+
+
+class Command(BaseCommand):
+    help = (
+        "Store MinHash signatures for tickets that lack one (bulk-ingested or "
+        "older rows), then build the duplicate index the way a worker does "
+        "and report its size and lookup latency."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=settings.TICKET_DUPLICATES["WINDOW_DAYS"],
+            help="Sign tickets created in the last N days.",
+        )
+        parser.add_argument("--all", action="store_true", help="Sign every ticket.")
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Recompute signatures that are already stored.",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        queryset = Ticket.objects.order_by("id")
+        if not options["all"]:
+            since = timezone.now() - timedelta(days=options["days"])
+            queryset = queryset.filter(created_at__gte=since)
+        if not options["force"]:
+            queryset = queryset.filter(signature__isnull=True)
+
+        start = time.perf_counter()
+        signed = 0
+        last_id = 0
+        while True:
+            batch = list(
+                queryset.filter(id__gt=last_id).only("id", "description")[
+                    : options["batch_size"]
+                ]
+            )
+            if not batch:
+                break
+            last_id = batch[-1].id
+            for ticket in batch:
+                sig = duplicates.signature(ticket.description)
+                ticket.signature = sig.tobytes() if sig is not None else None
+            # bulk_update skips the signals: a signature is not a ticket change
+            Ticket.objects.bulk_update(batch, ["signature"])
+            signed += len(batch)
+        self.stdout.write(f"Signed {signed} ticket(s) in {time.perf_counter() - start:.1f}s.")
+
+        index = duplicates.SignatureIndex(settings.TICKET_DUPLICATES["CAPACITY"])
+        start = time.perf_counter()
+        duplicates.load(index)
+        built = time.perf_counter() - start
+        size = sum(
+            a.itemsize * len(a)
+            for a in (
+                index.signatures,
+                index.ids,
+                index.roots,
+                index.seq,
+                index.categories,
+                index.priorities,
+                index.node_keys,
+                index.next,
+            )
+        )
+        self.stdout.write(
+            f"Indexed {len(index)} ticket(s) from the last "
+            f"{settings.TICKET_DUPLICATES['WINDOW_DAYS']} day(s) in {built:.2f}s "
+            f"({size / 2**20:.1f} MiB of arrays, {len(index.heads)} buckets)."
+        )
+
+        sample = list(
+            Ticket.objects.filter(pk__in=list(index.positions)[-200:]).values_list(
+                "description", flat=True
+            )
+        )
+        timings = []
+        threshold = settings.TICKET_DUPLICATES["THRESHOLD"]
+        for description in sample:
+            start = time.perf_counter()
+            sig = duplicates.signature(description)
+            if sig is not None:
+                index.query(sig, threshold)
+            timings.append((time.perf_counter() - start) * 1e6)
+        if timings:
+            self.stdout.write(
+                f"Lookup (sign + query) over {len(timings)} indexed descriptions: "
+                f"p50 {statistics.median(timings):.0f}us, max {max(timings):.0f}us."
+            )
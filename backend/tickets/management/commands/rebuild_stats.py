@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from tickets import rollups
+from tickets.models import AnyTicket, TicketStat
+
+
+class Command(BaseCommand):
+    help = "Rebuild or verify the TicketStat rollup table used by the stats endpoint."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Only compare rollups with the tickets; exit non-zero on drift.",
+        )
+        parser.add_argument(
+            "--if-empty",
+            action="store_true",
+            help="Rebuild only when the rollup table is empty but tickets exist.",
+        )
+
+    def handle(self, *args, **options):
+        if options["check"]:
+            drift = rollups.check()
+            for (day, category, priority, status), stored, actual in drift:
+                self.stdout.write(
+                    f"{day} {category}/{priority}/{status}: "
+                    f"stored={stored} actual={actual}"
+                )
+            if drift:
+                raise CommandError(f"{len(drift)} rollup bucket(s) out of sync.")
+            self.stdout.write(self.style.SUCCESS("Rollups are consistent."))
+            return
+
+        if options["if_empty"] and (
+            TicketStat.objects.exists() or not AnyTicket.objects.exists()
+        ):
+            self.stdout.write("Rollups already populated, skipping rebuild.")
+            return
+
+        buckets = rollups.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {buckets} rollup bucket(s)."))
@@ -0,0 +1,101 @@
+import logging
+import signal
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, close_old_connections
+
+from tickets import jobs
+
+logger = logging.getLogger(__name__)
+
+MAINTENANCE_INTERVAL = 30
+
+
+class Command(BaseCommand):
+    help = "Process queued asynchronous classification jobs."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=settings.CLASSIFY_JOBS["CONCURRENCY"],
+            help="Jobs classified in parallel (threads).",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=settings.CLASSIFY_JOBS["POLL_INTERVAL"],
+            help="Seconds to sleep when the queue is empty.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Drain the queue and exit instead of polling forever.",
+        )
+
+    def handle(self, *args, **options):
+        concurrency = max(1, options["concurrency"])
+        self.stopping = False
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+
+        # With one thread, run jobs inline on the command's own connection
+        executor = ThreadPoolExecutor(concurrency) if concurrency > 1 else None
+        running = set()
+        processed = 0
+        last_maintenance = 0.0
+        try:
+            while not self.stopping:
+                if time.monotonic() - last_maintenance > MAINTENANCE_INTERVAL:
+                    last_maintenance = time.monotonic()
+                    self._maintain()
+
+                running = {future for future in running if not future.done()}
+                try:
+                    claimed = jobs.claim(concurrency - len(running))
+                except DatabaseError:
+                    logger.exception("Could not claim classification jobs.")
+                    claimed = []
+                for job in claimed:
+                    if executor is None:
+                        self._run(job)
+                    else:
+                        running.add(executor.submit(self._run_in_thread, job))
+                processed += len(claimed)
+
+                if options["once"] and not claimed and not running:
+                    break
+                if not claimed:
+                    time.sleep(options["poll_interval"])
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True)
+        self.stdout.write(f"Processed {processed} classification job(s).")
+
+    def _stop(self, signum, frame):
+        logger.info("Stopping after in-flight classification jobs finish.")
+        self.stopping = True
+
+    def _maintain(self):
+        try:
+            jobs.recover_stale()
+            jobs.purge_expired()
+        except DatabaseError:
+            logger.exception("Classification job maintenance failed.")
+
+    def _run(self, job):
+        try:
+            jobs.run(job)
+        except Exception:
+            # Left in "running"; recover_stale() re-queues it later
+            logger.exception("Classification job %s failed.", job.id)
+
+    def _run_in_thread(self, job):
+        try:
+            self._run(job)
+        finally:
+            # Each pool thread holds its own connection; honour CONN_MAX_AGE
+            close_old_connections()
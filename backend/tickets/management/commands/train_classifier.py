@@ -0,0 +1,112 @@
+import statistics
+import time
+import zlib
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from tickets import local_model
+from tickets.models import Ticket
+
+
+class Command(BaseCommand):
+    help = (
+        "Train the local ticket classifier (tickets.local_model) from the "
+        "categories and priorities of stored tickets, report its accuracy and "
+        "latency on a held-out split, and write the versioned artifact."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output",
+            default=None,
+            help="Artifact path (default: TICKET_CLASSIFIER['MODEL_PATH']).",
+        )
+        parser.add_argument("--hash-bits", type=int, default=18)
+        parser.add_argument("--alpha", type=float, default=1.0)
+        parser.add_argument(
+            "--holdout",
+            type=float,
+            default=0.1,
+            help="Fraction of tickets held out for evaluation, chosen by id.",
+        )
+        parser.add_argument("--min-tickets", type=int, default=100)
+
+    def handle(self, *args, **options):
+        output = options["output"] or str(settings.TICKET_CLASSIFIER["MODEL_PATH"])
+        cutoff = int(options["holdout"] * 1000)
+        trainer = local_model.Trainer(
+            {"category": Ticket.Category.values, "priority": Ticket.Priority.values},
+            hash_bits=options["hash_bits"],
+            alpha=options["alpha"],
+        )
+        held_out = []
+
+        started = time.perf_counter()
+        tickets = Ticket.objects.values_list(
+            "id", "description", "category", "priority"
+        ).iterator(chunk_size=2000)
+        for pk, description, category, priority in tickets:
+            sample = (description, {"category": category, "priority": priority})
+            # Hash the id so the split is stable across runs and not by age
+            if zlib.crc32(str(pk).encode()) % 1000 < cutoff:
+                held_out.append(sample)
+            else:
+                trainer.add(*sample)
+        if trainer.samples < options["min_tickets"]:
+            raise CommandError(
+                f"{trainer.samples} training tickets; need at least "
+                f"{options['min_tickets']} (see --min-tickets)."
+            )
+
+        trained_at = datetime.now(timezone.utc)
+        header = trainer.save(
+            output,
+            {
+                "version": trained_at.strftime("%Y%m%dT%H%M%SZ"),
+                "trained_at": trained_at.isoformat(),
+                "held_out": len(held_out),
+            },
+        )
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f"Trained version {header['version']} on {trainer.samples} tickets "
+            f"in {elapsed:.1f}s -> {output}"
+        )
+        if held_out:
+            self.report(local_model.LocalModel(output), held_out)
+
+    def report(self, model, samples):
+        threshold = settings.TICKET_CLASSIFIER["MIN_CONFIDENCE"]
+        hits = {"category": 0, "priority": 0}
+        confident = confident_hits = 0
+        timings = []
+        for description, targets in samples:
+            start = time.perf_counter()
+            prediction = model.predict(description)
+            timings.append((time.perf_counter() - start) * 1000)
+            correct = True
+            for head in local_model.HEADS:
+                if getattr(prediction, head) == targets[head]:
+                    hits[head] += 1
+                else:
+                    correct = False
+            if prediction.confidence >= threshold:
+                confident += 1
+                confident_hits += correct
+
+        total = len(samples)
+        self.stdout.write(f"Held-out tickets: {total}")
+        for head in local_model.HEADS:
+            self.stdout.write(f"  {head} accuracy: {hits[head] / total:.3f}")
+        self.stdout.write(
+            f"  confidence >= {threshold}: {confident / total:.1%} of tickets, "
+            f"both heads correct on "
+            f"{confident_hits / confident if confident else 0.0:.3f} of them"
+        )
+        quantiles = statistics.quantiles(timings, n=100) if total > 1 else timings * 99
+        self.stdout.write(
+            f"  latency ms: p50 {statistics.median(timings):.3f} "
+            f"p99 {quantiles[98]:.3f} max {max(timings):.3f}"
+        )
@@ -0,0 +1,247 @@
+"""In-process request metrics, exposed at ``/metrics`` in Prometheus text format.
+
+``RequestMetricsMiddleware`` (tickets.middleware) opens a ``RequestStats``
+for each request in a context variable. While it is open:
+
+- every SQL statement on any connection is counted and timed (``_record_query``
+  is installed on each new connection, including the ones ``sync_to_async``
+  threads use for the async views),
+- ``phase("serialize")`` blocks (row encoding, JSON rendering) and
+  ``llm_call`` blocks (Groq round trips, retries included) add their time.
+
+When the request finishes its totals go into histograms labelled by view:
+the viewset action (``list``, ``stats``, ``classify``, ``partial_update``...)
+or the URL name for other views. Phases can overlap: queries run while
+rendering count towards both ``db`` and ``serialize``.
+
+Histograms live in the worker process, so each gunicorn worker reports its
+own; every sample carries a ``pid`` label to keep the series apart. Requests
+slower than ``REQUEST_METRICS['SLOW_REQUEST_SECONDS']`` are logged with their
+slowest SQL statements (without parameters).
+"""
+import heapq
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """A Prometheus histogram with fixed buckets, one series per label set."""
+
+    def __init__(self, name, documentation, labelnames, buckets=SECONDS_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}  # label values -> [count per bucket..., +Inf, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+    def render(self, constant=""):
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            series = sorted((labels, list(values)) for labels, values in self._series.items())
+        for labels, values in series:
+            pairs = "".join(
+                f'{name}="{_escape(value)}",'
+                for name, value in zip(self.labelnames, labels)
+            )
+            pairs += constant
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), values):
+                cumulative += count
+                yield f'{self.name}_bucket{{{pairs},le="{bound}"}} {cumulative}'
+            yield f"{self.name}_sum{{{pairs}}} {_number(values[-1])}"
+            yield f"{self.name}_count{{{pairs}}} {cumulative}"
+
+
+REQUEST_SECONDS = Histogram(
+    "tickets_request_duration_seconds",
+    "Wall time from the first middleware until the response is returned.",
+    ("view", "method", "status"),
+)
+REQUEST_QUERIES = Histogram(
+    "tickets_request_db_queries",
+    "SQL statements executed per request.",
+    ("view",),
+    buckets=QUERY_BUCKETS,
+)
+REQUEST_PHASE_SECONDS = Histogram(
+    "tickets_request_phase_seconds",
+    "Time per request spent in the database, serializing and waiting on the LLM.",
+    ("view", "phase"),
+)
+LLM_SECONDS = Histogram(
+    "tickets_llm_request_duration_seconds",
+    "Groq chat completion latency, retries included.",
+    ("mode", "outcome"),
+)
+HISTOGRAMS = (REQUEST_SECONDS, REQUEST_QUERIES, REQUEST_PHASE_SECONDS, LLM_SECONDS)
+
+
+@dataclass
+class RequestStats:
+    started: float = field(default_factory=time.perf_counter)
+    queries: int = 0
+    phases: Counter = field(default_factory=Counter)
+    slowest_sql: list = field(default_factory=list)  # min-heap of (seconds, sql)
+    # Batch classification adds LLM time from several threads at once
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+
+_current = ContextVar("tickets_request_stats", default=None)
+
+
+def enabled() -> bool:
+    return settings.REQUEST_METRICS["ENABLED"]
+
+
+def start_request():
+    """Open a ``RequestStats``; pass the token to ``finish_request``."""
+    stats = RequestStats()
+    return stats, _current.set(stats)
+
+
+def _add(phase, seconds):
+    stats = _current.get()
+    if stats is not None:
+        with stats.lock:
+            stats.phases[phase] += seconds
+
+
+@contextmanager
+def phase(name):
+    """Add the time spent in the block to the current request's ``name`` phase."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _add(name, time.perf_counter() - start)
+
+
+@contextmanager
+def llm_call(mode):
+    """Time a Groq call: an ``llm`` phase plus an ``LLM_SECONDS`` sample."""
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    finally:
+        elapsed = time.perf_counter() - start
+        _add("llm", elapsed)
+        LLM_SECONDS.observe(elapsed, mode, outcome)
+
+
+def _record_query(execute, sql, params, many, context):
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = time.perf_counter() - start
+        entry = (elapsed, sql)
+        with stats.lock:
+            stats.queries += 1
+            stats.phases["db"] += elapsed
+            if len(stats.slowest_sql) < settings.REQUEST_METRICS["SLOW_REQUEST_MAX_QUERIES"]:
+                heapq.heappush(stats.slowest_sql, entry)
+            elif stats.slowest_sql and entry > stats.slowest_sql[0]:
+                heapq.heapreplace(stats.slowest_sql, entry)
+
+
+def install(sender=None, connection=None, **kwargs):
+    """``connection_created`` receiver: time every statement on ``connection``."""
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+def view_label(request) -> str:
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "unmatched"
+    actions = getattr(match.func, "actions", None)
+    if actions:
+        return actions.get(request.method.lower(), request.method.lower())
+    return match.view_name
+
+
+def finish_request(request, response, stats, token):
+    _current.reset(token)
+    elapsed = time.perf_counter() - stats.started
+    view = view_label(request)
+    REQUEST_SECONDS.observe(elapsed, view, request.method, str(response.status_code))
+    REQUEST_QUERIES.observe(stats.queries, view)
+    REQUEST_PHASE_SECONDS.observe(stats.phases["db"], view, "db")
+    for name in ("serialize", "llm"):
+        if name in stats.phases:
+            REQUEST_PHASE_SECONDS.observe(stats.phases[name], view, name)
+
+    if elapsed >= settings.REQUEST_METRICS["SLOW_REQUEST_SECONDS"]:
+        statements = "".join(
+            f"\n  {seconds * 1000:8.1f} ms  {sql}"
+            for seconds, sql in sorted(stats.slowest_sql, reverse=True)
+        )
+        logger.warning(
+            "Slow request %s %s (%s) %d in %.3fs: %d queries %.3fs, "
+            "serialize %.3fs, llm %.3fs%s",
+            request.method,
+            request.path,
+            view,
+            response.status_code,
+            elapsed,
+            stats.queries,
+            stats.phases["db"],
+            stats.phases["serialize"],
+            stats.phases["llm"],
+            statements,
+        )
+
+
+def render() -> str:
+    """All histograms in the Prometheus text exposition format."""
+    constant = f'pid="{os.getpid()}"'
+    lines = [line for histogram in HISTOGRAMS for line in histogram.render(constant)]
+    return "\n".join(lines) + "\n"
+
+
+def reset() -> None:
+    for histogram in HISTOGRAMS:
+        histogram.clear()
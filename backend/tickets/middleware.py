@@ -0,0 +1,77 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from . import metrics, replicas
+
+
+class RequestMetricsMiddleware:
+    """Record per-view timings, query counts and slow requests (tickets.metrics).
+
+    Sync and async capable, so the async views are not pushed into a thread.
+    Streaming responses are timed until they are returned, not until the
+    stream ends.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if not metrics.enabled():
+            return self.get_response(request)
+        stats, token = metrics.start_request()
+        response = self.get_response(request)
+        metrics.finish_request(request, response, stats, token)
+        return response
+
+    async def __acall__(self, request):
+        if not metrics.enabled():
+            return await self.get_response(request)
+        stats, token = metrics.start_request()
+        response = await self.get_response(request)
+        metrics.finish_request(request, response, stats, token)
+        return response
+
+
+class ReplicaRoutingMiddleware:
+    """Scope tickets.replicas read routing to the request, and pin a client
+    that just wrote to the primary for ``DATABASE_ROUTING['STICKY_SECONDS']``.
+
+    Streaming responses (export) bind their queryset to the chosen database
+    before they are returned.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        token = replicas.start_request(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            replicas.finish_request(token)
+        replicas.pin(request, response)
+        return response
+
+    async def __acall__(self, request):
+        token = replicas.start_request(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            replicas.finish_request(token)
+        replicas.pin(request, response)
+        return response
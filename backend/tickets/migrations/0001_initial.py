@@ -0,0 +1,42 @@
+# Generated by Django 4.2.30 on 2026-10-17 08:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Ticket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(db_index=True, max_length=200)),
+                ('description', models.TextField()),
+                ('category', models.CharField(choices=[('billing', 'Billing'), ('technical', 'Technical'), ('account', 'Account'), ('general', 'General')], db_index=True, default='general', max_length=50)),
+                ('priority', models.CharField(choices=[('low', 'Low'), ('medium', 'Medium'), ('high', 'High'), ('critical', 'Critical')], db_index=True, default='low', max_length=50)),
+                ('status', models.CharField(choices=[('open', 'Open'), ('in_progress', 'In Progress'), ('resolved', 'Resolved'), ('closed', 'Closed')], db_index=True, default='open', max_length=50)),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['category', 'priority'], name='tickets_tic_categor_dd40cd_idx'), models.Index(fields=['status', 'created_at'], name='tickets_tic_status_8acd21_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='ticket',
+            constraint=models.CheckConstraint(check=models.Q(('category__in', ['billing', 'technical', 'account', 'general'])), name='valid_category'),
+        ),
+        migrations.AddConstraint(
+            model_name='ticket',
+            constraint=models.CheckConstraint(check=models.Q(('priority__in', ['low', 'medium', 'high', 'critical'])), name='valid_priority'),
+        ),
+        migrations.AddConstraint(
+            model_name='ticket',
+            constraint=models.CheckConstraint(check=models.Q(('status__in', ['open', 'in_progress', 'resolved', 'closed'])), name='valid_status'),
+        ),
+    ]
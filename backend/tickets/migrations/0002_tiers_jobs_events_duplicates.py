@@ -0,0 +1,167 @@
+# Generated by Django 4.2.30 on 2026-10-17 08:54
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnyTicket',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('title', models.CharField(max_length=200)),
+                ('description', models.TextField()),
+                ('category', models.CharField(choices=[('billing', 'Billing'), ('technical', 'Technical'), ('account', 'Account'), ('general', 'General')], max_length=50)),
+                ('priority', models.CharField(choices=[('low', 'Low'), ('medium', 'Medium'), ('high', 'High'), ('critical', 'Critical')], max_length=50)),
+                ('status', models.CharField(choices=[('open', 'Open'), ('in_progress', 'In Progress'), ('resolved', 'Resolved'), ('closed', 'Closed')], max_length=50)),
+                ('created_at', models.DateTimeField()),
+                ('duplicate_of', models.BigIntegerField(blank=True, db_column='duplicate_of_id', null=True)),
+            ],
+            options={
+                'db_table': 'tickets_anyticket',
+                'ordering': ['-created_at'],
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedTicket',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('title', models.CharField(max_length=200)),
+                ('description', models.TextField()),
+                ('category', models.CharField(choices=[('billing', 'Billing'), ('technical', 'Technical'), ('account', 'Account'), ('general', 'General')], max_length=50)),
+                ('priority', models.CharField(choices=[('low', 'Low'), ('medium', 'Medium'), ('high', 'High'), ('critical', 'Critical')], max_length=50)),
+                ('status', models.CharField(choices=[('open', 'Open'), ('in_progress', 'In Progress'), ('resolved', 'Resolved'), ('closed', 'Closed')], max_length=50)),
+                ('created_at', models.DateTimeField()),
+                ('duplicate_of', models.BigIntegerField(blank=True, db_column='duplicate_of_id', null=True)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ClassificationJob',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('description', models.TextField()),
+                ('cache_key', models.CharField(max_length=100)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('done', 'Done')], default='pending', max_length=20)),
+                ('result', models.JSONField(blank=True, null=True)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('expires_at', models.DateTimeField(db_index=True)),
+            ],
+            options={
+                'ordering': ['created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='TicketEvent',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('kind', models.CharField(choices=[('created', 'Created'), ('updated', 'Updated'), ('deleted', 'Deleted'), ('bulk_created', 'Bulk created'), ('bulk_updated', 'Bulk updated')], max_length=20)),
+                ('ticket_id', models.IntegerField(blank=True, null=True)),
+                ('ticket', models.JSONField(blank=True, null=True)),
+                ('stats', models.JSONField(default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                'ordering': ['id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='TicketStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('category', models.CharField(choices=[('billing', 'Billing'), ('technical', 'Technical'), ('account', 'Account'), ('general', 'General')], max_length=50)),
+                ('priority', models.CharField(choices=[('low', 'Low'), ('medium', 'Medium'), ('high', 'High'), ('critical', 'Critical')], max_length=50)),
+                ('status', models.CharField(choices=[('open', 'Open'), ('in_progress', 'In Progress'), ('resolved', 'Resolved'), ('closed', 'Closed')], max_length=50)),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['day'],
+            },
+        ),
+        migrations.RemoveIndex(
+            model_name='ticket',
+            name='tickets_tic_categor_dd40cd_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='ticket',
+            name='tickets_tic_status_8acd21_idx',
+        ),
+        migrations.AddField(
+            model_name='ticket',
+            name='duplicate_of',
+            field=models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='duplicates', to='tickets.ticket'),
+        ),
+        migrations.AddField(
+            model_name='ticket',
+            name='signature',
+            field=models.BinaryField(null=True),
+        ),
+        migrations.AlterField(
+            model_name='ticket',
+            name='category',
+            field=models.CharField(choices=[('billing', 'Billing'), ('technical', 'Technical'), ('account', 'Account'), ('general', 'General')], default='general', max_length=50),
+        ),
+        migrations.AlterField(
+            model_name='ticket',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True),
+        ),
+        migrations.AlterField(
+            model_name='ticket',
+            name='priority',
+            field=models.CharField(choices=[('low', 'Low'), ('medium', 'Medium'), ('high', 'High'), ('critical', 'Critical')], default='low', max_length=50),
+        ),
+        migrations.AlterField(
+            model_name='ticket',
+            name='status',
+            field=models.CharField(choices=[('open', 'Open'), ('in_progress', 'In Progress'), ('resolved', 'Resolved'), ('closed', 'Closed')], default='open', max_length=50),
+        ),
+        migrations.AlterField(
+            model_name='ticket',
+            name='title',
+            field=models.CharField(max_length=200),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['status', '-created_at', '-id'], name='ticket_status_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['created_at', 'category', 'priority', 'status'], name='ticket_created_buckets_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='ticketstat',
+            constraint=models.UniqueConstraint(fields=('day', 'category', 'priority', 'status'), name='unique_ticket_stat_bucket'),
+        ),
+        migrations.AddIndex(
+            model_name='classificationjob',
+            index=models.Index(fields=['status', 'created_at'], name='tickets_cla_status_58e6a6_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='classificationjob',
+            constraint=models.UniqueConstraint(condition=models.Q(('status__in', ['pending', 'running'])), fields=('cache_key',), name='unique_inflight_classification'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedticket',
+            index=models.Index(fields=['status', '-created_at', '-id'], name='archived_status_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedticket',
+            index=models.Index(fields=['created_at', 'category', 'priority', 'status'], name='archived_created_buckets_idx'),
+        ),
+    ]
@@ -0,0 +1,150 @@
+"""Database objects the models do not describe.
+
+- Full-text search indexes (``tickets.search``): on PostgreSQL a generated,
+  weighted ``tsvector`` column with a GIN index on each ticket table; on
+  SQLite an external-content FTS5 table per ticket table, kept in sync by
+  triggers and filled from the existing rows.
+- ``tickets_anyticket`` (``tickets.archive``): a ``UNION ALL`` view over
+  the hot and archived ticket tables. On PostgreSQL it passes the search
+  column through, so searches use each table's GIN index.
+
+A later migration that alters ``tickets_ticket`` or
+``tickets_archivedticket`` must drop the view (and on SQLite, where
+altering a table rebuilds it, the FTS triggers) first and recreate them
+after.
+"""
+import logging
+
+from django.db import OperationalError, migrations
+
+logger = logging.getLogger(__name__)
+
+TABLES = ("tickets_ticket", "tickets_archivedticket")
+VIEW_COLUMNS = (
+    "id, title, description, category, priority, status, created_at, duplicate_of_id"
+)
+
+
+class VendorRunSQL(migrations.RunSQL):
+    """``RunSQL`` applied only on the ``vendors`` databases, or on all but
+    the ``other_than`` ones."""
+
+    def __init__(self, sql, reverse_sql, vendors=(), other_than=()):
+        super().__init__(sql, reverse_sql)
+        self.vendors = vendors
+        self.other_than = other_than
+
+    def applies(self, connection):
+        if self.vendors:
+            return connection.vendor in self.vendors
+        return connection.vendor not in self.other_than
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if self.applies(schema_editor.connection):
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if self.applies(schema_editor.connection):
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+
+
+class SQLiteFTS(VendorRunSQL):
+    """The FTS5 tables, skipped with an error logged when SQLite was built
+    without FTS5. Searches then fail until ``TICKET_SEARCH_BACKEND`` is set
+    to ``tickets.search.BasicSearchBackend`` or the extension is available."""
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        try:
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+        except OperationalError as exc:
+            if "no such module" not in str(exc):
+                raise
+            logger.error("Could not create the ticket search index: %s", exc)
+
+
+def postgres_search(table):
+    return [
+        f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS search_vector tsvector "
+        "GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(description, '')), 'B')"
+        ") STORED",
+        f"CREATE INDEX IF NOT EXISTS {table}_search_gin ON {table} USING gin (search_vector)",
+    ]
+
+
+def drop_postgres_search(table):
+    return [
+        f"DROP INDEX IF EXISTS {table}_search_gin",
+        f"ALTER TABLE {table} DROP COLUMN IF EXISTS search_vector",
+    ]
+
+
+def sqlite_fts(table):
+    fts = f"{table}_fts"
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+        f"title, description, content='{table}', content_rowid='id')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {fts}(rowid, title, description) "
+        "VALUES (new.id, new.title, new.description); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, title, description) "
+        "VALUES ('delete', old.id, old.title, old.description); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE ON {table} "
+        "WHEN old.title IS NOT new.title "
+        "OR old.description IS NOT new.description BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, title, description) "
+        "VALUES ('delete', old.id, old.title, old.description); "
+        f"INSERT INTO {fts}(rowid, title, description) "
+        "VALUES (new.id, new.title, new.description); END",
+        # Index the tickets that predate the FTS table
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    ]
+
+
+def drop_sqlite_fts(table):
+    fts = f"{table}_fts"
+    return [
+        *(f"DROP TRIGGER IF EXISTS {fts}_{suffix}" for suffix in ("ai", "ad", "au")),
+        f"DROP TABLE IF EXISTS {fts}",
+    ]
+
+
+def anyticket_view(columns):
+    return [
+        # Left behind by the post_migrate handler that used to create it
+        "DROP VIEW IF EXISTS tickets_anyticket",
+        f"CREATE VIEW tickets_anyticket AS "
+        f"SELECT {columns} FROM {TABLES[0]} UNION ALL SELECT {columns} FROM {TABLES[1]}",
+    ]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0002_tiers_jobs_events_duplicates'),
+    ]
+
+    operations = [
+        VendorRunSQL(
+            [sql for table in TABLES for sql in postgres_search(table)],
+            [sql for table in TABLES for sql in drop_postgres_search(table)],
+            vendors=("postgresql",),
+        ),
+        SQLiteFTS(
+            [sql for table in TABLES for sql in sqlite_fts(table)],
+            [sql for table in TABLES for sql in drop_sqlite_fts(table)],
+            vendors=("sqlite",),
+        ),
+        VendorRunSQL(
+            anyticket_view(f"{VIEW_COLUMNS}, search_vector"),
+            "DROP VIEW IF EXISTS tickets_anyticket",
+            vendors=("postgresql",),
+        ),
+        VendorRunSQL(
+            anyticket_view(VIEW_COLUMNS),
+            "DROP VIEW IF EXISTS tickets_anyticket",
+            other_than=("postgresql",),
+        ),
+    ]
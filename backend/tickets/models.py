@@ -1,3 +1,5 @@
+import uuid
+
 from django.db import models
 
 
@@ -20,24 +22,46 @@ class Ticket(models.Model):
         RESOLVED = 'resolved', 'Resolved'
         CLOSED = 'closed', 'Closed'
 
-    title = models.CharField(max_length=200, db_index=True)
+    title = models.CharField(max_length=200)
     description = models.TextField()
     category = models.CharField(
-        max_length=50, choices=Category.choices, default=Category.GENERAL, db_index=True
+        max_length=50, choices=Category.choices, default=Category.GENERAL
     )
     priority = models.CharField(
-        max_length=50, choices=Priority.choices, default=Priority.LOW, db_index=True
+        max_length=50, choices=Priority.choices, default=Priority.LOW
     )
     status = models.CharField(
-        max_length=50, choices=Status.choices, default=Status.OPEN, db_index=True
+        max_length=50, choices=Status.choices, default=Status.OPEN
     )
-    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    # Set at creation when tickets.duplicates finds a near-identical recent
+    # ticket. No database constraint: the target may have been archived.
+    duplicate_of = models.ForeignKey(
+        'self',
+        null=True,
+        blank=True,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name='duplicates',
+    )
+    # MinHash of the description (tickets.duplicates)
+    signature = models.BinaryField(null=True, editable=False)
 
     class Meta:
         ordering = ['-created_at']
+        # Shaped after the list queries (newest first, keyset on created_at
+        # and id) instead of one index per low-selectivity enum column
         indexes = [
-            models.Index(fields=['category', 'priority']),
-            models.Index(fields=['status', 'created_at']),
+            # Any ?status= list (triage filters included), resolved/closed too
+            models.Index(
+                fields=['status', '-created_at', '-id'], name='ticket_status_recent_idx'
+            ),
+            # Covers windowed stats (tickets.windows): a created_at range
+            # grouped by the bucket columns never reads the table
+            models.Index(
+                fields=['created_at', 'category', 'priority', 'status'],
+                name='ticket_created_buckets_idx',
+            ),
         ]
         constraints = [
             models.CheckConstraint(
@@ -56,3 +80,155 @@ class Ticket(models.Model):
 
     def __str__(self):
         return f"{self.title} ({self.status})"
+
+
+class ArchivedTicket(models.Model):
+    """Resolved or closed ticket moved out of the hot table by ``tickets.archive``.
+
+    Keeps the ticket's id. Archived tickets are read-only and still counted
+    by the stats rollups.
+    """
+
+    id = models.BigIntegerField(primary_key=True)
+    title = models.CharField(max_length=200)
+    description = models.TextField()
+    category = models.CharField(max_length=50, choices=Ticket.Category.choices)
+    priority = models.CharField(max_length=50, choices=Ticket.Priority.choices)
+    status = models.CharField(max_length=50, choices=Ticket.Status.choices)
+    created_at = models.DateTimeField()
+    duplicate_of = models.BigIntegerField(null=True, blank=True, db_column='duplicate_of_id')
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(
+                fields=['status', '-created_at', '-id'], name='archived_status_recent_idx'
+            ),
+            models.Index(
+                fields=['created_at', 'category', 'priority', 'status'],
+                name='archived_created_buckets_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.title} ({self.status}, archived)"
+
+
+class AnyTicket(models.Model):
+    """Hot and archived tickets together (``?include_archived=1``).
+
+    A read-only ``UNION ALL`` view over ``Ticket`` and ``ArchivedTicket``,
+    created by migration ``0003_search_index_and_anyticket_view``.
+    """
+
+    id = models.BigIntegerField(primary_key=True)
+    title = models.CharField(max_length=200)
+    description = models.TextField()
+    category = models.CharField(max_length=50, choices=Ticket.Category.choices)
+    priority = models.CharField(max_length=50, choices=Ticket.Priority.choices)
+    status = models.CharField(max_length=50, choices=Ticket.Status.choices)
+    created_at = models.DateTimeField()
+    duplicate_of = models.BigIntegerField(null=True, blank=True, db_column='duplicate_of_id')
+
+    class Meta:
+        managed = False
+        db_table = 'tickets_anyticket'
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.title} ({self.status})"
+
+
+class TicketStat(models.Model):
+    """Rollup counter of tickets per (day, category, priority, status) bucket.
+
+    Maintained incrementally by ``tickets.rollups`` so the stats endpoint
+    reads a table bounded by the number of active days, not by ticket volume.
+    """
+
+    day = models.DateField()
+    category = models.CharField(max_length=50, choices=Ticket.Category.choices)
+    priority = models.CharField(max_length=50, choices=Ticket.Priority.choices)
+    status = models.CharField(max_length=50, choices=Ticket.Status.choices)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ['day']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['day', 'category', 'priority', 'status'],
+                name='unique_ticket_stat_bucket',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.category}/{self.priority}/{self.status}: {self.count}"
+
+
+class ClassificationJob(models.Model):
+    """Queued LLM classification, processed by ``run_classification_worker``."""
+
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'Pending'
+        RUNNING = 'running', 'Running'
+        DONE = 'done', 'Done'
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    description = models.TextField()
+    # Classification cache key; identical in-flight descriptions share a job
+    cache_key = models.CharField(max_length=100)
+    status = models.CharField(
+        max_length=20, choices=Status.choices, default=Status.PENDING
+    )
+    result = models.JSONField(null=True, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['cache_key'],
+                condition=models.Q(status__in=['pending', 'running']),
+                name='unique_inflight_classification',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.id} ({self.status})"
+
+
+class TicketEvent(models.Model):
+    """Append-only log of ticket changes, streamed by the live update feed.
+
+    Rows are written by ``tickets.events`` after each ticket write commits and
+    pruned after ``TICKET_EVENTS['RETENTION']`` seconds.
+    """
+
+    class Kind(models.TextChoices):
+        CREATED = 'created', 'Created'
+        UPDATED = 'updated', 'Updated'
+        DELETED = 'deleted', 'Deleted'
+        BULK_CREATED = 'bulk_created', 'Bulk created'
+        BULK_UPDATED = 'bulk_updated', 'Bulk updated'
+
+    id = models.BigAutoField(primary_key=True)
+    kind = models.CharField(max_length=20, choices=Kind.choices)
+    # Not a foreign key: events outlive deleted tickets
+    ticket_id = models.IntegerField(null=True, blank=True)
+    ticket = models.JSONField(null=True, blank=True)
+    stats = models.JSONField(default=dict)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        ordering = ['id']
+
+    def __str__(self):
+        return f"#{self.id} {self.kind} {self.ticket_id or ''}".rstrip()
@@ -0,0 +1,255 @@
+"""Pagination for the ticket list endpoint.
+
+Two modes share one pagination class:
+
+- Page numbers (default): ``?page=N``. The total count is cached for a short
+  time or until the next ticket write (and estimated from planner statistics
+  on large unfiltered Postgres tables), so "Page X of Y" does not cost a
+  COUNT(*) on every request.
+- Keyset (opt-in): ``?pagination=cursor`` or any request carrying ``?cursor=``.
+  Rows are addressed by their ``(created_at, id)`` position instead of an
+  OFFSET, so deep pages cost the same as the first one and pages do not
+  shift when new tickets are inserted.
+"""
+import hashlib
+from base64 import b64decode, b64encode
+from collections import OrderedDict
+from urllib import parse
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.core.paginator import InvalidPage, Paginator as DjangoPaginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+from . import response_cache
+
+
+def estimated_count(queryset):
+    """Return the planner's row estimate for an unfiltered Postgres table.
+
+    Returns None when no estimate applies (filtered queryset, other vendors,
+    table never analyzed, or below ``TICKET_COUNT_ESTIMATE_MIN`` rows).
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql" or queryset.query.where:
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT reltuples::bigint FROM pg_class WHERE relname = %s",
+            [queryset.model._meta.db_table],
+        )
+        row = cursor.fetchone()
+    if row is None or row[0] < settings.TICKET_COUNT_ESTIMATE_MIN:
+        return None
+    return row[0]
+
+
+def cached_count(queryset) -> int:
+    """Count ``queryset``, reusing a recent result for the same SQL.
+
+    The key includes the ticket version (``tickets.response_cache``), so a
+    write in this process invalidates every cached count at once.
+    """
+    try:
+        sql = str(queryset.query)
+    except EmptyResultSet:
+        return 0
+
+    timeout = settings.TICKET_COUNT_CACHE_TIMEOUT
+    if not timeout:
+        return queryset.count()
+
+    version = response_cache.current_version()
+    key = f"tickets:count:{version}:" + hashlib.md5(sql.encode()).hexdigest()
+    count = cache.get(key)
+    if count is None:
+        count = estimated_count(queryset)
+        if count is None:
+            count = queryset.count()
+        cache.set(key, count, timeout)
+    return count
+
+
+class CachedCountPaginator(DjangoPaginator):
+    @cached_property
+    def count(self):
+        return cached_count(self.object_list)
+
+    def page(self, number):
+        # Slice by page size only: clamping to a cached (possibly stale)
+        # count would drop rows inserted since it was taken.
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        return self._get_page(
+            self.object_list[bottom : bottom + self.per_page], number, self
+        )
+
+
+class KeysetPagination(BasePagination):
+    """Cursor pagination on ``(-created_at, -id)``.
+
+    The ``id`` tiebreaker gives a total order, so tickets sharing a
+    timestamp are never skipped or repeated across pages.
+    """
+
+    page_size = api_settings.PAGE_SIZE
+    cursor_query_param = "cursor"
+    count_query_param = "count"
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = self._start(queryset, request)
+        if request.query_params.get(self.count_query_param) in ("1", "true"):
+            self.count = cached_count(queryset)
+        return self._finish(list(self._window(queryset)))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """``paginate_queryset`` for async views, reading rows asynchronously."""
+        queryset = self._start(queryset, request)
+        if request.query_params.get(self.count_query_param) in ("1", "true"):
+            self.count = await sync_to_async(cached_count)(queryset)
+        return self._finish([row async for row in self._window(queryset)])
+
+    def _start(self, queryset, request):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.position = self.decode_cursor(request)
+        self.count = None
+        return queryset
+
+    def _window(self, queryset):
+        """Order and filter ``queryset`` to the rows after the cursor."""
+        if self.position is None:
+            queryset = queryset.order_by("-created_at", "-id")
+        else:
+            created_at, pk, reverse = self.position
+            if reverse:
+                queryset = queryset.filter(
+                    Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=pk)
+                ).order_by("created_at", "id")
+            else:
+                queryset = queryset.filter(
+                    Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk)
+                ).order_by("-created_at", "-id")
+        return queryset[: self.page_size + 1]
+
+    def _finish(self, rows):
+        reverse = self.position is not None and self.position[2]
+        has_more = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+        if reverse:
+            rows.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, self.position is not None
+
+        self.page = rows
+        return rows
+
+    def get_paginated_response(self, data):
+        payload = OrderedDict()
+        if self.count is not None:
+            payload["count"] = self.count
+        payload["next"] = self.get_next_link()
+        payload["previous"] = self.get_previous_link()
+        payload["results"] = data
+        return Response(payload)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def encode_cursor(self, row, reverse):
+        # Rows are model instances or ``values()`` dicts (tickets.rows)
+        if isinstance(row, dict):
+            created_at, pk = row["created_at"], row["id"]
+        else:
+            created_at, pk = row.created_at, row.pk
+        tokens = {"p": created_at.isoformat(), "i": pk}
+        if reverse:
+            tokens["r"] = 1
+        encoded = b64encode(parse.urlencode(tokens).encode("ascii")).decode("ascii")
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            tokens = parse.parse_qs(
+                b64decode(encoded.encode("ascii")).decode("ascii"),
+                keep_blank_values=True,
+            )
+            created_at = parse_datetime(tokens["p"][0])
+            pk = int(tokens["i"][0])
+            reverse = bool(int(tokens.get("r", ["0"])[0]))
+        except (TypeError, ValueError, KeyError, IndexError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+        if created_at is None:
+            raise NotFound(self.invalid_cursor_message)
+        return created_at, pk, reverse
+
+
+class TicketPagination(PageNumberPagination):
+    """Page-number pagination with cached counts and an opt-in keyset mode."""
+
+    django_paginator_class = CachedCountPaginator
+    mode_query_param = "pagination"
+    keyset_class = KeysetPagination
+
+    def use_keyset(self, request):
+        params = request.query_params
+        return (
+            params.get(self.mode_query_param) == "cursor"
+            or self.keyset_class.cursor_query_param in params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if self.use_keyset(request):
+            self.keyset = self.keyset_class()
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """``paginate_queryset`` for async views (see ``tickets.async_views``)."""
+        self.keyset = None
+        if self.use_keyset(request):
+            self.keyset = self.keyset_class()
+            return await self.keyset.apaginate_queryset(queryset, request, view)
+
+        self.request = request
+        paginator = self.django_paginator_class(queryset, self.get_page_size(request))
+        # Resolve the (cached) count off the event loop, then fetch the page
+        await sync_to_async(lambda: paginator.count)()
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            msg = self.invalid_page_message.format(
+                page_number=page_number, message=str(exc)
+            )
+            raise NotFound(msg)
+        self.page.object_list = [row async for row in self.page.object_list]
+        return self.page.object_list
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
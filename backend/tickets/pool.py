@@ -0,0 +1,259 @@
+"""In-process database connection pool (``DATABASE_POOL_ENABLED=1``).
+
+Django keeps one connection per thread and alias (``CONN_MAX_AGE``). The
+``tickets.backends.postgresql`` and ``tickets.backends.sqlite3`` engines
+instead take a connection from a pool of this process when a thread first
+queries, and hand it back when Django closes it at the end of the request.
+A worker then holds at most ``DATABASE_POOL['MAX_SIZE']`` connections per
+database, however many threads serve requests.
+
+- A connection idle for ``HEALTH_CHECK_INTERVAL`` seconds runs ``SELECT 1``
+  before it is handed out; broken ones are dropped and replaced.
+- Connections idle longer than ``MAX_IDLE`` or older than ``MAX_LIFETIME``
+  are closed instead of reused.
+- When all connections are in use, ``acquire`` waits up to ``TIMEOUT``
+  seconds and then raises ``OperationalError``.
+- Pools belong to the process that opened them. A forked worker starts
+  empty and never touches its parent's connections.
+"""
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from operator import itemgetter
+
+from django.db import OperationalError
+
+DEFAULTS = {
+    "MAX_SIZE": 10,
+    "TIMEOUT": 5.0,
+    "HEALTH_CHECK_INTERVAL": 30.0,
+    "MAX_IDLE": 300.0,
+    "MAX_LIFETIME": 3600.0,
+}
+
+
+@dataclass
+class _Entry:
+    connection: object
+    created_at: float = field(default_factory=time.monotonic)
+    released_at: float = field(default_factory=time.monotonic)
+
+
+class ConnectionPool:
+    """A bounded LIFO pool of DB-API connections."""
+
+    def __init__(
+        self, max_size=10, timeout=5.0, health_check_interval=30.0, max_idle=300.0,
+        max_lifetime=3600.0,
+    ):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+        self.max_idle = max_idle
+        self.max_lifetime = max_lifetime
+        self.pid = os.getpid()
+        self._idle = []
+        self._in_use = {}  # id(connection) -> _Entry
+        self._opening = 0
+        self._condition = threading.Condition()
+        self.counters = {"opened": 0, "reused": 0, "closed": 0, "unhealthy": 0, "waits": 0}
+
+    def _check_fork(self):
+        if self.pid != os.getpid():
+            # The parent owns these sockets; closing them here would close its sessions
+            self.pid = os.getpid()
+            self._idle, self._in_use, self._opening = [], {}, 0
+            self.counters = dict.fromkeys(self.counters, 0)
+
+    def acquire(self, connect):
+        """An idle connection, or a new one from ``connect()`` below ``max_size``."""
+        deadline = time.monotonic() + self.timeout
+        while True:
+            discarded = []
+            with self._condition:
+                self._check_fork()
+                while True:
+                    entry = self._take_idle(discarded)
+                    if entry is not None:
+                        break
+                    if len(self._in_use) + self._opening < self.max_size:
+                        self._opening += 1
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise OperationalError(
+                            f"Connection pool exhausted: {self.max_size} connections in "
+                            f"use for {self.timeout}s."
+                        )
+                    self.counters["waits"] += 1
+                    self._condition.wait(remaining)
+            # Closing and health checks talk to the server: keep them outside
+            # the lock so one slow connection does not stall every thread
+            for stale in discarded:
+                self._close(stale)
+            if entry is None:
+                break
+            if self._healthy(entry):
+                with self._condition:
+                    self.counters["reused"] += 1
+                return entry.connection
+            with self._condition:
+                self._in_use.pop(id(entry.connection), None)
+                self.counters["unhealthy"] += 1
+                self._condition.notify()
+            self._close(entry)
+        try:
+            connection = connect()
+        except BaseException:
+            with self._condition:
+                self._opening -= 1
+                self._condition.notify()
+            raise
+        with self._condition:
+            self._opening -= 1
+            self._in_use[id(connection)] = _Entry(connection)
+            self.counters["opened"] += 1
+        return connection
+
+    def _take_idle(self, discarded):
+        """Reserve the most recently released connection that has not expired
+        (hold the lock); expired ones go to ``discarded`` for closing."""
+        now = time.monotonic()
+        while self._idle:
+            entry = self._idle.pop()
+            if now - entry.released_at >= self.max_idle or self._expired(entry, now):
+                discarded.append(entry)
+                continue
+            # Counts against max_size while its health is checked
+            self._in_use[id(entry.connection)] = entry
+            return entry
+        return None
+
+    def release(self, connection):
+        """Return ``connection`` with any open transaction rolled back."""
+        try:
+            connection.rollback()
+            usable = True
+        except Exception:
+            usable = False
+        now = time.monotonic()
+        with self._condition:
+            self._check_fork()
+            entry = self._in_use.pop(id(connection), None)
+            if entry is None:
+                # Opened by the parent process before a fork; leave it alone
+                return
+            kept = usable and not self._expired(entry, now)
+            if kept:
+                entry.released_at = now
+                self._idle.append(entry)
+            self._condition.notify()
+        if not kept:
+            self._close(entry)
+
+    def _expired(self, entry, now):
+        return self.max_lifetime is not None and now - entry.created_at >= self.max_lifetime
+
+    def _healthy(self, entry):
+        if time.monotonic() - entry.released_at < self.health_check_interval:
+            return True
+        try:
+            cursor = entry.connection.cursor()
+            try:
+                cursor.execute("SELECT 1")
+                cursor.fetchall()
+            finally:
+                cursor.close()
+        except Exception:
+            return False
+        return True
+
+    def _close(self, entry):
+        with self._condition:
+            self.counters["closed"] += 1
+        try:
+            entry.connection.close()
+        except Exception:
+            pass
+
+    def close_all(self):
+        with self._condition:
+            idle, self._idle = self._idle, []
+        for entry in idle:
+            self._close(entry)
+
+    def stats(self) -> dict:
+        with self._condition:
+            self._check_fork()
+            return {
+                "max_size": self.max_size,
+                "in_use": len(self._in_use),
+                "idle": len(self._idle),
+                **self.counters,
+            }
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(alias, settings_dict, conn_params) -> ConnectionPool:
+    """The pool for ``alias``; a change of connection parameters (such as
+    the test database name) starts a new one."""
+    key = (alias, repr(sorted(conn_params.items(), key=itemgetter(0))))
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            options = {**DEFAULTS, **settings_dict.get("POOL", {})}
+            pool = _pools[key] = ConnectionPool(
+                max_size=options["MAX_SIZE"],
+                timeout=options["TIMEOUT"],
+                health_check_interval=options["HEALTH_CHECK_INTERVAL"],
+                max_idle=options["MAX_IDLE"],
+                max_lifetime=options["MAX_LIFETIME"],
+            )
+        return pool
+
+
+def stats() -> dict:
+    """Counters of this process's pools, by database alias."""
+    with _pools_lock:
+        pools = list(_pools.items())
+    return {alias: pool.stats() for (alias, _params), pool in pools}
+
+
+def _forget_after_fork():
+    global _pools, _pools_lock
+    # The parent's connections stay with the parent; wrappers still holding
+    # one of its pools see the pid change (ConnectionPool._check_fork)
+    _pools = {}
+    _pools_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_forget_after_fork)
+
+
+def close_all() -> None:
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close_all()
+
+
+class PooledDatabaseWrapperMixin:
+    """Borrow connections from ``get_pool`` instead of opening one per thread.
+
+    Combined with a backend's ``DatabaseWrapper`` in ``tickets.backends``.
+    """
+
+    def get_new_connection(self, conn_params):
+        connect = super().get_new_connection
+        self._connection_pool = get_pool(self.alias, self.settings_dict, conn_params)
+        return self._connection_pool.acquire(lambda: connect(conn_params))
+
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                self._connection_pool.release(self.connection)
@@ -0,0 +1,48 @@
+"""JSON rendering for API responses.
+
+``FastJSONRenderer`` encodes with orjson when it is installed and falls back
+to DRF's ``JSONRenderer`` otherwise, or when indented output was requested.
+Bodies are byte-for-byte what ``JSONRenderer`` produces for the data the API
+returns (compact separators, unescaped unicode, escaped U+2028/U+2029), so
+the two are interchangeable for clients and cached ETags.
+"""
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+from . import metrics
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+_default = JSONEncoder().default
+
+
+def dumps(data) -> bytes:
+    """Compact JSON for ``data``, as ``JSONRenderer`` would render it."""
+    if orjson is None:
+        return JSONRenderer().render(data)
+    # Datetimes and other non-native types go through DRF's encoder
+    body = orjson.dumps(
+        data,
+        default=_default,
+        option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS,
+    )
+    # Keep the output a strict JavaScript subset, like JSONRenderer
+    if b"\xe2\x80\xa8" in body or b"\xe2\x80\xa9" in body:
+        body = body.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+            b"\xe2\x80\xa9", b"\\u2029"
+        )
+    return body
+
+
+class FastJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        with metrics.phase("serialize"):
+            if orjson is None or indent:
+                return super().render(data, accepted_media_type, renderer_context)
+            return dumps(data)
@@ -0,0 +1,116 @@
+"""Route ticket reads to read replicas (``DATABASE_REPLICA_URLS``).
+
+``ReplicaRouter`` sends the reads of ``GET``/``HEAD`` requests to the
+``TicketViewSet`` actions in ``READ_ACTIONS`` to one of
+``DATABASE_ROUTING['REPLICAS']``, picked at random per request. Everything
+else stays on ``default``: writes, reads made while handling a write,
+management commands, the live event feed and classification jobs.
+
+Replicas lag behind the primary. After a successful ticket write
+(``WRITE_ACTIONS``), ``ReplicaRoutingMiddleware`` sets a
+``DATABASE_ROUTING['COOKIE']`` cookie for ``STICKY_SECONDS``. While the
+client sends it back, its reads also use the primary, so a ticket it just
+created or changed is in the next list.
+
+The choice is made on the first routed query of a request, when the view
+is already resolved, and kept for the rest of the request.
+"""
+import random
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+from . import metrics
+
+SAFE_METHODS = ("GET", "HEAD")
+READ_ACTIONS = ("list", "retrieve", "export", "stats")
+WRITE_ACTIONS = ("create", "partial_update", "bulk", "bulk_update")
+# Rollups and both ticket tiers; events and jobs need read-your-writes
+READ_MODELS = (
+    "tickets.Ticket",
+    "tickets.ArchivedTicket",
+    "tickets.AnyTicket",
+    "tickets.TicketStat",
+)
+
+
+def replicas() -> list:
+    return settings.DATABASE_ROUTING["REPLICAS"]
+
+
+@dataclass
+class ReadRoute:
+    request: object
+    alias: str = None
+    chosen: bool = False
+
+
+_current = ContextVar("tickets_read_route", default=None)
+
+
+def start_request(request):
+    return _current.set(ReadRoute(request))
+
+
+def finish_request(token) -> None:
+    _current.reset(token)
+
+
+def pin(request, response) -> None:
+    """Send this client's reads to the primary for a while after a write."""
+    if (
+        replicas()
+        and request.method not in SAFE_METHODS
+        and response.status_code < 400
+        and metrics.view_label(request) in WRITE_ACTIONS
+    ):
+        config = settings.DATABASE_ROUTING
+        response.set_cookie(
+            config["COOKIE"], "1", max_age=config["STICKY_SECONDS"], samesite="Lax"
+        )
+
+
+def choose(request):
+    """The replica for ``request``'s reads, or None for the primary."""
+    aliases = replicas()
+    if not aliases or request.method not in SAFE_METHODS:
+        return None
+    if request.COOKIES.get(settings.DATABASE_ROUTING["COOKIE"]):
+        return None
+    if metrics.view_label(request) not in READ_ACTIONS:
+        return None
+    return random.choice(aliases)
+
+
+def read_alias():
+    """This request's replica, or None."""
+    route = _current.get()
+    if route is None:
+        return None
+    if not route.chosen:
+        route.alias, route.chosen = choose(route.request), True
+    return route.alias
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if model._meta.label in READ_MODELS:
+            return read_alias()
+        return None
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *replicas()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get the schema from the primary
+        if db in replicas():
+            return False
+        return None
@@ -0,0 +1,259 @@
+"""Conditional GET and response caching for the ticket list and stats.
+
+Every ticket write bumps a table-wide version counter held in the shared
+cache. Responses are cached under a key combining that version with the
+endpoint, host, normalized query parameters and the database the request
+reads from, so any write invalidates every cached page at once and nothing
+has to be deleted.
+
+- ``ETag`` is derived from the key. A client that sends it back
+  (``If-None-Match``) gets ``304 Not Modified`` after one cache read (the
+  version), without touching the ORM, serializers or the cached body.
+- ``Last-Modified`` is the time the cached response was generated;
+  ``If-Modified-Since`` is honoured when no ``If-None-Match`` is sent.
+- Cached values are the serialized response data, so every renderer (JSON,
+  browsable API, the async views) shares the same entries.
+
+The version is bumped immediately and again on commit: the second bump
+drops anything cached from a reader that saw the pre-commit state. A read
+replica (``tickets.replicas``) may not have the write yet when the version
+moves, so its responses are kept apart from the primary's, and for at most
+``DATABASE_ROUTING['STICKY_SECONDS']``: a client pinned to the primary
+never gets a replica's copy.
+"""
+import hashlib
+import threading
+import time
+from collections import Counter
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core import checks
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.utils.http import http_date, parse_etags, parse_http_date_safe
+
+from . import replicas
+from .search import search_terms
+
+VERSION_KEY = "tickets:version"
+KEY_PREFIX = "tickets:response"
+
+_counters = Counter()
+_counters_lock = threading.Lock()
+
+
+def _cache():
+    return caches[settings.RESPONSE_CACHE["CACHE_ALIAS"]]
+
+
+def _seed():
+    # After an eviction, restart above any counter value issued recently
+    return int(time.time() * 1000)
+
+
+def current_version() -> int:
+    cache = _cache()
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, _seed(), None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+async def acurrent_version() -> int:
+    cache = _cache()
+    version = await cache.aget(VERSION_KEY)
+    if version is None:
+        await cache.aadd(VERSION_KEY, _seed(), None)
+        version = await cache.aget(VERSION_KEY)
+    return version
+
+
+def bump() -> None:
+    cache = _cache()
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.add(VERSION_KEY, _seed(), None)
+
+
+def tickets_changed() -> None:
+    """Invalidate cached list/stats responses after a ticket write."""
+    bump()
+    transaction.on_commit(bump)
+
+
+def normalized_query(request) -> list:
+    """Sorted, non-empty query parameters; search text reduced to its terms."""
+    params = []
+    for name, values in request.query_params.lists():
+        for value in values:
+            if name == "search":
+                value = " ".join(search_terms(value))
+            if value:
+                params.append((name, value))
+    return sorted(params)
+
+
+class Lookup:
+    """Outcome of checking the cache for one request.
+
+    ``not_modified`` means the client's copy is current; otherwise ``data``
+    is the cached payload, or None on a miss (call ``store`` after building).
+    """
+
+    def __init__(self, key, etag, timeout):
+        self.key = key
+        self.etag = etag
+        self.timeout = timeout
+        self.not_modified = False
+        self.data = None
+        self.last_modified = None
+
+    @property
+    def headers(self) -> dict:
+        headers = {"ETag": self.etag, "Cache-Control": "no-cache"}
+        if self.last_modified is not None:
+            headers["Last-Modified"] = http_date(self.last_modified)
+        return headers
+
+
+def _new_lookup(request, name, version, variant):
+    query = urlencode(normalized_query(request))
+    alias = replicas.read_alias()
+    raw = "|".join(
+        (str(version), name, request.get_host(), query, alias or DEFAULT_DB_ALIAS)
+    )
+    digest = hashlib.sha256(raw.encode()).hexdigest()
+    # The body is shared by all renderers, the representation (ETag) is not
+    etag = hashlib.sha256(f"{digest}|{variant}".encode()).hexdigest()[:32]
+    timeout = settings.RESPONSE_CACHE["TIMEOUT"]
+    if alias is not None:
+        # No longer than a replica is expected to lag
+        timeout = min(timeout, settings.DATABASE_ROUTING["STICKY_SECONDS"])
+    return Lookup(key=f"{KEY_PREFIX}:{digest}", etag=f'"{etag}"', timeout=timeout)
+
+
+def _etag_matches(request, etag):
+    header = request.META.get("HTTP_IF_NONE_MATCH")
+    if not header:
+        return None
+    if header.strip() == "*":
+        return True
+    # Weak comparison, as for GET/HEAD in RFC 9110
+    return etag in {tag.removeprefix("W/") for tag in parse_etags(header)}
+
+
+def _unmodified_since(request, last_modified):
+    since = parse_http_date_safe(request.META.get("HTTP_IF_MODIFIED_SINCE"))
+    return since is not None and int(last_modified) <= since
+
+
+def _record(lookup, entry, request):
+    if entry is not None:
+        lookup.data, lookup.last_modified = entry
+        if _etag_matches(request, lookup.etag) is None and _unmodified_since(
+            request, lookup.last_modified
+        ):
+            lookup.not_modified = True
+            _count("not_modified")
+        else:
+            _count("hits")
+    else:
+        _count("misses")
+    return lookup
+
+
+def enabled(request) -> bool:
+    return settings.RESPONSE_CACHE["ENABLED"] and request.method in ("GET", "HEAD")
+
+
+def lookup(request, name, variant="") -> Lookup:
+    """Check the cache for ``request`` to endpoint ``name``."""
+    result = _new_lookup(request, name, current_version(), variant)
+    if _etag_matches(request, result.etag):
+        result.not_modified = True
+        _count("not_modified")
+        return result
+    return _record(result, _cache().get(result.key), request)
+
+
+async def alookup(request, name, variant="") -> Lookup:
+    result = _new_lookup(request, name, await acurrent_version(), variant)
+    if _etag_matches(request, result.etag):
+        result.not_modified = True
+        _count("not_modified")
+        return result
+    return _record(result, await _cache().aget(result.key), request)
+
+
+def store(result: Lookup, data) -> None:
+    result.data, result.last_modified = data, time.time()
+    _cache().set(result.key, (data, result.last_modified), result.timeout)
+
+
+async def astore(result: Lookup, data) -> None:
+    result.data, result.last_modified = data, time.time()
+    await _cache().aset(result.key, (data, result.last_modified), result.timeout)
+
+
+def _count(name):
+    with _counters_lock:
+        _counters[name] += 1
+
+
+def stats() -> dict:
+    """Counters for this process; ``hit_ratio`` counts 304s as hits."""
+    with _counters_lock:
+        counters = dict(_counters)
+    served = counters.get("hits", 0) + counters.get("not_modified", 0)
+    total = served + counters.get("misses", 0)
+    return {
+        "hits": counters.get("hits", 0),
+        "not_modified": counters.get("not_modified", 0),
+        "misses": counters.get("misses", 0),
+        "hit_ratio": round(served / total, 4) if total else 0.0,
+        "enabled": settings.RESPONSE_CACHE["ENABLED"],
+        "timeout": settings.RESPONSE_CACHE["TIMEOUT"],
+    }
+
+
+def check_shared_cache(app_configs=None, **kwargs) -> list:
+    """System check: warn when the cache is on but each worker has its own,
+    or the backend can lose concurrent version bumps."""
+    if not settings.RESPONSE_CACHE["ENABLED"]:
+        return []
+    alias = settings.RESPONSE_CACHE["CACHE_ALIAS"]
+    backend = settings.CACHES[alias]["BACKEND"]
+    if backend in settings.NON_ATOMIC_INCR_CACHE_BACKENDS:
+        return [
+            checks.Warning(
+                f"RESPONSE_CACHE is enabled on '{alias}', whose incr() is not atomic.",
+                hint=(
+                    "Two workers bumping the version at once can lose a bump, "
+                    "so lists, stats and ETags stay stale until the next write. "
+                    "Use a redis or memcached CACHE_BACKEND, or set "
+                    "RESPONSE_CACHE_ENABLED=0."
+                ),
+                id="tickets.W002",
+            )
+        ]
+    if backend not in settings.PROCESS_LOCAL_CACHE_BACKENDS:
+        return []
+    return [
+        checks.Warning(
+            f"RESPONSE_CACHE is enabled on the process-local cache '{alias}'.",
+            hint=(
+                "A write only invalidates the worker that handled it; others "
+                "serve stale lists and stats for up to RESPONSE_CACHE_TIMEOUT. "
+                "Set CACHE_BACKEND to a shared backend or run a single worker."
+            ),
+            id="tickets.W001",
+        )
+    ]
+
+
+def reset_stats() -> None:
+    with _counters_lock:
+        _counters.clear()
@@ -0,0 +1,193 @@
+"""Incrementally maintained ticket counters backing the stats endpoint.
+
+Every ticket falls into exactly one (day, category, priority, status) bucket.
+Ticket writes adjust the matching ``TicketStat`` rows in the same transaction,
+so ``summary()`` aggregates a table whose size depends on the number of days
+with tickets rather than on the number of tickets.
+
+Single-row ORM writes are tracked through the signal handlers in
+``tickets.signals``. Code paths that bypass signals (``bulk_create``,
+``QuerySet.update``) must call ``apply_deltas`` themselves, and report the
+write through ``tickets.events``.
+"""
+from collections import Counter
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from . import response_cache
+from .models import AnyTicket, Ticket, TicketStat
+
+BUCKET_FIELDS = ("day", "category", "priority", "status")
+
+
+def bucket_for(ticket) -> tuple:
+    """Return the rollup bucket key for a ticket instance."""
+    return (
+        timezone.localdate(ticket.created_at),
+        ticket.category,
+        ticket.priority,
+        ticket.status,
+    )
+
+
+def apply_deltas(deltas: Counter) -> None:
+    """Add ``deltas`` (bucket -> signed count) to the rollup table.
+
+    Buckets are touched in sorted order so concurrent writers lock rows in
+    the same sequence.
+    """
+    for bucket, delta in sorted(deltas.items()):
+        if not delta:
+            continue
+        key = dict(zip(BUCKET_FIELDS, bucket))
+        updated = TicketStat.objects.filter(**key).update(count=F("count") + delta)
+        if updated or delta < 0:
+            continue
+        try:
+            with transaction.atomic():
+                TicketStat.objects.create(count=delta, **key)
+        except IntegrityError:
+            # Another writer created the bucket first
+            TicketStat.objects.filter(**key).update(count=F("count") + delta)
+
+
+def record_created(tickets) -> Counter:
+    deltas = Counter(bucket_for(t) for t in tickets)
+    apply_deltas(deltas)
+    return deltas
+
+
+def record_deleted(tickets) -> Counter:
+    deltas = Counter()
+    for ticket in tickets:
+        deltas[bucket_for(ticket)] -= 1
+    apply_deltas(deltas)
+    return deltas
+
+
+def record_changed(before: tuple, ticket) -> Counter:
+    """Move one ticket from bucket ``before`` to its current bucket."""
+    after = bucket_for(ticket)
+    if before == after:
+        return Counter()
+    deltas = Counter({before: -1, after: 1})
+    apply_deltas(deltas)
+    return deltas
+
+
+def summary_delta(deltas: Counter) -> dict:
+    """Translate bucket deltas into changes to the ``summary()`` counters.
+
+    Only non-zero entries are included, e.g. a ticket moving from open to
+    resolved gives ``{"open_tickets": -1}``.
+    """
+    result = {"priority_breakdown": Counter(), "category_breakdown": Counter()}
+    totals = Counter()
+    for (day, category, priority, status), delta in deltas.items():
+        totals["total_tickets"] += delta
+        if status == Ticket.Status.OPEN:
+            totals["open_tickets"] += delta
+        result["priority_breakdown"][priority] += delta
+        result["category_breakdown"][category] += delta
+    result = {
+        name: {key: n for key, n in counter.items() if n}
+        for name, counter in result.items()
+    }
+    result.update((name, n) for name, n in totals.items() if n)
+    return {name: value for name, value in result.items() if value}
+
+
+def live_counts(queryset=None) -> Counter:
+    """Aggregate bucket counts directly from the tickets (full scan).
+
+    Defaults to hot and archived tickets together, which is what the
+    rollups count (tickets.archive).
+    """
+    queryset = AnyTicket.objects.all() if queryset is None else queryset
+    rows = (
+        queryset.order_by()
+        .annotate(day=TruncDate("created_at"))
+        .values(*BUCKET_FIELDS)
+        .annotate(n=Count("id"))
+    )
+    return Counter({tuple(row[f] for f in BUCKET_FIELDS): row["n"] for row in rows})
+
+
+def stored_counts() -> Counter:
+    rows = TicketStat.objects.filter(count__gt=0).values_list(*BUCKET_FIELDS, "count")
+    return Counter({tuple(row[:-1]): row[-1] for row in rows})
+
+
+@transaction.atomic
+def rebuild() -> int:
+    """Recompute the rollup table from scratch. Returns the number of buckets."""
+    TicketStat.objects.all().delete()
+    stats = [
+        TicketStat(count=n, **dict(zip(BUCKET_FIELDS, bucket)))
+        for bucket, n in live_counts().items()
+    ]
+    TicketStat.objects.bulk_create(stats, batch_size=1000)
+    response_cache.tickets_changed()
+    return len(stats)
+
+
+def check() -> list:
+    """Compare the rollup table with the ticket table.
+
+    Returns a list of ``(bucket, stored, actual)`` tuples for every bucket
+    that has drifted; an empty list means the rollups are consistent.
+    """
+    stored = stored_counts()
+    actual = live_counts()
+    return [
+        (bucket, stored.get(bucket, 0), actual.get(bucket, 0))
+        for bucket in sorted(set(stored) | set(actual))
+        if stored.get(bucket, 0) != actual.get(bucket, 0)
+    ]
+
+
+def summary() -> dict:
+    """Return the stats endpoint payload from the rollup table in one query."""
+    return _format_summary(_summary_queryset().aggregate(**_summary_aggregates()))
+
+
+async def asummary() -> dict:
+    """``summary`` for async views, using the async ORM."""
+    agg = await _summary_queryset().aaggregate(**_summary_aggregates())
+    return _format_summary(agg)
+
+
+def _summary_queryset():
+    return TicketStat.objects.filter(count__gt=0)
+
+
+def _summary_aggregates() -> dict:
+    def total(q=None):
+        return Coalesce(Sum("count", filter=q), 0)
+
+    return {
+        "total_tickets": total(),
+        "open_tickets": total(Q(status=Ticket.Status.OPEN)),
+        "active_days": Count("day", distinct=True),
+        **{f"priority_{p.value}": total(Q(priority=p.value)) for p in Ticket.Priority},
+        **{f"category_{c.value}": total(Q(category=c.value)) for c in Ticket.Category},
+    }
+
+
+def _format_summary(agg) -> dict:
+    days = agg["active_days"]
+    return {
+        "total_tickets": agg["total_tickets"],
+        "open_tickets": agg["open_tickets"],
+        "avg_tickets_per_day": round(agg["total_tickets"] / days, 2) if days else 0.0,
+        "active_days": days,
+        "priority_breakdown": {
+            p.value: agg[f"priority_{p.value}"] for p in Ticket.Priority
+        },
+        "category_breakdown": {
+            c.value: agg[f"category_{c.value}"] for c in Ticket.Category
+        },
+    }
@@ -0,0 +1,120 @@
+"""Local keyword pre-classifier, consulted before the LLM.
+
+The rules restate the ones in ``services.CLASSIFICATION_PROMPT`` as weighted
+keywords. All keywords are compiled into one alternation regex (longest
+phrases first, word-bounded, case-insensitive), so a description is scanned
+once in microseconds.
+
+Each distinct keyword found adds its weight to a category and/or a priority.
+For each of the two, the confidence is the leading label's score over the
+total score plus ``SMOOTHING``: one weak keyword, or evidence split between
+labels, stays low. ``classify`` answers only when both confidences reach
+``CLASSIFY_RULES['MIN_CONFIDENCE']``; anything else goes to the LLM.
+"""
+import re
+from collections import Counter
+from dataclasses import dataclass
+
+from django.conf import settings
+
+SMOOTHING = 1.0
+STRONG, WEAK = 2.0, 1.0
+
+# (keywords, category, priority, weight)
+RULES = [
+    # billing: payment issues, invoices, charges, subscriptions, refunds
+    (("refund", "refunds", "refunded", "chargeback"), "billing", None, STRONG),
+    (("invoice", "invoices", "billed", "overcharged"), "billing", None, STRONG),
+    (("charged", "double charged", "charged twice"), "billing", None, STRONG),
+    (("payment", "subscription", "credit card", "receipt"), "billing", None, WEAK),
+    (("billing", "payments"), "billing", None, WEAK),
+    # technical: bugs, errors, crashes, performance, API issues
+    (("crash", "crashes", "crashed", "crashing"), "technical", None, STRONG),
+    (("stack trace", "500 error"), "technical", None, STRONG),
+    (("bug", "error", "errors", "exception", "api"), "technical", None, WEAK),
+    (("timeout", "times out", "slow", "latency"), "technical", None, WEAK),
+    # account: login problems, password resets, profile, permissions
+    (("password reset", "reset my password"), "account", None, STRONG),
+    (("forgot my password", "locked out", "2fa"), "account", None, STRONG),
+    (("log in", "login", "sign in", "two-factor"), "account", None, STRONG),
+    (("password", "profile", "permission", "permissions"), "account", None, WEAK),
+    # critical: system down, data loss, security breach
+    (("system down", "site down", "outage"), "technical", "critical", STRONG),
+    (("data loss", "lost all", "data was deleted"), None, "critical", STRONG),
+    (("security breach", "breach", "hacked", "compromised"), None, "critical", STRONG),
+    # high: major feature broken, blocking issue
+    (("blocking", "blocked", "completely broken", "urgent"), None, "high", STRONG),
+    (("cannot", "can't", "unable to", "not working", "broken"), None, "high", WEAK),
+    # medium: degraded functionality, workaround exists
+    (("workaround", "intermittent", "intermittently"), None, "medium", STRONG),
+    (("degraded", "sometimes", "slower than usual"), None, "medium", STRONG),
+    # low: minor issue, cosmetic, feature request
+    (("typo", "cosmetic", "feature request", "would be nice"), None, "low", STRONG),
+    (("suggestion", "minor", "misaligned"), None, "low", WEAK),
+]
+
+
+def _compile(rules):
+    keywords = {}
+    for index, (words, *_rest) in enumerate(rules):
+        for word in words:
+            keywords.setdefault(word.lower(), index)
+    # Longest first, so "password reset" wins over "password" at a position
+    ordered = sorted(keywords, key=len, reverse=True)
+    pattern = r"(?<!\w)(?:" + "|".join(re.escape(w) for w in ordered) + r")(?!\w)"
+    return re.compile(pattern, re.IGNORECASE), keywords
+
+
+_PATTERN, _KEYWORD_RULE = _compile(RULES)
+
+
+@dataclass(frozen=True)
+class RuleMatch:
+    category: str
+    priority: str
+    confidence: float
+    keywords: tuple
+
+    def as_result(self) -> dict:
+        return {
+            "suggested_category": self.category,
+            "suggested_priority": self.priority,
+        }
+
+
+def _leader(scores):
+    if not scores:
+        return None, 0.0
+    label, best = scores.most_common(1)[0]
+    return label, best / (sum(scores.values()) + SMOOTHING)
+
+
+def score(description: str) -> RuleMatch:
+    """Best category/priority by keyword evidence, however weak."""
+    keywords = {m.group().lower() for m in _PATTERN.finditer(description)}
+    categories, priorities = Counter(), Counter()
+    for keyword in keywords:
+        _words, category, priority, weight = RULES[_KEYWORD_RULE[keyword]]
+        if category:
+            categories[category] += weight
+        if priority:
+            priorities[priority] += weight
+    category, category_confidence = _leader(categories)
+    priority, priority_confidence = _leader(priorities)
+    return RuleMatch(
+        category=category,
+        priority=priority,
+        confidence=round(min(category_confidence, priority_confidence), 3),
+        keywords=tuple(sorted(keywords)),
+    )
+
+
+def classify(description: str):
+    """A confident ``RuleMatch`` for ``description``, or None to ask the LLM."""
+    config = settings.CLASSIFY_RULES
+    if not config["ENABLED"]:
+        return None
+    match = score(description)
+    if match.confidence < config["MIN_CONFIDENCE"]:
+        return None
+    return match
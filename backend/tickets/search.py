@@ -0,0 +1,136 @@
+"""Full-text search backends for the ticket list endpoint.
+
+The backend is picked per database vendor unless ``TICKET_SEARCH_BACKEND``
+names one explicitly (a dotted path to a ``BaseSearchBackend`` subclass):
+
+- PostgreSQL: a generated, weighted ``tsvector`` column with a GIN index,
+  ranked by ``ts_rank_cd``.
+- SQLite: an external-content FTS5 table kept in sync by triggers, ranked
+  by bm25.
+- Anything else: ``icontains`` over title and description, matching DRF's
+  ``SearchFilter``.
+
+The hot and archived ticket tables (``tickets.archive``) are indexed alike,
+so ``?include_archived=1`` searches both tiers through the ``AnyTicket``
+view. The index objects are created by migration
+``0003_search_index_and_anyticket_view``, so they exist wherever the ticket
+tables do, including test databases.
+The search index is maintained by the database itself, so every write path
+(ORM saves, ``bulk_create``, ``QuerySet.update``) keeps it in sync.
+"""
+import re
+from functools import reduce
+from operator import and_
+
+from django.conf import settings
+from django.db.models import BooleanField, FloatField, Q
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+from .models import AnyTicket, ArchivedTicket, Ticket
+
+TOKEN_RE = re.compile(r"\w+")
+MAX_TERMS = 10
+# Tables carrying a search index; AnyTicket is a view over both
+INDEXED_MODELS = (Ticket, ArchivedTicket)
+
+
+def search_terms(query: str) -> list:
+    """Split a raw search string into at most ``MAX_TERMS`` word tokens."""
+    return TOKEN_RE.findall((query or "").lower())[:MAX_TERMS]
+
+
+class BaseSearchBackend:
+    vendor = None
+
+    def search(self, queryset, terms):
+        """Filter ``queryset`` to tickets matching every term, best first."""
+        raise NotImplementedError
+
+
+class BasicSearchBackend(BaseSearchBackend):
+    """Unindexed ``icontains`` search; works on every database."""
+
+    def search(self, queryset, terms):
+        return queryset.filter(
+            reduce(
+                and_,
+                (Q(title__icontains=t) | Q(description__icontains=t) for t in terms),
+            )
+        )
+
+
+class PostgresSearchBackend(BaseSearchBackend):
+    vendor = "postgresql"
+    column = "search_vector"
+
+    def search(self, queryset, terms):
+        # The AnyTicket view passes each table's column through
+        column = f"{queryset.model._meta.db_table}.{self.column}"
+        # Prefix-match every term so partially typed words still match
+        tsquery = " & ".join(f"{term}:*" for term in terms)
+        return (
+            queryset.alias(
+                search_match=RawSQL(
+                    f"{column} @@ to_tsquery('english', %s)",
+                    (tsquery,),
+                    output_field=BooleanField(),
+                )
+            )
+            .filter(search_match=True)
+            .annotate(
+                search_rank=RawSQL(
+                    f"ts_rank_cd({column}, to_tsquery('english', %s))",
+                    (tsquery,),
+                    output_field=FloatField(),
+                )
+            )
+            .order_by("-search_rank", "-created_at", "-id")
+        )
+
+
+class SQLiteFTSBackend(BaseSearchBackend):
+    vendor = "sqlite"
+
+    @staticmethod
+    def fts_table(model):
+        return f"{model._meta.db_table}_fts"
+
+    def search(self, queryset, terms):
+        table = queryset.model._meta.db_table
+        match = " ".join(f'"{term}"*' for term in terms)
+        if queryset.model is AnyTicket:
+            # A view cannot join an external-content FTS table; match each
+            # tier's index instead. bm25 scores of two indexes do not compare,
+            # so both tiers are returned newest first.
+            hits = " UNION ALL ".join(
+                f"SELECT rowid FROM {fts} WHERE {fts} MATCH %s"
+                for fts in map(self.fts_table, INDEXED_MODELS)
+            )
+            return queryset.extra(
+                where=[f"{table}.id IN ({hits})"],
+                params=[match] * len(INDEXED_MODELS),
+            ).order_by("-created_at", "-id")
+        fts = self.fts_table(queryset.model)
+        # Join the FTS table so the MATCH drives the query and bm25 is
+        # computed once per hit; a correlated rank subquery would re-run
+        # the MATCH for every row.
+        return queryset.extra(
+            tables=[fts],
+            where=[f"{fts}.rowid = {table}.id", f"{fts} MATCH %s"],
+            params=[match],
+            select={"search_rank": f"-{fts}.rank"},
+        ).order_by("-search_rank", "-created_at", "-id")
+
+
+VENDOR_BACKENDS = {
+    PostgresSearchBackend.vendor: PostgresSearchBackend,
+    SQLiteFTSBackend.vendor: SQLiteFTSBackend,
+}
+
+
+def get_backend(connection) -> BaseSearchBackend:
+    path = getattr(settings, "TICKET_SEARCH_BACKEND", None)
+    if path:
+        return import_string(path)()
+    return VENDOR_BACKENDS.get(connection.vendor, BasicSearchBackend)()
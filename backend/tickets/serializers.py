@@ -1,12 +1,14 @@
+from django.conf import settings
 from rest_framework import serializers
-from .models import Ticket
+
+from .models import ClassificationJob, Ticket
 
 
 class TicketSerializer(serializers.ModelSerializer):
     class Meta:
         model = Ticket
-        fields = '__all__'
-        read_only_fields = ['id', 'created_at']
+        exclude = ['signature']
+        read_only_fields = ['id', 'created_at', 'duplicate_of']
 
 
 class TicketUpdateSerializer(serializers.ModelSerializer):
@@ -18,6 +20,54 @@ class TicketUpdateSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'title', 'description', 'created_at']
 
 
+class TicketBulkUpdateSerializer(serializers.Serializer):
+    """Validates PATCH /api/tickets/bulk/: which tickets (``ids`` or a list
+    ``filter``) and the status/category/priority to set."""
+
+    FILTER_PARAMS = ('category', 'priority', 'status', 'search')
+    CHANGE_FIELDS = ('status', 'category', 'priority')
+
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        min_length=1,
+        max_length=settings.TICKET_BULK_UPDATE_MAX_IDS,
+        required=False,
+    )
+    filter = serializers.DictField(
+        child=serializers.CharField(), allow_empty=False, required=False
+    )
+    status = serializers.ChoiceField(choices=Ticket.Status.choices, required=False)
+    category = serializers.ChoiceField(choices=Ticket.Category.choices, required=False)
+    priority = serializers.ChoiceField(choices=Ticket.Priority.choices, required=False)
+
+    def validate_filter(self, value):
+        # An unknown (e.g. misspelled) key must not widen the update to everything
+        unknown = set(value) - set(self.FILTER_PARAMS)
+        if unknown:
+            raise serializers.ValidationError(
+                f"Unknown filter(s): {', '.join(sorted(unknown))}. "
+                f"Choose from: {', '.join(self.FILTER_PARAMS)}."
+            )
+        return value
+
+    def validate(self, attrs):
+        if ('ids' in attrs) == ('filter' in attrs):
+            raise serializers.ValidationError('Provide either "ids" or "filter".')
+        if not any(name in attrs for name in self.CHANGE_FIELDS):
+            raise serializers.ValidationError(
+                f"Set at least one of: {', '.join(self.CHANGE_FIELDS)}."
+            )
+        return attrs
+
+    @property
+    def changes(self):
+        return {
+            name: self.validated_data[name]
+            for name in self.CHANGE_FIELDS
+            if name in self.validated_data
+        }
+
+
 class ClassifyRequestSerializer(serializers.Serializer):
     """Validates the description field for the AI classification endpoint."""
 
@@ -26,3 +76,25 @@ class ClassifyRequestSerializer(serializers.Serializer):
         max_length=5000,
         help_text="Ticket description to classify",
     )
+
+
+class ClassifyBatchRequestSerializer(serializers.Serializer):
+    """Validates the descriptions list for the batch classification endpoint."""
+
+    descriptions = serializers.ListField(
+        child=serializers.CharField(min_length=10, max_length=5000),
+        min_length=1,
+        max_length=settings.CLASSIFY_BATCH_MAX_ITEMS,
+        help_text="Ticket descriptions to classify",
+    )
+
+
+class ClassificationJobSerializer(serializers.ModelSerializer):
+    """Status (and, once done, result) of an asynchronous classification."""
+
+    job_id = serializers.UUIDField(source='id', read_only=True)
+
+    class Meta:
+        model = ClassificationJob
+        fields = ['job_id', 'status', 'result', 'created_at', 'finished_at']
+        read_only_fields = fields
@@ -3,19 +3,43 @@
 Uses Groq (Llama 3.3 70B) for fast, cost-effective ticket classification.
 The prompt instructs the model to return a JSON object with category and priority.
 All failures are handled gracefully — the system falls back to safe defaults.
+Valid model answers are cached (see classification_cache); fallbacks never are.
+``aclassify_ticket`` is the non-blocking variant used by the async views.
+
+Descriptions the keyword rules (``tickets.rules``) classify confidently are
+answered locally without a Groq call, and so, depending on
+``TICKET_CLASSIFIER['MODE']``, are those the offline-trained model
+(``tickets.local_model``) handles. A description close to a recent ticket's
+(``tickets.duplicates``) gets that ticket's category and priority, plus
+``duplicate_of``. Every answer names the tier that produced it in
+``classified_by``: ``rules``, ``model``, ``cache``, ``duplicate``, ``llm`` or
+``fallback``; ``tier_stats`` counts them per worker.
 """
+import contextvars
+import hashlib
 import json
 import logging
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 
+from asgiref.sync import sync_to_async
 from django.conf import settings
 
+from . import classification_cache, duplicates, llm, local_model, rules
+
 logger = logging.getLogger(__name__)
 
 FALLBACK_RESPONSE = {
     "suggested_category": "general",
     "suggested_priority": "low",
+    "classified_by": "fallback",
 }
 
+TIERS = ("rules", "model", "cache", "duplicate", "llm", "fallback")
+_tiers = Counter()
+_tiers_lock = threading.Lock()
+
 VALID_CATEGORIES = {"billing", "technical", "account", "general"}
 VALID_PRIORITIES = {"low", "medium", "high", "critical"}
 
@@ -42,66 +66,247 @@ CLASSIFICATION_PROMPT = (
     '{"category": "...", "priority": "..."}'
 )
 
+GROQ_MODEL = "llama-3.3-70b-versatile"
+
+# Part of the cache key, so editing the prompt invalidates cached answers
+PROMPT_VERSION = hashlib.sha256(CLASSIFICATION_PROMPT.encode()).hexdigest()[:12]
+
 
 def classify_ticket(description: str) -> dict:
     """
     Classify a ticket description using Groq API (Llama 3.3 70B).
 
-    Returns a dict with 'suggested_category' and 'suggested_priority'.
-    Falls back to general/low on any failure.
+    Returns a dict with 'suggested_category', 'suggested_priority' and
+    'classified_by'. Falls back to general/low on any failure.
     """
+    answer = classify_locally(description)
+    if answer is not None:
+        return answer
+
     api_key = getattr(settings, "GROQ_API_KEY", None)
 
     if not api_key:
         logger.warning("GROQ_API_KEY not configured, returning fallback classification.")
-        return FALLBACK_RESPONSE.copy()
+        return _fallback()
+
+    key = classification_cache.make_key(description, PROMPT_VERSION, GROQ_MODEL)
+    return _classify_uncached(key, description)
+
+
+def classify_offline(description: str):
+    """The rules' or the trained model's answer for ``description``, or None."""
+    match = rules.classify(description)
+    if match is not None:
+        return _answer(match.as_result(), "rules")
+    prediction = local_model.classify(description)
+    if prediction is not None:
+        return _answer(prediction.as_result(), "model")
+    return None
+
+
+def classify_locally(description: str):
+    """``classify_offline``'s, the cache's or a near-duplicate's answer for
+    ``description``, or None."""
+    answer = classify_offline(description)
+    if answer is not None:
+        return answer
+    if getattr(settings, "GROQ_API_KEY", None):
+        key = classification_cache.make_key(description, PROMPT_VERSION, GROQ_MODEL)
+        cached = classification_cache.get_cache().get(key)
+        if cached is not None:
+            return _answer(cached, "cache")
+    duplicate = duplicates.classify(description)
+    if duplicate is not None:
+        return _answer(duplicate, "duplicate")
+    return None
+
+
+async def aclassify_ticket(description: str) -> dict:
+    """``classify_ticket`` for async views: the Groq call does not block the loop."""
+    answer = classify_offline(description)
+    if answer is not None:
+        return answer
+
+    api_key = getattr(settings, "GROQ_API_KEY", None)
+
+    # The same tiers, in the same order, as classify_locally
+    cache = classification_cache.get_cache()
+    key = classification_cache.make_key(description, PROMPT_VERSION, GROQ_MODEL)
+    if api_key:
+        cached = await cache.aget(key)
+        if cached is not None:
+            return _answer(cached, "cache")
+    # May read new tickets; a sub-millisecond lookup otherwise
+    duplicate = await sync_to_async(duplicates.classify)(description)
+    if duplicate is not None:
+        return _answer(duplicate, "duplicate")
+
+    if not api_key:
+        logger.warning("GROQ_API_KEY not configured, returning fallback classification.")
+        return _fallback()
 
     try:
-        from groq import Groq
+        result, valid = await arequest_classification(description)
+    except json.JSONDecodeError:
+        logger.exception("Failed to parse LLM JSON response.")
+        return _fallback()
+    except Exception:
+        logger.exception("LLM classification failed.")
+        return _fallback()
 
-        client = Groq(api_key=api_key)
+    if valid:
+        await cache.aset(key, result)
+    return _answer(result, "llm")
 
-        prompt = f"{CLASSIFICATION_PROMPT}\n\nTicket description:\n{description}"
-        response = client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.1,
-            max_tokens=100,
-        )
 
-        content = response.choices[0].message.content.strip()
-        # Strip markdown code fences if the model wraps its response
-        if content.startswith("```"):
-            content = content.split("\n", 1)[-1].rsplit("```", 1)[0].strip()
+def classify_tickets(descriptions: list) -> list:
+    """
+    Classify many descriptions, returning results in input order.
 
-        parsed = json.loads(content)
+    Duplicates (after normalization) are classified once, rule, model and
+    cached answers are served directly, and the rest are sent to Groq concurrently,
+    at most ``CLASSIFY_BATCH_CONCURRENCY`` at a time. Each failed item gets
+    the fallback classification without affecting the others.
+    """
+    keys = [
+        classification_cache.make_key(d, PROMPT_VERSION, GROQ_MODEL)
+        for d in descriptions
+    ]
+    unique = dict(zip(keys, descriptions))
 
-        category = parsed.get("category", "").lower().strip()
-        priority = parsed.get("priority", "").lower().strip()
+    results = {}
+    for key, description in unique.items():
+        answer = classify_locally(description)
+        if answer is not None:
+            results[key] = answer
 
-        # Validate returned values against allowed choices
-        if category not in VALID_CATEGORIES:
-            logger.warning(
-                "LLM returned invalid category '%s', falling back to 'general'.",
-                category,
+    pending = [key for key in unique if key not in results]
+    if pending and not getattr(settings, "GROQ_API_KEY", None):
+        logger.warning("GROQ_API_KEY not configured, returning fallback classification.")
+        results.update((key, _fallback()) for key in pending)
+    elif pending:
+        workers = min(settings.CLASSIFY_BATCH_CONCURRENCY, len(pending))
+        # Each call runs in a copy of this thread's context, so request
+        # metrics (tickets.metrics) see its LLM time
+        contexts = [contextvars.copy_context() for _ in pending]
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            answers = executor.map(
+                lambda key, context: context.run(_classify_uncached, key, unique[key]),
+                pending,
+                contexts,
             )
-            category = "general"
+            results.update(zip(pending, answers))
 
-        if priority not in VALID_PRIORITIES:
-            logger.warning(
-                "LLM returned invalid priority '%s', falling back to 'low'.",
-                priority,
-            )
-            priority = "low"
+    return [dict(results[key]) for key in keys]
 
-        return {
-            "suggested_category": category,
-            "suggested_priority": priority,
-        }
 
+def _classify_uncached(key: str, description: str) -> dict:
+    """Ask the LLM, caching valid answers; returns the fallback on failure."""
+    try:
+        result, valid = request_classification(description)
     except json.JSONDecodeError:
         logger.exception("Failed to parse LLM JSON response.")
-        return FALLBACK_RESPONSE.copy()
+        return _fallback()
     except Exception:
         logger.exception("LLM classification failed.")
-        return FALLBACK_RESPONSE.copy()
+        return _fallback()
+
+    # Answers patched with per-field defaults are not cached either
+    if valid:
+        classification_cache.get_cache().set(key, result)
+    return _answer(result, "llm")
+
+
+def _answer(result: dict, tier: str) -> dict:
+    with _tiers_lock:
+        _tiers[tier] += 1
+    return {**result, "classified_by": tier}
+
+
+def _fallback() -> dict:
+    return _answer(FALLBACK_RESPONSE, "fallback")
+
+
+def tier_stats() -> dict:
+    """How many classifications each tier answered in this process."""
+    with _tiers_lock:
+        counts = {tier: _tiers.get(tier, 0) for tier in TIERS}
+    total = sum(counts.values())
+    counts["local_ratio"] = (
+        round(
+            (counts["rules"] + counts["model"] + counts["cache"] + counts["duplicate"])
+            / total,
+            4,
+        )
+        if total
+        else 0.0
+    )
+    return counts
+
+
+def reset_tier_stats() -> None:
+    with _tiers_lock:
+        _tiers.clear()
+
+
+def request_classification(description: str) -> tuple:
+    """
+    Send one description to Groq through the pooled client and parse the answer.
+
+    Returns ``(result, valid)`` where ``valid`` is False if any field had to
+    be replaced by its default. Raises on transport or JSON errors.
+    """
+    response = llm.chat_completion(**_completion_kwargs(description))
+    return parse_classification(response)
+
+
+async def arequest_classification(description: str) -> tuple:
+    """Async ``request_classification`` through the loop's pooled client."""
+    response = await llm.achat_completion(**_completion_kwargs(description))
+    return parse_classification(response)
+
+
+def _completion_kwargs(description: str) -> dict:
+    prompt = f"{CLASSIFICATION_PROMPT}\n\nTicket description:\n{description}"
+    return {
+        "model": GROQ_MODEL,
+        "messages": [{"role": "user", "content": prompt}],
+        "temperature": 0.1,
+        "max_tokens": 100,
+    }
+
+
+def parse_classification(response) -> tuple:
+    """Validate a chat completion into ``(result, valid)``."""
+    content = response.choices[0].message.content.strip()
+    # Strip markdown code fences if the model wraps its response
+    if content.startswith("```"):
+        content = content.split("\n", 1)[-1].rsplit("```", 1)[0].strip()
+
+    parsed = json.loads(content)
+
+    category = parsed.get("category", "").lower().strip()
+    priority = parsed.get("priority", "").lower().strip()
+    valid = True
+
+    # Validate returned values against allowed choices
+    if category not in VALID_CATEGORIES:
+        logger.warning(
+            "LLM returned invalid category '%s', falling back to 'general'.",
+            category,
+        )
+        category = "general"
+        valid = False
+
+    if priority not in VALID_PRIORITIES:
+        logger.warning(
+            "LLM returned invalid priority '%s', falling back to 'low'.",
+            priority,
+        )
+        priority = "low"
+        valid = False
+
+    return {
+        "suggested_category": category,
+        "suggested_priority": priority,
+    }, valid
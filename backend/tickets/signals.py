@@ -0,0 +1,46 @@
+"""Model signal handlers that keep derived ticket data (rollups, cached
+responses, the change feed, the duplicate index) in sync."""
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
+from django.dispatch import receiver
+
+from . import duplicates, events, rollups
+from .models import Ticket
+
+_BUCKET_SOURCE_FIELDS = ("created_at", "category", "priority", "status")
+
+
+@receiver(post_init, sender=Ticket)
+def remember_bucket(sender, instance, **kwargs):
+    # Snapshot the loaded bucket so post_save can tell what moved. Deferred
+    # fields are skipped to avoid a query per instance.
+    if instance.pk is not None and all(
+        f in instance.__dict__ for f in _BUCKET_SOURCE_FIELDS
+    ):
+        instance._loaded_bucket = rollups.bucket_for(instance)
+
+
+@receiver(pre_save, sender=Ticket)
+def load_missing_bucket(sender, instance, raw=False, **kwargs):
+    if raw or instance._state.adding or hasattr(instance, "_loaded_bucket"):
+        return
+    previous = Ticket.objects.filter(pk=instance.pk).first()
+    if previous is not None:
+        instance._loaded_bucket = previous._loaded_bucket
+
+
+@receiver(post_save, sender=Ticket)
+def update_rollups_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    before = getattr(instance, "_loaded_bucket", None)
+    if created or before is None:
+        events.ticket_created(instance, rollups.record_created([instance]))
+    else:
+        events.ticket_updated(instance, rollups.record_changed(before, instance))
+    instance._loaded_bucket = rollups.bucket_for(instance)
+    duplicates.ticket_saved(instance, created or before is None)
+
+
+@receiver(post_delete, sender=Ticket)
+def update_rollups_on_delete(sender, instance, **kwargs):
+    events.ticket_deleted(instance, rollups.record_deleted([instance]))
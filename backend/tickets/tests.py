@@ -1,8 +1,58 @@
-from django.test import TestCase
+import asyncio
+import csv
+import json
+import os
+import sqlite3
+import time
+import tempfile
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from importlib import import_module
+from io import StringIO
+from types import SimpleNamespace
+from unittest import mock
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.conf import settings
+from django.core.cache import cache
+from django.db import OperationalError, connection, connections
+from django.http import HttpResponse
+from django.test import AsyncRequestFactory, RequestFactory, TestCase, override_settings
+from django.urls import resolve
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
 from rest_framework.test import APIClient
 from rest_framework import status as http_status
 
-from .models import Ticket
+from . import (
+    archive,
+    async_views,
+    benchmarks,
+    classification_cache,
+    duplicates,
+    events,
+    jobs,
+    llm,
+    local_model,
+    metrics,
+    pool,
+    replicas,
+    response_cache,
+    rollups,
+    rows,
+    services,
+    windows,
+)
+from .llm_stub import StubLLMServer
+from .middleware import RequestMetricsMiddleware
+from .models import ArchivedTicket, ClassificationJob, Ticket, TicketEvent, TicketStat
+from .pagination import KeysetPagination
+from .renderers import FastJSONRenderer
+from .serializers import TicketSerializer
 
 
 class TicketModelTest(TestCase):
@@ -106,3 +156,2106 @@ class TicketAPITest(TestCase):
         self.assertEqual(response.status_code, http_status.HTTP_200_OK)
         self.assertEqual(response.data["suggested_category"], "general")
         self.assertEqual(response.data["suggested_priority"], "low")
+
+
+class TicketStatRollupTest(TestCase):
+    """Tests for the incrementally maintained stats rollups."""
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_rollups_follow_create_and_patch(self):
+        response = self.client.post(
+            "/api/tickets/",
+            {"title": "T1", "description": "d", "category": "billing", "priority": "low"},
+            format="json",
+        )
+        self.client.patch(
+            f"/api/tickets/{response.data['id']}/",
+            {"status": "closed", "priority": "high"},
+            format="json",
+        )
+        self.assertEqual(rollups.check(), [])
+
+        stats = self.client.get("/api/tickets/stats/").data
+        self.assertEqual(stats["total_tickets"], 1)
+        self.assertEqual(stats["open_tickets"], 0)
+        self.assertEqual(stats["avg_tickets_per_day"], 1.0)
+        self.assertEqual(stats["priority_breakdown"]["high"], 1)
+        self.assertEqual(stats["priority_breakdown"]["low"], 0)
+
+    def test_delete_decrements_rollups(self):
+        ticket = Ticket.objects.create(
+            title="T1", description="d", category="account", priority="medium"
+        )
+        ticket.delete()
+        self.assertEqual(rollups.check(), [])
+        self.assertEqual(rollups.summary()["total_tickets"], 0)
+
+    def test_rebuild_and_check_command(self):
+        Ticket.objects.create(
+            title="T1", description="d", category="billing", priority="low"
+        )
+        TicketStat.objects.update(count=5)
+        with self.assertRaises(CommandError):
+            call_command("rebuild_stats", "--check", stdout=StringIO())
+
+        call_command("rebuild_stats", stdout=StringIO())
+        call_command("rebuild_stats", "--check", stdout=StringIO())
+        self.assertEqual(rollups.summary()["total_tickets"], 1)
+
+
+class TicketPaginationTest(TestCase):
+    """Tests for keyset pagination and cached list counts."""
+
+    def setUp(self):
+        self.client = APIClient()
+        cache.clear()
+        self.tickets = [
+            Ticket.objects.create(
+                title=f"T{i}", description="d", category="general", priority="low"
+            )
+            for i in range(5)
+        ]
+        # Force timestamp ties so ordering relies on the id tiebreaker
+        Ticket.objects.filter(id__in=[t.id for t in self.tickets[1:4]]).update(
+            created_at=timezone.now()
+        )
+
+    def walk(self, url):
+        ids = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, http_status.HTTP_200_OK)
+            ids.extend(row["id"] for row in response.data["results"])
+            url = response.data["next"]
+        return ids
+
+    @mock.patch.object(KeysetPagination, "page_size", 2)
+    def test_cursor_pages_are_stable(self):
+        expected = list(
+            Ticket.objects.order_by("-created_at", "-id").values_list("id", flat=True)
+        )
+        first = self.client.get("/api/tickets/?pagination=cursor").data
+        self.assertNotIn("count", first)
+        self.assertIsNone(first["previous"])
+
+        # A ticket inserted mid-walk must not shift the remaining pages
+        Ticket.objects.create(
+            title="New", description="d", category="general", priority="low"
+        )
+        ids = [row["id"] for row in first["results"]] + self.walk(first["next"])
+        self.assertEqual(ids, expected)
+
+    @mock.patch.object(KeysetPagination, "page_size", 2)
+    def test_cursor_previous_link(self):
+        first = self.client.get("/api/tickets/?pagination=cursor").data
+        second = self.client.get(first["next"]).data
+        back = self.client.get(second["previous"]).data
+        self.assertEqual(back["results"], first["results"])
+
+    def test_invalid_cursor(self):
+        response = self.client.get("/api/tickets/?cursor=bogus")
+        self.assertEqual(response.status_code, http_status.HTTP_404_NOT_FOUND)
+
+    def test_page_count_is_cached(self):
+        self.assertEqual(self.client.get("/api/tickets/").data["count"], 5)
+        Ticket.objects.create(
+            title="New", description="d", category="general", priority="low"
+        )
+        # A write invalidates the cached count
+        response = self.client.get("/api/tickets/")
+        self.assertEqual(response.data["count"], 6)
+        self.assertEqual(len(response.data["results"]), 6)
+        self.assertEqual(
+            self.client.get("/api/tickets/?pagination=cursor&count=1").data["count"], 6
+        )
+
+    def test_page_count_is_reused_between_writes(self):
+        with self.assertNumQueries(2):
+            self.client.get("/api/tickets/")
+        with self.assertNumQueries(1):
+            self.client.get("/api/tickets/?page=1")
+
+
+class TicketSearchTest(TestCase):
+    """Tests for the full-text search backend (FTS5 on SQLite)."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.refund = Ticket.objects.create(
+            title="Refund request",
+            description="I was charged twice for my subscription",
+            category="billing",
+            priority="medium",
+        )
+        self.crash = Ticket.objects.create(
+            title="App crashes",
+            description="The dashboard crashes when I open the refund page",
+            category="technical",
+            priority="high",
+        )
+
+    def search(self, query, extra=""):
+        response = self.client.get(f"/api/tickets/?search={query}{extra}")
+        self.assertEqual(response.status_code, http_status.HTTP_200_OK)
+        return [row["id"] for row in response.data["results"]]
+
+    def test_matches_title_and_description_ranked(self):
+        self.assertEqual(self.search("refund"), [self.refund.id, self.crash.id])
+        self.assertEqual(self.search("charged twice"), [self.refund.id])
+
+    def test_prefix_and_punctuation(self):
+        self.assertEqual(self.search("subscri"), [self.refund.id])
+        self.assertEqual(self.search("crash!!"), [self.crash.id])
+        self.assertEqual(len(self.search("%22%2A")), 2)
+
+    def test_index_follows_updates_and_deletes(self):
+        Ticket.objects.filter(id=self.crash.id).update(description="Login is slow")
+        self.assertEqual(self.search("refund"), [self.refund.id])
+        self.refund.delete()
+        self.assertEqual(self.search("refund"), [])
+
+    def test_search_combines_with_filters_and_cursor(self):
+        self.assertEqual(self.search("refund", "&category=technical"), [self.crash.id])
+        self.assertEqual(
+            self.search("refund", "&pagination=cursor"), [self.crash.id, self.refund.id]
+        )
+
+    def test_migration_only_tolerates_a_missing_extension(self):
+        migration = import_module("tickets.migrations.0003_search_index_and_anyticket_view")
+        operation = migration.Migration.operations[1]
+
+        def run(vendor, error):
+            editor = SimpleNamespace(
+                connection=SimpleNamespace(vendor=vendor, alias="default"),
+                execute=mock.Mock(side_effect=error),
+            )
+            operation.database_forwards("tickets", editor, None, None)
+            return editor.execute
+
+        with self.assertLogs(migration.__name__, "ERROR"):
+            run("sqlite", OperationalError("no such module: fts5"))
+        with self.assertRaises(OperationalError):
+            run("sqlite", OperationalError("database is locked"))
+        run("postgresql", None).assert_not_called()
+
+
+@override_settings(GROQ_API_KEY="test-key")
+class ClassificationCacheTest(TestCase):
+    """Tests for the classification result cache in front of the LLM."""
+
+    def setUp(self):
+        self.client = APIClient()
+        cache.clear()
+        classification_cache.get_cache().clear()
+        patcher = mock.patch.object(
+            services,
+            "request_classification",
+            return_value=(
+                {"suggested_category": "billing", "suggested_priority": "high"},
+                True,
+            ),
+        )
+        self.llm = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_normalized_descriptions_share_an_entry(self):
+        first = services.classify_ticket("I was charged twice this month")
+        second = services.classify_ticket("  i was CHARGED   twice this month ")
+        self.assertEqual(first["classified_by"], "llm")
+        self.assertEqual(second, {**first, "classified_by": "cache"})
+        self.assertEqual(self.llm.call_count, 1)
+
+        stats = self.client.get("/api/tickets/cache/").data["classification"]
+        self.assertEqual(stats["local_hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+
+    def test_shared_tier_serves_other_workers(self):
+        services.classify_ticket("I was charged twice this month")
+        # Simulate another worker: empty in-process tier, same shared cache
+        classification_cache.get_cache().local.clear()
+        services.classify_ticket("I was charged twice this month")
+        self.assertEqual(self.llm.call_count, 1)
+        self.assertEqual(classification_cache.get_cache().stats()["shared_hits"], 1)
+
+    def test_counters_add_up_across_threads(self):
+        results = classification_cache.ClassificationCache(max_entries=10, ttl=60)
+        results.local.set("hit", {"suggested_category": "billing"})
+
+        def look_up(_):
+            for _ in range(500):
+                results.get("hit")
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(look_up, range(8)))
+        self.assertEqual(results.stats()["local_hits"], 4000)
+
+    def test_fallbacks_are_not_cached(self):
+        self.llm.side_effect = RuntimeError("API down")
+        with self.assertLogs("tickets.services", "ERROR"):
+            self.assertEqual(
+                services.classify_ticket("The whole system is down"),
+                services.FALLBACK_RESPONSE,
+            )
+        self.llm.side_effect = None
+        self.llm.return_value = (
+            {"suggested_category": "general", "suggested_priority": "low"},
+            False,
+        )
+        services.classify_ticket("The whole system is down")
+        services.classify_ticket("The whole system is down")
+        self.assertEqual(self.llm.call_count, 3)
+
+    def test_lru_eviction_and_ttl(self):
+        lru = classification_cache.LRUCache(max_entries=2, ttl=60)
+        lru.set("a", 1)
+        lru.set("b", 2)
+        lru.get("a")
+        lru.set("c", 3)
+        self.assertIsNone(lru.get("b"))
+        self.assertEqual(lru.get("a"), 1)
+
+        expired = classification_cache.LRUCache(max_entries=2, ttl=-1)
+        expired.set("a", 1)
+        self.assertIsNone(expired.get("a"))
+
+
+@override_settings(GROQ_API_KEY="test-key")
+class ClassificationRulesTest(TestCase):
+    """Tests for the keyword pre-classifier in front of the cache and LLM."""
+
+    def setUp(self):
+        self.client = APIClient()
+        classification_cache.get_cache().clear()
+        services.reset_tier_stats()
+        patcher = mock.patch.object(
+            services,
+            "request_classification",
+            return_value=(
+                {"suggested_category": "general", "suggested_priority": "medium"},
+                True,
+            ),
+        )
+        self.llm = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_obvious_tickets_skip_the_llm(self):
+        cases = {
+            "Production outage: the site is down and every page is a 500 error": (
+                "technical",
+                "critical",
+            ),
+            "I was charged twice and need a refund, this is urgent": ("billing", "high"),
+            "Small typo on the invoice page, would be nice to fix": ("billing", "low"),
+        }
+        for description, (category, priority) in cases.items():
+            response = self.client.post(
+                "/api/tickets/classify/", {"description": description}, format="json"
+            )
+            self.assertEqual(
+                response.data,
+                {
+                    "suggested_category": category,
+                    "suggested_priority": priority,
+                    "classified_by": "rules",
+                },
+            )
+        # No API key needed either
+        with override_settings(GROQ_API_KEY=None):
+            result = services.classify_ticket(
+                "Hacked right after a password reset, this is a security breach"
+            )
+        self.assertEqual(
+            (result["suggested_category"], result["suggested_priority"]),
+            ("account", "critical"),
+        )
+        self.assertEqual(self.llm.call_count, 0)
+
+    def test_ambiguous_tickets_escalate(self):
+        for description in [
+            "How do I change the language of the dashboard?",
+            # Evidence split between billing and account
+            "I was charged twice and now I cannot log in",
+            # Category is clear, priority is not
+            "Please send me the invoice for last month",
+        ]:
+            result = services.classify_ticket(description)
+            self.assertEqual(result["classified_by"], "llm", description)
+        self.assertEqual(services.classify_ticket(description)["classified_by"], "cache")
+
+        with override_settings(
+            CLASSIFY_RULES={**settings.CLASSIFY_RULES, "ENABLED": False}
+        ):
+            result = services.classify_ticket("Site outage, system down for everyone")
+        self.assertEqual(result["classified_by"], "llm")
+
+        tiers = self.client.get("/api/tickets/cache/").data["classifier_tiers"]
+        self.assertEqual(
+            (tiers["rules"], tiers["cache"], tiers["llm"], tiers["fallback"]),
+            (0, 1, 4, 0),
+        )
+        self.assertEqual(tiers["local_ratio"], 0.2)
+
+    def test_batch_and_jobs_use_rules(self):
+        results = services.classify_tickets(
+            ["The app crashes on startup, we are completely blocked", "Hello there"]
+        )
+        self.assertEqual([r["classified_by"] for r in results], ["rules", "llm"])
+        self.assertEqual(self.llm.call_count, 1)
+
+        response = self.client.post(
+            "/api/tickets/classify/?async=1",
+            {"description": "Data loss after the update, system down"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, http_status.HTTP_200_OK)
+        self.assertEqual(response.data["result"]["classified_by"], "rules")
+
+
+@override_settings(GROQ_API_KEY="test-key")
+class LocalModelTest(TestCase):
+    """Tests for the offline-trained classifier and its serving modes."""
+
+    EXAMPLES = [
+        ("my monthly statement shows an unexpected amount", "billing", "medium"),
+        ("the dashboard widget shows a blank chart", "technical", "low"),
+        ("our whole team lost access to the workspace today", "account", "critical"),
+        ("where can i find your office opening hours", "general", "low"),
+    ]
+
+    def setUp(self):
+        services.reset_tier_stats()
+        local_model.reset()
+        self.addCleanup(local_model.reset)
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = f"{tmp.name}/model.tknb"
+        self.settings = {
+            "MODE": "local",
+            "MODEL_PATH": self.path,
+            "MIN_CONFIDENCE": 0.9,
+        }
+        Ticket.objects.bulk_create(
+            [
+                Ticket(
+                    title="t",
+                    description=f"{description} (case {n})",
+                    category=category,
+                    priority=priority,
+                )
+                for description, category, priority in self.EXAMPLES
+                for n in range(30)
+            ]
+        )
+        patcher = mock.patch.object(
+            services,
+            "request_classification",
+            return_value=(
+                {"suggested_category": "general", "suggested_priority": "medium"},
+                True,
+            ),
+        )
+        self.llm = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def train(self, *args):
+        out = StringIO()
+        with override_settings(TICKET_CLASSIFIER=self.settings):
+            call_command(
+                "train_classifier", "--min-tickets", "50", *args, stdout=out
+            )
+        return out.getvalue()
+
+    def test_train_reports_and_predicts(self):
+        report = self.train("--holdout", "0.2", "--hash-bits", "12")
+        self.assertIn("category accuracy: 1.000", report)
+        self.assertIn("priority accuracy: 1.000", report)
+        self.assertIn("latency ms: p50", report)
+
+        model = local_model.LocalModel(self.path)
+        self.assertEqual(model.n_features, 4096)
+        self.assertTrue(model.version)
+        prediction = model.predict("Unexpected amount on my statement")
+        self.assertEqual((prediction.category, prediction.priority), ("billing", "medium"))
+        self.assertGreater(prediction.confidence, 0.9)
+
+        with self.assertRaises(CommandError):
+            self.train("--min-tickets", "1000")
+
+    def test_modes(self):
+        self.train()
+        clear = "Lost access to the workspace for the whole team"
+        vague = "Hello there"
+        with override_settings(TICKET_CLASSIFIER=self.settings):
+            self.assertEqual(
+                services.classify_ticket(clear),
+                {
+                    "suggested_category": "account",
+                    "suggested_priority": "critical",
+                    "classified_by": "model",
+                },
+            )
+            self.assertEqual(services.classify_ticket(vague)["classified_by"], "model")
+        with override_settings(TICKET_CLASSIFIER={**self.settings, "MODE": "hybrid"}):
+            self.assertEqual(services.classify_ticket(clear)["classified_by"], "model")
+            self.assertEqual(services.classify_ticket(vague)["classified_by"], "llm")
+        with override_settings(TICKET_CLASSIFIER={**self.settings, "MODE": "llm"}):
+            self.assertEqual(services.classify_ticket(clear)["classified_by"], "llm")
+        self.assertEqual(self.llm.call_count, 2)
+        self.assertEqual(services.tier_stats()["model"], 3)
+
+    def test_missing_or_foreign_artifact_falls_back_to_llm(self):
+        with open(self.path, "wb") as handle:
+            handle.write(b"not a model")
+        with override_settings(TICKET_CLASSIFIER=self.settings):
+            with self.assertLogs("tickets.local_model", "ERROR"):
+                result = services.classify_ticket("Unexpected amount on my statement")
+        self.assertEqual(result["classified_by"], "llm")
+
+        local_model.reset()
+        missing = {**self.settings, "MODEL_PATH": f"{self.path}.missing"}
+        with override_settings(TICKET_CLASSIFIER=missing):
+            with self.assertLogs("tickets.local_model", "ERROR"):
+                self.assertIsNone(local_model.get_model())
+
+
+class GroqClientTest(TestCase):
+    """Tests for the pooled Groq client against a local stub API."""
+
+    def setUp(self):
+        cache.clear()
+        classification_cache.get_cache().clear()
+        self.stub = StubLLMServer(reply={"category": "account", "priority": "high"})
+        self.stub.start()
+        self.addCleanup(self.stub.stop)
+        client_settings = {
+            **settings.GROQ_CLIENT,
+            "BASE_URL": self.stub.base_url,
+            "TIMEOUT": 1.0,
+            "BACKOFF_BASE": 0.01,
+        }
+        overrides = override_settings(GROQ_API_KEY="test-key", GROQ_CLIENT=client_settings)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        self.addCleanup(llm.reset)
+
+    def test_connections_are_reused(self):
+        for i in range(3):
+            result = services.classify_ticket(f"Cannot reset my password, attempt {i}")
+            self.assertEqual(
+                result,
+                {
+                    "suggested_category": "account",
+                    "suggested_priority": "high",
+                    "classified_by": "llm",
+                },
+            )
+        self.assertEqual(self.stub.requests, 3)
+        self.assertEqual(self.stub.connections, 1)
+
+    def test_retries_transient_failures(self):
+        self.stub.failures = [503, 429]
+        with self.assertLogs("tickets.llm", "WARNING"):
+            result = services.classify_ticket("Checkout page returns an error")
+        self.assertEqual(result["suggested_category"], "account")
+        self.assertEqual(self.stub.requests, 3)
+
+    def test_retry_budget_exhausted_falls_back(self):
+        self.stub.failures = [500, 500, 500, 500]
+        with self.assertLogs("tickets", "WARNING"):
+            result = services.classify_ticket("Checkout page returns an error")
+        self.assertEqual(result, services.FALLBACK_RESPONSE)
+        self.assertEqual(self.stub.requests, settings.GROQ_CLIENT["MAX_RETRIES"] + 1)
+
+    def test_timeout_falls_back(self):
+        self.stub.latency = 0.5
+        with override_settings(
+            GROQ_CLIENT={**settings.GROQ_CLIENT, "TIMEOUT": 0.1, "MAX_RETRIES": 0}
+        ), self.assertLogs("tickets.services", "ERROR"):
+            result = services.classify_ticket("Checkout page returns an error")
+        self.assertEqual(result, services.FALLBACK_RESPONSE)
+
+    def test_batch_dedupes_and_serves_cache(self):
+        services.classify_ticket("Invoice shows the wrong amount")
+        self.stub.reply = lambda prompt: (
+            {"category": "billing", "priority": "low"}
+            if "refund" in prompt.rsplit("Ticket description:", 1)[-1].lower()
+            else {"category": "technical", "priority": "critical"}
+        )
+        response = APIClient().post(
+            "/api/tickets/classify/batch/",
+            {
+                "descriptions": [
+                    "Please refund my last order",
+                    "Invoice shows the wrong amount",
+                    "The whole site is down",
+                    "please REFUND my last   order",
+                ]
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, http_status.HTTP_200_OK)
+        categories = [r["suggested_category"] for r in response.data["results"]]
+        self.assertEqual(categories, ["billing", "account", "technical", "billing"])
+        # One earlier call, then one per unique uncached description
+        self.assertEqual(self.stub.requests, 3)
+
+    def test_batch_item_failure_uses_fallback(self):
+        self.stub.failures = [500]
+        with override_settings(
+            GROQ_CLIENT={**settings.GROQ_CLIENT, "MAX_RETRIES": 0},
+            CLASSIFY_BATCH_CONCURRENCY=1,
+        ), self.assertLogs("tickets.services", "ERROR"):
+            results = services.classify_tickets(
+                ["First broken description", "Second working description"]
+            )
+        self.assertEqual(results[0], services.FALLBACK_RESPONSE)
+        self.assertEqual(results[1]["suggested_category"], "account")
+
+    def test_batch_validation(self):
+        response = APIClient().post(
+            "/api/tickets/classify/batch/", {"descriptions": ["short"]}, format="json"
+        )
+        self.assertEqual(response.status_code, http_status.HTTP_400_BAD_REQUEST)
+
+    def test_client_rebuilt_after_fork(self):
+        client = llm.get_client()
+        self.assertIs(llm.get_client(), client)
+        with mock.patch("os.getpid", return_value=-1):
+            self.assertIsNot(llm.get_client(), client)
+
+
+class BulkIngestTest(TestCase):
+    """Tests for streaming bulk ingestion."""
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_ndjson_reports_row_errors_without_aborting(self):
+        rows = [
+            {"title": "A", "description": "d", "category": "billing", "priority": "low"},
+            {"title": "B", "description": "d", "category": "nope", "priority": "low"},
+            {"title": "C", "description": "d", "category": "account", "priority": "high"},
+        ]
+        body = "\n".join(json.dumps(r) for r in rows) + "\n{broken\n"
+        with self.settings(TICKET_INGEST_BATCH_SIZE=2):
+            response = self.client.generic(
+                "POST", "/api/tickets/bulk/", body, content_type="application/x-ndjson"
+            )
+        self.assertEqual(response.status_code, http_status.HTTP_200_OK)
+        self.assertEqual(response.data["created"], 2)
+        self.assertEqual(response.data["failed"], 2)
+        self.assertEqual([e["line"] for e in response.data["errors"]], [2, 4])
+        self.assertIn("category", response.data["errors"][0]["errors"])
+        self.assertEqual(rollups.check(), [])
+        self.assertEqual(rollups.summary()["total_tickets"], 2)
+
+    def test_csv_upload(self):
+        body = (
+            "title,description,category,priority,status\n"
+            'Refund,"multi\nline",billing,medium,open\n'
+            "Crash,boom,technical,critical,in_progress\n"
+        )
+        response = self.client.generic(
+            "POST", "/api/tickets/bulk/", body, content_type="text/csv"
+        )
+        self.assertEqual(response.data["created"], 2)
+        self.assertEqual(Ticket.objects.get(title="Refund").description, "multi\nline")
+        self.assertEqual(Ticket.objects.get(title="Crash").status, "in_progress")
+
+    def test_unsupported_media_type(self):
+        response = self.client.post("/api/tickets/bulk/", [], format="json")
+        self.assertEqual(
+            response.status_code, http_status.HTTP_415_UNSUPPORTED_MEDIA_TYPE
+        )
+
+    def test_management_command(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".csv") as handle:
+            handle.write("title,description,category,priority\n")
+            handle.write("T1,d,general,low\nT2,d,general,urgent\n")
+            handle.flush()
+            out, err = StringIO(), StringIO()
+            call_command("ingest_tickets", handle.name, stdout=out, stderr=err)
+        self.assertIn("Created 1 ticket(s)", out.getvalue())
+        self.assertIn("line 3", err.getvalue())
+
+
+class BulkUpdateTest(TestCase):
+    """Tests for PATCH /api/tickets/bulk/."""
+
+    def setUp(self):
+        self.client = APIClient()
+        cache.clear()
+        self.billing = [
+            Ticket.objects.create(
+                title=f"Refund {i}", description="Charged twice", category="billing"
+            )
+            for i in range(3)
+        ]
+        self.other = Ticket.objects.create(
+            title="Login", description="Cannot sign in", category="account"
+        )
+
+    def patch(self, data):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.patch("/api/tickets/bulk/", data, format="json")
+
+    def test_update_by_ids_keeps_rollups_and_stats_in_step(self):
+        self.assertEqual(self.client.get("/api/tickets/stats/").data["open_tickets"], 4)
+        Ticket.objects.filter(pk=self.billing[0].pk).update(status="closed")
+        rollups.rebuild()
+
+        ids = [t.pk for t in self.billing] + [10**6]
+        # Savepoint, lock, bucket count, one UPDATE, two rollup buckets,
+        # release, then the event row on commit
+        with self.assertNumQueries(8):
+            response = self.patch({"ids": ids, "status": "closed"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.data, {"matched": 3, "updated": 2, "not_found": [10**6]}
+        )
+        self.assertEqual(rollups.stored_counts(), rollups.live_counts())
+        self.assertEqual(self.client.get("/api/tickets/stats/").data["open_tickets"], 1)
+        event = TicketEvent.objects.get(kind="bulk_updated")
+        self.assertEqual(event.stats, {"open_tickets": -2})
+
+    def test_update_by_filter(self):
+        response = self.patch(
+            {
+                "filter": {"category": "billing", "search": "refund"},
+                "priority": "critical",
+                "category": "technical",
+            }
+        )
+        self.assertEqual(response.data["updated"], 3)
+        self.assertEqual(
+            set(Ticket.objects.values_list("category", "priority")),
+            {("technical", "critical"), ("account", "low")},
+        )
+        self.assertEqual(rollups.stored_counts(), rollups.live_counts())
+
+    def test_rejects_ambiguous_or_invalid_requests(self):
+        for data in [
+            {"ids": [self.other.pk], "status": "done"},
+            {"ids": [self.other.pk]},
+            {"ids": [self.other.pk], "filter": {"status": "open"}, "status": "closed"},
+            {"filter": {"stauts": "open"}, "status": "closed"},
+            {"filter": {"category": "x"}, "status": "closed"},
+            {"filter": {}, "status": "closed"},
+        ]:
+            response = self.client.patch("/api/tickets/bulk/", data, format="json")
+            self.assertEqual(response.status_code, http_status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Ticket.objects.exclude(status="open").exists())
+
+    @override_settings(TICKET_BULK_UPDATE_MAX_IDS=2)
+    def test_filter_selection_is_bounded(self):
+        response = self.patch({"filter": {"category": "billing"}, "status": "closed"})
+        self.assertEqual(response.status_code, http_status.HTTP_400_BAD_REQUEST)
+        self.assertIn("filter", response.data)
+        self.assertFalse(Ticket.objects.exclude(status="open").exists())
+
+        response = self.patch({"filter": {"category": "account"}, "status": "closed"})
+        self.assertEqual(response.data["updated"], 1)
+
+
+class TicketExportTest(TestCase):
+    """Tests for the streaming export action."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.billing = Ticket.objects.create(
+            title="Refund, please",
+            description="Charged twice",
+            category="billing",
+            priority="high",
+        )
+        Ticket.objects.create(
+            title="Crash", description="App crashes", category="technical", priority="low"
+        )
+
+    def read(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, http_status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        return response, b"".join(response.streaming_content).decode()
+
+    def test_csv_honors_filters(self):
+        response, body = self.read("/api/tickets/export/?category=billing")
+        self.assertEqual(response["Content-Type"], "text/csv")
+        rows = list(csv.DictReader(body.splitlines()))
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["title"], "Refund, please")
+        self.assertEqual(rows[0]["id"], str(self.billing.id))
+
+    def test_ndjson_matches_serializer_and_search(self):
+        _, body = self.read("/api/tickets/export/?export_format=ndjson&search=charged")
+        rows = [json.loads(line) for line in body.splitlines()]
+        detail = self.client.get("/api/tickets/?search=charged").data["results"][0]
+        self.assertEqual(rows, [dict(detail)])
+
+    def test_unknown_format(self):
+        response = self.client.get("/api/tickets/export/?export_format=xml")
+        self.assertEqual(response.status_code, http_status.HTTP_400_BAD_REQUEST)
+
+
+@override_settings(GROQ_API_KEY="test-key")
+class ClassificationJobTest(TestCase):
+    """Tests for asynchronous classification jobs and their worker."""
+
+    def setUp(self):
+        self.client = APIClient()
+        cache.clear()
+        classification_cache.get_cache().clear()
+        patcher = mock.patch.object(
+            services,
+            "request_classification",
+            return_value=(
+                {"suggested_category": "billing", "suggested_priority": "high"},
+                True,
+            ),
+        )
+        self.llm = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def enqueue(self, description="I was charged twice this month"):
+        return self.client.post(
+            "/api/tickets/classify/?async=1", {"description": description}, format="json"
+        )
+
+    def work(self):
+        call_command(
+            "run_classification_worker", "--once", "--concurrency=1", stdout=StringIO()
+        )
+
+    def test_async_classify_round_trip(self):
+        response = self.enqueue()
+        self.assertEqual(response.status_code, http_status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data["status"], "pending")
+        # Identical in-flight descriptions share one job
+        self.assertEqual(self.enqueue().data["job_id"], response.data["job_id"])
+        self.assertEqual(self.llm.call_count, 0)
+
+        self.work()
+        job = self.client.get(response.data["status_url"]).data
+        self.assertEqual(job["status"], "done")
+        self.assertEqual(job["result"]["suggested_category"], "billing")
+        self.assertEqual(self.llm.call_count, 1)
+
+        # Now cached: a new job completes without queueing
+        again = self.enqueue()
+        self.assertEqual(again.status_code, http_status.HTTP_200_OK)
+        self.assertEqual(again.data["result"], {**job["result"], "classified_by": "cache"})
+
+    def test_wait_returns_current_state_after_timeout(self):
+        job_id = self.enqueue().data["job_id"]
+        with override_settings(
+            CLASSIFY_JOBS={**settings.CLASSIFY_JOBS, "WAIT_POLL_INTERVAL": 0.01}
+        ):
+            response = self.client.get(
+                f"/api/tickets/classify/jobs/{job_id}/?wait=0.05"
+            )
+        self.assertEqual(response.data["status"], "pending")
+        self.assertEqual(response["Retry-After"], "1")
+
+    def test_sync_wait_is_capped_and_async_wait_sleeps_on_the_loop(self):
+        job_id = self.enqueue().data["job_id"]
+        url = f"/api/tickets/classify/jobs/{job_id}/?wait=30"
+        with override_settings(
+            CLASSIFY_JOBS={
+                **settings.CLASSIFY_JOBS,
+                "WAIT_POLL_INTERVAL": 0.01,
+                "SYNC_MAX_WAIT": 0.05,
+                "MAX_WAIT": 0.1,
+            }
+        ):
+            start = time.monotonic()
+            self.assertEqual(self.client.get(url).data["status"], "pending")
+            self.assertLess(time.monotonic() - start, 1)
+
+            request = AsyncRequestFactory().get(url)
+            # Never blocks the event loop's thread
+            with mock.patch("tickets.jobs.time.sleep", side_effect=AssertionError):
+                response = async_to_sync(async_views.ticket_classify_job)(
+                    request, job_id=job_id
+                )
+        self.assertEqual(json.loads(response.content)["status"], "pending")
+        self.assertEqual(response["Retry-After"], "1")
+
+        self.work()
+        response = async_to_sync(async_views.ticket_classify_job)(
+            AsyncRequestFactory().get(url), job_id=job_id
+        )
+        self.assertEqual(json.loads(response.content)["status"], "done")
+        self.assertFalse(response.has_header("Retry-After"))
+        response = async_to_sync(async_views.ticket_classify_job)(
+            AsyncRequestFactory().get("/"), job_id="0000-bad"
+        )
+        self.assertEqual(response.status_code, http_status.HTTP_404_NOT_FOUND)
+
+    def test_unknown_and_expired_jobs(self):
+        response = self.client.get("/api/tickets/classify/jobs/0000-bad/")
+        self.assertEqual(response.status_code, http_status.HTTP_404_NOT_FOUND)
+
+        job_id = self.enqueue().data["job_id"]
+        expired = timezone.now() - timedelta(seconds=1)
+        ClassificationJob.objects.update(expires_at=expired)
+        response = self.client.get(f"/api/tickets/classify/jobs/{job_id}/")
+        self.assertEqual(response.status_code, http_status.HTTP_404_NOT_FOUND)
+
+        # The same description gets a fresh job instead of the expired one
+        again = self.enqueue().data
+        self.assertNotEqual(again["job_id"], job_id)
+        response = self.client.get(again["status_url"])
+        self.assertEqual(response.status_code, http_status.HTTP_200_OK)
+
+        ClassificationJob.objects.update(expires_at=expired)
+        self.assertEqual(jobs.purge_expired(), 1)
+
+    def test_stale_jobs_are_requeued_then_abandoned(self):
+        self.enqueue()
+        [job] = jobs.claim(10)
+        self.assertEqual(jobs.claim(10), [])
+        long_ago = timezone.now() - timedelta(hours=1)
+        ClassificationJob.objects.update(started_at=long_ago)
+        with self.assertLogs("tickets.jobs", "WARNING"):
+            jobs.recover_stale()
+        job.refresh_from_db()
+        self.assertEqual(job.status, "pending")
+
+        ClassificationJob.objects.update(
+            status="running",
+            started_at=long_ago,
+            attempts=settings.CLASSIFY_JOBS["MAX_ATTEMPTS"],
+        )
+        with self.assertLogs("tickets.jobs", "WARNING"):
+            jobs.recover_stale()
+        job.refresh_from_db()
+        self.assertEqual(job.status, "done")
+        self.assertEqual(job.result, services.FALLBACK_RESPONSE)
+
+
+class AsyncViewTest(TestCase):
+    """Tests for the async list/stats/classify views served under ASGI."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.factory = AsyncRequestFactory()
+        cache.clear()
+        classification_cache.get_cache().clear()
+        for i in range(3):
+            Ticket.objects.create(
+                title=f"Refund request {i}",
+                description="Charged twice for my subscription",
+                category="billing",
+                priority="high",
+            )
+        Ticket.objects.create(
+            title="Login broken",
+            description="Password reset email never arrives",
+            category="account",
+            priority="medium",
+        )
+
+    def call(self, view, method, url, data=None):
+        request = getattr(self.factory, method)(url, data, content_type="application/json")
+        return async_to_sync(view)(request)
+
+    def test_list_matches_sync_view(self):
+        for url in [
+            "/api/tickets/",
+            "/api/tickets/?category=billing&search=refund",
+            "/api/tickets/?pagination=cursor&count=1",
+        ]:
+            with mock.patch.object(KeysetPagination, "page_size", 2):
+                expected = self.client.get(url)
+                response = self.call(async_views.ticket_list, "get", url)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(json.loads(response.content), json.loads(expected.content))
+
+        response = self.call(async_views.ticket_list, "get", "/api/tickets/?category=x")
+        self.assertEqual(response.status_code, http_status.HTTP_400_BAD_REQUEST)
+        self.assertIn("category", json.loads(response.content))
+
+    def test_stats_and_create_fallback(self):
+        response = self.call(
+            async_views.ticket_list,
+            "post",
+            "/api/tickets/",
+            {"title": "New", "description": "Something", "category": "general"},
+        )
+        self.assertEqual(response.status_code, http_status.HTTP_201_CREATED)
+
+        response = self.call(async_views.ticket_stats, "get", "/api/tickets/stats/")
+        self.assertEqual(
+            json.loads(response.content), self.client.get("/api/tickets/stats/").data
+        )
+        self.assertEqual(json.loads(response.content)["total_tickets"], 5)
+
+    def test_classify_awaits_pooled_async_client(self):
+        stub = StubLLMServer(reply={"category": "billing", "priority": "high"}, latency=0.2)
+        stub.start()
+        self.addCleanup(stub.stop)
+        client_settings = {**settings.GROQ_CLIENT, "BASE_URL": stub.base_url}
+        overrides = override_settings(GROQ_API_KEY="test-key", GROQ_CLIENT=client_settings)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        self.addCleanup(llm.reset)
+
+        response = self.call(
+            async_views.ticket_classify,
+            "post",
+            "/api/tickets/classify/",
+            {"description": "I was charged twice this month"},
+        )
+        self.assertEqual(
+            json.loads(response.content),
+            {
+                "suggested_category": "billing",
+                "suggested_priority": "high",
+                "classified_by": "llm",
+            },
+        )
+
+        async def classify_many():
+            return await asyncio.gather(
+                *(services.aclassify_ticket(f"Refund for order {i}") for i in range(5))
+            )
+
+        start = time.monotonic()
+        results = async_to_sync(classify_many)()
+        # Five 200ms calls overlap on one event loop instead of queueing
+        self.assertLess(time.monotonic() - start, 0.8)
+        self.assertEqual({r["suggested_category"] for r in results}, {"billing"})
+        self.assertEqual(stub.requests, 6)
+
+
+@override_settings(RESPONSE_CACHE={**settings.RESPONSE_CACHE, "ENABLED": True})
+class ResponseCacheTest(TestCase):
+    """Tests for ETag/conditional GET and cached list/stats responses."""
+
+    def setUp(self):
+        self.client = APIClient()
+        cache.clear()
+        response_cache.reset_stats()
+        Ticket.objects.create(
+            title="Refund request",
+            description="Charged twice",
+            category="billing",
+            priority="high",
+        )
+
+    def test_etag_revalidation_and_invalidation(self):
+        first = self.client.get("/api/tickets/?category=billing&status=open")
+        self.assertEqual(first.status_code, 200)
+        self.assertIn("Last-Modified", first)
+
+        # Parameter order does not matter; the client's copy is still current
+        response = self.client.get(
+            "/api/tickets/?status=open&category=billing",
+            HTTP_IF_NONE_MATCH=first["ETag"],
+        )
+        self.assertEqual(response.status_code, http_status.HTTP_304_NOT_MODIFIED)
+        response = self.client.get(
+            "/api/tickets/?category=billing&status=open",
+            HTTP_IF_MODIFIED_SINCE=first["Last-Modified"],
+        )
+        self.assertEqual(response.status_code, http_status.HTTP_304_NOT_MODIFIED)
+
+        self.client.post(
+            "/api/tickets/",
+            {"title": "Another", "description": "Charged again", "category": "billing"},
+            format="json",
+        )
+        response = self.client.get(
+            "/api/tickets/?category=billing&status=open",
+            HTTP_IF_NONE_MATCH=first["ETag"],
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], first["ETag"])
+        self.assertEqual(len(response.data["results"]), 2)
+
+        stats = self.client.get("/api/tickets/cache/").data["responses"]
+        self.assertEqual(
+            (stats["hits"], stats["not_modified"], stats["misses"]), (0, 2, 2)
+        )
+
+    def test_cached_data_served_until_a_write(self):
+        self.assertEqual(self.client.get("/api/tickets/stats/").data["total_tickets"], 1)
+        # Bypass signals: cached stats are served without querying
+        Ticket.objects.bulk_create([Ticket(title="x", description="y")])
+        with self.assertNumQueries(0):
+            response = self.client.get("/api/tickets/stats/")
+        self.assertEqual(response.data["total_tickets"], 1)
+
+        self.client.post(
+            "/api/tickets/bulk/",
+            b'{"title": "Bulk", "description": "Loaded in bulk"}\n',
+            content_type="application/x-ndjson",
+        )
+        self.assertEqual(self.client.get("/api/tickets/stats/").data["total_tickets"], 2)
+
+    def test_async_views_share_entries(self):
+        etag = self.client.get("/api/tickets/stats/")["ETag"]
+        request = AsyncRequestFactory().get(
+            "/api/tickets/stats/", headers={"If-None-Match": etag}
+        )
+        response = async_to_sync(async_views.ticket_stats)(request)
+        self.assertEqual(response.status_code, http_status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response["ETag"], etag)
+
+    def test_process_local_cache_is_flagged(self):
+        warnings = response_cache.check_shared_cache()
+        self.assertEqual([warning.id for warning in warnings], ["tickets.W001"])
+        shared = {"default": {"BACKEND": "django.core.cache.backends.redis.RedisCache"}}
+        with override_settings(CACHES=shared):
+            self.assertEqual(response_cache.check_shared_cache(), [])
+        files = {"default": {"BACKEND": "django.core.cache.backends.filebased.FileBasedCache"}}
+        with override_settings(CACHES=files):
+            warnings = response_cache.check_shared_cache()
+        self.assertEqual([warning.id for warning in warnings], ["tickets.W002"])
+
+
+class TicketRowsTest(TestCase):
+    """Tests for the values()-based list path, ?fields= and the JSON renderer."""
+
+    def setUp(self):
+        self.client = APIClient()
+        cache.clear()
+        for i in range(3):
+            Ticket.objects.create(
+                title=f"Café order {i}",
+                description="Charged twice\u2028for my subscription",
+                category="billing",
+                priority="high",
+            )
+
+    def test_rows_match_serializer(self):
+        queryset = Ticket.objects.all()
+        expected = TicketSerializer(queryset, many=True).data
+        self.assertEqual(rows.encode(rows.values(queryset)), expected)
+
+        response = self.client.get("/api/tickets/")
+        self.assertEqual(response.data["results"], expected)
+        page = {"count": 3, "next": None, "previous": None, "results": expected}
+        self.assertEqual(response.content, JSONRenderer().render(page))
+
+    def test_field_selection(self):
+        with mock.patch.object(KeysetPagination, "page_size", 2):
+            response = self.client.get(
+                "/api/tickets/?pagination=cursor&fields=status,id"
+            )
+            self.assertEqual(
+                [list(row) for row in response.data["results"]], [["id", "status"]] * 2
+            )
+            response = self.client.get(response.data["next"])
+        oldest = Ticket.objects.order_by("id").first()
+        self.assertEqual(response.data["results"], [{"id": oldest.id, "status": "open"}])
+
+        response = self.client.get("/api/tickets/export/?fields=title,id")
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0], "id,title")
+        self.assertEqual(len(lines), 4)
+
+        response = self.client.get("/api/tickets/?fields=title,secret")
+        self.assertEqual(response.status_code, http_status.HTTP_400_BAD_REQUEST)
+        self.assertIn("secret", str(response.data["fields"]))
+
+    def test_fast_renderer_matches_json_renderer(self):
+        data = {
+            "results": TicketSerializer(Ticket.objects.all(), many=True).data,
+            "when": timezone.now(),
+            "job": ClassificationJob(description="x").id,
+            "ratio": 0.1,
+        }
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+        self.assertEqual(
+            FastJSONRenderer().render(data, "application/json; indent=2"),
+            JSONRenderer().render(data, "application/json; indent=2"),
+        )
+
+
+def parse_sse(body):
+    """(event, id, data) for each named frame in a text/event-stream body."""
+    frames = []
+    for block in body.split("\n\n"):
+        fields = dict(
+            line.split(": ", 1) for line in block.splitlines() if ": " in line
+        )
+        if "event" in fields:
+            frames.append(
+                (fields["event"], int(fields["id"]), json.loads(fields["data"]))
+            )
+    return frames
+
+
+class TicketEventTest(TestCase):
+    """Tests for the ticket change log and the Server-Sent Events feed."""
+
+    def setUp(self):
+        self.client = APIClient()
+        cache.clear()
+
+    def create(self, **fields):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                "/api/tickets/",
+                {"title": "Refund", "description": "Charged twice", **fields},
+                format="json",
+            )
+        return response.data["id"]
+
+    def feed(self, last_event_id=None):
+        headers = {"HTTP_ACCEPT": "text/event-stream"}
+        if last_event_id is not None:
+            headers["HTTP_LAST_EVENT_ID"] = str(last_event_id)
+        response = self.client.get("/api/tickets/events/", **headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        return parse_sse(response.content.decode())
+
+    def test_writes_are_logged_with_stats_deltas(self):
+        ticket_id = self.create(category="billing", priority="high")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(
+                f"/api/tickets/{ticket_id}/", {"status": "closed"}, format="json"
+            )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                "/api/tickets/bulk/",
+                b'{"title": "A", "description": "a", "category": "billing"}\n'
+                b'{"title": "B", "description": "b", "category": "account"}\n',
+                content_type="application/x-ndjson",
+            )
+
+        created, updated, bulk = TicketEvent.objects.all()
+        self.assertEqual(created.kind, "created")
+        self.assertEqual(created.ticket["id"], ticket_id)
+        self.assertEqual(
+            created.stats,
+            {
+                "total_tickets": 1,
+                "open_tickets": 1,
+                "priority_breakdown": {"high": 1},
+                "category_breakdown": {"billing": 1},
+            },
+        )
+        self.assertEqual(updated.kind, "updated")
+        self.assertEqual(updated.ticket["status"], "closed")
+        self.assertEqual(updated.stats, {"open_tickets": -1})
+        self.assertEqual(bulk.kind, "bulk_created")
+        self.assertIsNone(bulk.ticket_id)
+        self.assertEqual(bulk.stats["total_tickets"], 2)
+        self.assertEqual(
+            bulk.stats["category_breakdown"], {"billing": 1, "account": 1}
+        )
+
+        # Nothing is logged until the write commits
+        Ticket.objects.create(title="Uncommitted", description="d")
+        self.assertEqual(TicketEvent.objects.count(), 3)
+
+    def test_sync_feed_resumes_from_last_event_id(self):
+        [(name, last_id, data)] = self.feed()
+        self.assertEqual((name, last_id, data), ("ready", 0, {"last_id": 0}))
+
+        first = self.create(category="billing")
+        second = self.create(category="account")
+        frames = self.feed(last_event_id=last_id)
+        self.assertEqual([f[0] for f in frames], ["created", "created"])
+        self.assertEqual([f[2]["ticket_id"] for f in frames], [first, second])
+        self.assertEqual(frames[1][2]["stats"]["category_breakdown"], {"account": 1})
+        self.assertEqual(self.feed(last_event_id=frames[-1][1]), [])
+
+        # Ids the log no longer has (pruned, or from another database) reset
+        TicketEvent.objects.filter(id=frames[0][1]).delete()
+        self.assertEqual(self.feed(last_event_id=0)[0][0], "reset")
+        self.assertEqual(self.feed(last_event_id=10**6)[0][0], "reset")
+
+    @override_settings(
+        TICKET_EVENTS={
+            **settings.TICKET_EVENTS,
+            "POLL_INTERVAL": 0.02,
+            "HEARTBEAT": 0.1,
+            "MAX_AGE": 0.5,
+        }
+    )
+    def test_async_stream_follows_new_events(self):
+        self.create(category="billing")
+        latest = TicketEvent.objects.get().id
+        request = AsyncRequestFactory().get(
+            "/api/tickets/events/", headers={"Last-Event-ID": str(latest - 1)}
+        )
+
+        async def consume():
+            response = await async_views.ticket_events(request)
+
+            async def write_later():
+                await asyncio.sleep(0.1)
+                await TicketEvent.objects.acreate(kind="deleted", ticket_id=7)
+
+            writer = asyncio.create_task(write_later())
+            body = b"".join([chunk async for chunk in response.streaming_content])
+            await writer
+            return response, body.decode()
+
+        response, body = async_to_sync(consume)()
+        self.assertEqual(response["Cache-Control"], "no-cache")
+        self.assertTrue(body.startswith("retry: "))
+        self.assertIn(": keep-alive", body)
+        frames = parse_sse(body)
+        self.assertEqual(
+            [(f[0], f[1]) for f in frames], [("created", latest), ("deleted", latest + 1)]
+        )
+
+    def test_slow_subscriber_is_reset(self):
+        async def overflow():
+            broadcaster = events.Broadcaster()
+            queue = asyncio.Queue(maxsize=2)
+            broadcaster.subscribers.add(queue)
+            for i in range(3):
+                broadcaster.publish([{"id": i}])
+            return [queue.get_nowait() for _ in range(queue.qsize())]
+
+        self.assertEqual(async_to_sync(overflow)(), [None])
+
+
+class RequestMetricsTest(TestCase):
+    """Tests for the request metrics middleware and the /metrics endpoint."""
+
+    def setUp(self):
+        self.client = APIClient()
+        cache.clear()
+        classification_cache.get_cache().clear()
+        metrics.reset()
+        self.addCleanup(metrics.reset)
+        self.ticket = Ticket.objects.create(
+            title="Export broken", description="CSV export fails", category="technical"
+        )
+
+    def scrape(self):
+        response = self.client.get("/metrics")
+        self.assertEqual(response["Content-Type"], metrics.CONTENT_TYPE)
+        return response.content.decode()
+
+    def sample(self, body, name, **labels):
+        prefix = name + "{" + "".join(f'{k}="{v}",' for k, v in labels.items())
+        values = [line.rsplit(" ", 1)[1] for line in body.splitlines() if line.startswith(prefix)]
+        self.assertEqual(len(values), 1, prefix)
+        return float(values[0])
+
+    def test_views_are_timed_and_exposed(self):
+        stub = StubLLMServer(reply={"category": "technical", "priority": "high"})
+        stub.start()
+        self.addCleanup(stub.stop)
+        client_settings = {**settings.GROQ_CLIENT, "BASE_URL": stub.base_url}
+        with override_settings(GROQ_API_KEY="test-key", GROQ_CLIENT=client_settings):
+            self.addCleanup(llm.reset)
+            self.client.post(
+                "/api/tickets/classify/", {"description": "Hello there"}, format="json"
+            )
+            # Batch items are classified on executor threads
+            self.client.post(
+                "/api/tickets/classify/batch/",
+                {"descriptions": ["General question one", "General question two"]},
+                format="json",
+            )
+        self.client.get("/api/tickets/")
+        self.client.get("/api/tickets/")
+        self.client.get("/api/tickets/stats/")
+        self.client.patch(
+            f"/api/tickets/{self.ticket.id}/", {"status": "closed"}, format="json"
+        )
+
+        body = self.scrape()
+        self.assertIn("# TYPE tickets_request_duration_seconds histogram", body)
+        count = "tickets_request_duration_seconds_count"
+        self.assertEqual(self.sample(body, count, view="list", method="GET", status=200), 2)
+        self.assertEqual(self.sample(body, count, view="stats", method="GET", status=200), 1)
+        self.assertEqual(
+            self.sample(body, count, view="partial_update", method="PATCH", status=200), 1
+        )
+        self.assertEqual(
+            self.sample(body, "tickets_request_db_queries_count", view="list"), 2
+        )
+        self.assertGreater(
+            self.sample(body, "tickets_request_db_queries_sum", view="partial_update"), 1
+        )
+        phases = "tickets_request_phase_seconds_count"
+        self.assertEqual(self.sample(body, phases, view="list", phase="serialize"), 2)
+        self.assertEqual(self.sample(body, phases, view="classify", phase="llm"), 1)
+        self.assertEqual(self.sample(body, phases, view="classify_batch", phase="llm"), 1)
+        self.assertEqual(
+            self.sample(
+                body, "tickets_llm_request_duration_seconds_count", mode="sync", outcome="ok"
+            ),
+            3,
+        )
+        self.assertIn(f'pid="{os.getpid()}"', body)
+
+        with override_settings(
+            REQUEST_METRICS={**settings.REQUEST_METRICS, "ENABLED": False}
+        ):
+            self.assertEqual(self.client.get("/metrics").status_code, 404)
+
+    def test_slow_requests_are_logged_with_sql(self):
+        config = {**settings.REQUEST_METRICS, "SLOW_REQUEST_SECONDS": 0}
+        with override_settings(REQUEST_METRICS=config):
+            with self.assertLogs("tickets.metrics", "WARNING") as logs:
+                self.client.get("/api/tickets/?status=open")
+        self.assertIn("GET /api/tickets/ (list) 200", logs.output[0])
+        self.assertIn('FROM "tickets_ticket"', logs.output[0])
+
+    def test_async_requests(self):
+        async def view(request):
+            await sync_to_async(Ticket.objects.count)()
+            return HttpResponse("ok")
+
+        middleware = RequestMetricsMiddleware(view)
+        request = AsyncRequestFactory().get("/somewhere")
+        self.assertEqual(async_to_sync(middleware)(request).status_code, 200)
+        body = self.scrape()
+        self.assertEqual(
+            self.sample(body, "tickets_request_db_queries_sum", view="unmatched"), 1
+        )
+
+
+class BenchmarkTest(TestCase):
+    """Tests for the synthetic ticket generator and the bench_api harness."""
+
+    def test_generator_is_seeded_and_skewed(self):
+        now = timezone.now()
+        first = [
+            (t.title, t.category, t.priority, t.status, t.created_at)
+            for t in benchmarks.TicketGenerator(seed=7, now=now).tickets(2000)
+        ]
+        again = [
+            (t.title, t.category, t.priority, t.status, t.created_at)
+            for t in benchmarks.TicketGenerator(seed=7, now=now).tickets(2000)
+        ]
+        self.assertEqual(first, again)
+
+        categories = Counter(t[1] for t in first)
+        self.assertGreater(categories["technical"], categories["general"] * 2)
+        recent = [t for t in first if now - t[4] < timedelta(days=2)]
+        old = [t for t in first if now - t[4] > timedelta(days=60)]
+        self.assertGreater(len(recent), len(first) // 100)
+        self.assertGreater(
+            sum(t[3] == "open" for t in recent) / len(recent),
+            sum(t[3] == "open" for t in old) / len(old),
+        )
+
+        benchmarks.seed_tickets(benchmarks.TicketGenerator(seed=7), 300, batch_size=128)
+        self.assertEqual(Ticket.objects.count(), 300)
+        self.assertEqual(rollups.check(), [])
+        self.assertGreater(Ticket.objects.dates("created_at", "day").count(), 30)
+
+    def test_bench_api_writes_comparable_results(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            output = f"{tmp}/results.json"
+            out = StringIO()
+            call_command(
+                "bench_api",
+                "--tickets=200",
+                "--requests=3",
+                "--warmup=1",
+                f"--output={output}",
+                stdout=out,
+            )
+            with open(output) as handle:
+                report = json.load(handle)
+            self.assertEqual(set(report["scenarios"]), set(benchmarks.SCENARIOS))
+            for name, stats in report["scenarios"].items():
+                self.assertEqual(stats["errors"], 0, name)
+                self.assertEqual(stats["requests"], 3)
+            self.assertGreaterEqual(report["scenarios"]["patch"]["queries_mean"], 1)
+
+            out = StringIO()
+            call_command(
+                "bench_api",
+                "--tickets=200",
+                "--requests=2",
+                "--scenarios=stats",
+                f"--compare={output}",
+                stdout=out,
+            )
+            self.assertIn("stats p50_ms", out.getvalue())
+        # The run was rolled back
+        self.assertFalse(Ticket.objects.exists())
+
+
+class IndexAuditTest(TestCase):
+    """Tests for the ticket index set and the audit_indexes command."""
+
+    def indexes(self):
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor, "tickets_ticket")
+        return {name for name, info in constraints.items() if info["index"]}
+
+    def test_audit_prints_plans_and_restores_indexes(self):
+        before = self.indexes()
+        self.assertIn("ticket_status_recent_idx", before)
+        self.assertIn("ticket_created_buckets_idx", before)
+
+        out = StringIO()
+        call_command(
+            "audit_indexes",
+            "--tickets=300",
+            "--repeat=1",
+            "--inserts=5",
+            "--compare",
+            stdout=out,
+        )
+        output = out.getvalue()
+        for shape in ("list_triage", "cursor_open_p2", "stats_7d", "export_open"):
+            self.assertIn(shape, output)
+        self.assertIn("ticket_status_recent_idx", output)
+        self.assertIn("legacy_status_created_idx", output)
+        self.assertIn("Previous -> current index set", output)
+        # Seeded tickets and the swapped index set were rolled back
+        self.assertFalse(Ticket.objects.exists())
+        self.assertEqual(self.indexes(), before)
+
+
+class WindowedStatsTest(TestCase):
+    """Tests for ?from=&to=&bucket= on the stats endpoint."""
+
+    TICKETS = [
+        ("2026-01-01T10:00:00Z", "billing", "high", "open"),
+        ("2026-01-02T12:00:00Z", "technical", "low", "closed"),
+        ("2026-01-02T23:30:00Z", "account", "critical", "open"),
+        ("2026-01-05T08:00:00Z", "billing", "low", "resolved"),
+        ("2026-01-20T15:00:00Z", "general", "medium", "open"),
+    ]
+
+    def setUp(self):
+        self.client = APIClient()
+        cache.clear()
+        with benchmarks.explicit_created_at():
+            Ticket.objects.bulk_create(
+                Ticket(
+                    title="t",
+                    description="d",
+                    created_at=datetime.fromisoformat(created.replace("Z", "+00:00")),
+                    category=category,
+                    priority=priority,
+                    status=status,
+                )
+                for created, category, priority, status in self.TICKETS
+            )
+        rollups.rebuild()
+
+    def stats(self, query):
+        return self.client.get(f"/api/tickets/stats/?{query}")
+
+    def test_day_series_combines_rollups_and_partial_days(self):
+        request = mock.Mock(
+            query_params={
+                "from": "2026-01-01T12:00:00Z",
+                "to": "2026-01-05T09:00:00Z",
+                "bucket": "day",
+            }
+        )
+        window = windows.requested_window(request)
+        # Whole days from the rollups, both partial edge days in one query
+        with self.assertNumQueries(2):
+            data = windows.summary(window)
+        self.assertEqual(data["total_tickets"], 3)
+        self.assertEqual(data["open_tickets"], 1)
+        self.assertEqual(
+            data["status_breakdown"],
+            {"open": 1, "in_progress": 0, "resolved": 1, "closed": 1},
+        )
+        self.assertEqual(
+            [(point["start"], point["total"]) for point in data["series"]],
+            [
+                ("2026-01-01", 0),
+                ("2026-01-02", 2),
+                ("2026-01-03", 0),
+                ("2026-01-04", 0),
+                ("2026-01-05", 1),
+            ],
+        )
+        self.assertEqual(data["series"][1]["priority"]["critical"], 1)
+        self.assertEqual(
+            data["window"],
+            {"from": "2026-01-01T12:00:00Z", "to": "2026-01-05T09:00:00Z", "bucket": "day"},
+        )
+
+    def test_week_and_hour_buckets(self):
+        response = self.stats("from=2026-01-01&to=2026-02-01&bucket=week")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [(point["start"], point["total"]) for point in response.data["series"]],
+            [
+                ("2025-12-29", 3),
+                ("2026-01-05", 1),
+                ("2026-01-12", 0),
+                ("2026-01-19", 1),
+                ("2026-01-26", 0),
+            ],
+        )
+        self.assertEqual(response.data["avg_tickets_per_day"], round(5 / 31, 2))
+        request = AsyncRequestFactory().get(
+            "/api/tickets/stats/?from=2026-01-01&to=2026-02-01&bucket=week"
+        )
+        async_response = async_to_sync(async_views.ticket_stats)(request)
+        self.assertEqual(json.loads(async_response.content), json.loads(response.content))
+
+        response = self.stats("from=2026-01-02T11:00:00Z&to=2026-01-03&bucket=hour")
+        series = response.data["series"]
+        self.assertEqual(len(series), 13)
+        self.assertEqual(series[1], {**series[1], "start": "2026-01-02T12:00:00Z", "total": 1})
+        self.assertEqual(series[-1]["start"], "2026-01-02T23:00:00Z")
+        self.assertEqual(series[-1]["category"]["account"], 1)
+
+        # A window over everything agrees with the all-time rollup summary
+        everything = self.stats("from=2025-01-01&to=2027-01-01").data
+        overall = self.stats("").data
+        self.assertNotIn("window", overall)
+        for key in ("total_tickets", "open_tickets", "category_breakdown"):
+            self.assertEqual(everything[key], overall[key])
+
+    def test_invalid_windows(self):
+        for query, field in [
+            ("bucket=year", "bucket"),
+            ("from=yesterday", "from"),
+            ("from=2026-02-01&to=2026-01-01", "from"),
+            ("from=2020-01-01&bucket=hour", "bucket"),
+        ]:
+            response = self.stats(query)
+            self.assertEqual(response.status_code, 400, query)
+            self.assertIn(field, response.data)
+
+        response = self.stats("from=7d&bucket=day")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["series"]), 8)
+
+    @override_settings(RESPONSE_CACHE={**settings.RESPONSE_CACHE, "ENABLED": True})
+    def test_only_fixed_windows_are_cached(self):
+        self.assertIn("ETag", self.stats("from=2026-01-01&to=2026-02-01"))
+        # Relative or open-ended windows move with the clock
+        for query in ("from=7d", "from=2026-01-01", "from=2026-01-01&to=1h"):
+            self.assertNotIn("ETag", self.stats(query), query)
+            request = AsyncRequestFactory().get(f"/api/tickets/stats/?{query}")
+            response = async_to_sync(async_views.ticket_stats)(request)
+            self.assertNotIn("ETag", response, query)
+
+
+class ArchiveTest(TestCase):
+    """Tests for moving old tickets to the archive tier and ?include_archived=1."""
+
+    def setUp(self):
+        self.client = APIClient()
+        cache.clear()
+        old = datetime.fromisoformat("2025-03-10T15:00:00+00:00")
+        with benchmarks.explicit_created_at():
+            for title, status, created_at in [
+                ("printer jammed", "closed", old),
+                ("refund issued", "resolved", old + timedelta(hours=1)),
+                ("still broken", "open", old),
+                ("recent fix", "closed", timezone.now()),
+            ]:
+                Ticket.objects.create(
+                    title=title,
+                    description=f"{title} details",
+                    category="billing",
+                    priority="low",
+                    status=status,
+                    created_at=created_at,
+                )
+
+    def test_archive_moves_old_done_tickets_and_keeps_stats(self):
+        stats = self.client.get("/api/tickets/stats/").data
+        window = "/api/tickets/stats/?from=2025-03-10T12:00:00Z&to=2025-03-11&bucket=day"
+        windowed = self.client.get(window).data
+
+        out = StringIO()
+        call_command("archive_tickets", "--older-than=30", "--batch-size=1", stdout=out)
+        self.assertIn("Archived 2 ticket(s) in 2 batch(es)", out.getvalue())
+        self.assertEqual(
+            set(ArchivedTicket.objects.values_list("title", flat=True)),
+            {"printer jammed", "refund issued"},
+        )
+        self.assertEqual(
+            set(Ticket.objects.values_list("title", flat=True)),
+            {"still broken", "recent fix"},
+        )
+        # Archiving is not a change: same stats, rollups still consistent
+        self.assertEqual(self.client.get("/api/tickets/stats/").data, stats)
+        self.assertEqual(self.client.get(window).data, windowed)
+        self.assertEqual(windowed["total_tickets"], 3)
+        self.assertEqual(rollups.check(), [])
+
+        out = StringIO()
+        call_command("archive_tickets", "--older-than=30", stdout=out)
+        self.assertIn("Archived 0 ticket(s)", out.getvalue())
+
+    def test_include_archived_reads_both_tiers(self):
+        archive.archive(archive.cutoff(30))
+        archived = ArchivedTicket.objects.get(title="printer jammed")
+
+        self.assertEqual(self.client.get("/api/tickets/").data["count"], 2)
+        response = self.client.get("/api/tickets/?include_archived=1&status=closed")
+        self.assertEqual(
+            [row["title"] for row in response.data["results"]],
+            ["recent fix", "printer jammed"],
+        )
+        response = self.client.get("/api/tickets/?include_archived=1&pagination=cursor")
+        self.assertEqual(len(response.data["results"]), 4)
+        response = self.client.get("/api/tickets/?include_archived=true&search=printer")
+        self.assertEqual([row["id"] for row in response.data["results"]], [archived.id])
+        self.assertEqual(self.client.get("/api/tickets/?search=printer").data["count"], 0)
+
+        self.assertEqual(self.client.get(f"/api/tickets/{archived.id}/").status_code, 404)
+        response = self.client.get(f"/api/tickets/{archived.id}/?include_archived=1")
+        self.assertEqual(response.data["status"], "closed")
+        # Archived tickets are read-only
+        response = self.client.patch(
+            f"/api/tickets/{archived.id}/?include_archived=1",
+            {"status": "open"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 404)
+
+        response = self.client.get(
+            "/api/tickets/export/?include_archived=1&export_format=ndjson"
+        )
+        lines = b"".join(response.streaming_content).splitlines()
+        self.assertEqual(len(lines), 4)
+
+
+@override_settings(GROQ_API_KEY="test-key")
+class DuplicateDetectionTest(TestCase):
+    """Tests for MinHash/LSH near-duplicate detection on create and classify."""
+
+    REPORT = (
+        "Since this morning the dashboard widgets show yesterday's numbers instead "
+        "of today's totals for our whole team workspace, and refreshing the page "
+        "or switching browsers does not change what we see at all"
+    )
+
+    def setUp(self):
+        self.client = APIClient()
+        cache.clear()
+        classification_cache.get_cache().clear()
+        duplicates.reset()
+        self.addCleanup(duplicates.reset)
+        patcher = mock.patch.object(
+            services,
+            "request_classification",
+            return_value=(
+                {"suggested_category": "general", "suggested_priority": "low"},
+                True,
+            ),
+        )
+        self.llm = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def create(self, description, **fields):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                "/api/tickets/",
+                {
+                    "title": "Dashboard numbers",
+                    "description": description,
+                    "category": "technical",
+                    "priority": "high",
+                    **fields,
+                },
+                format="json",
+            )
+        self.assertEqual(response.status_code, 201)
+        return response.data
+
+    def test_index_matches_near_duplicates_and_evicts_oldest(self):
+        index = duplicates.SignatureIndex(capacity=3)
+        first = duplicates.signature(self.REPORT)
+        index.add(1, first, "technical", "high")
+        near = duplicates.signature(self.REPORT.replace("whole", "entire"))
+        match = index.query(near, 0.7)
+        self.assertEqual((match.ticket_id, match.duplicate_of), (1, 1))
+        self.assertGreater(match.similarity, 0.7)
+        other = duplicates.signature("Please add a dark theme to the mobile app settings")
+        self.assertIsNone(index.query(other, 0.7))
+        self.assertIsNone(duplicates.signature("help me"))
+
+        for ticket_id in (2, 3, 4):
+            index.add(ticket_id, other, "general", "low", duplicate_of=2)
+        self.assertEqual(len(index), 3)
+        self.assertIsNone(index.query(near, 0.7))
+        self.assertEqual(index.query(other, 0.7).duplicate_of, 2)
+
+    def test_create_marks_duplicates_and_classify_reuses_them(self):
+        original = self.create(self.REPORT)
+        self.assertIsNone(original["duplicate_of"])
+        second = self.create(self.REPORT.replace("whole", "entire"), priority="critical")
+        self.assertEqual(second["duplicate_of"], original["id"])
+        # A duplicate of a duplicate points at the first ticket of the group
+        third = self.create(self.REPORT.replace("all", "anything"))
+        self.assertEqual(third["duplicate_of"], original["id"])
+
+        response = self.client.post(
+            "/api/tickets/classify/",
+            {"description": self.REPORT + " today"},
+            format="json",
+        )
+        self.assertEqual(response.data["classified_by"], "duplicate")
+        self.assertEqual(response.data["duplicate_of"], original["id"])
+        self.assertEqual(response.data["suggested_category"], "technical")
+        self.llm.assert_not_called()
+
+        listed = self.client.get("/api/tickets/").data["results"]
+        self.assertEqual(
+            {row["id"]: row["duplicate_of"] for row in listed},
+            {original["id"]: None, second["id"]: original["id"], third["id"]: original["id"]},
+        )
+
+    def test_updates_relabel_indexed_tickets_when_they_commit(self):
+        original = self.create(self.REPORT)
+        near = self.REPORT.replace("whole", "entire")
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.client.patch(
+                "/api/tickets/bulk/",
+                {"ids": [original["id"]], "category": "billing"},
+                format="json",
+            )
+            self.assertEqual(response.status_code, 200)
+            # Not before the update commits
+            self.assertEqual(duplicates.check(near).match.category, "technical")
+        for callback in callbacks:
+            callback()
+        match = duplicates.check(near).match
+        self.assertEqual((match.category, match.priority), ("billing", "high"))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(
+                f"/api/tickets/{original['id']}/", {"priority": "low"}, format="json"
+            )
+        self.assertEqual(response.status_code, 200)
+        response = self.client.post(
+            "/api/tickets/classify/", {"description": near}, format="json"
+        )
+        self.assertEqual(response.data["classified_by"], "duplicate")
+        self.assertEqual(
+            (response.data["suggested_category"], response.data["suggested_priority"]),
+            ("billing", "low"),
+        )
+
+    def test_tickets_from_other_workers_are_found_after_a_sync(self):
+        self.create("Please add a dark theme to the mobile app settings page soon")
+        # Written elsewhere: not in this worker's index until it syncs
+        other = Ticket.objects.create(
+            title="t",
+            description=self.REPORT,
+            category="account",
+            priority="medium",
+        )
+        with override_settings(
+            TICKET_DUPLICATES={**settings.TICKET_DUPLICATES, "SYNC_INTERVAL": 0}
+        ):
+            match = duplicates.check(self.REPORT.replace("whole", "entire")).match
+        self.assertEqual(match.ticket_id, other.id)
+        self.assertEqual((match.category, match.priority), ("account", "medium"))
+
+        out = StringIO()
+        call_command("rebuild_duplicate_index", stdout=out)
+        self.assertIn("Signed 1 ticket(s)", out.getvalue())
+        self.assertIn("Indexed 2 ticket(s)", out.getvalue())
+        other.refresh_from_db()
+        self.assertEqual(
+            duplicates.from_bytes(other.signature), duplicates.signature(self.REPORT)
+        )
+
+    def test_lower_ids_that_commit_late_are_found(self):
+        first, late, last = (
+            Ticket.objects.create(
+                title="t", description=description, category="account", priority="medium"
+            )
+            for description in (
+                "Please add a dark theme to the mobile app settings page soon",
+                self.REPORT,
+                "Exported invoices are missing the customer's billing address line",
+            )
+        )
+        late_fields = {field: getattr(late, field) for field in ("id", "title", "description")}
+        late.delete()
+        duplicates.warm()
+        self.assertIn(last.id, duplicates._index.positions)
+
+        # Committed after the worker had already seen a higher id
+        Ticket.objects.create(**late_fields, category="account", priority="medium")
+        with override_settings(
+            TICKET_DUPLICATES={**settings.TICKET_DUPLICATES, "SYNC_INTERVAL": 0}
+        ):
+            match = duplicates.check(self.REPORT.replace("whole", "entire")).match
+        self.assertEqual(match.ticket_id, late_fields["id"])
+        self.assertEqual(duplicates._gaps, {})
+
+    def test_async_classify_consults_duplicates_without_an_api_key(self):
+        original = self.create(self.REPORT)
+        with override_settings(GROQ_API_KEY=None):
+            sync = services.classify_ticket(self.REPORT + " today")
+            async_ = async_to_sync(services.aclassify_ticket)(self.REPORT + " today")
+        self.assertEqual(sync, async_)
+        self.assertEqual(async_["classified_by"], "duplicate")
+        self.assertEqual(async_["duplicate_of"], original["id"])
+
+
+@override_settings(
+    DATABASE_ROUTING={**settings.DATABASE_ROUTING, "REPLICAS": ["default"]}
+)
+class ReplicaRoutingTest(TestCase):
+    """Tests for routing ticket reads to replicas and pinning writers to the primary."""
+
+    def request(self, method, path, **extra):
+        request = getattr(RequestFactory(), method)(path, **extra)
+        request.resolver_match = resolve(path)
+        return request
+
+    def test_ticket_view_reads_go_to_a_replica(self):
+        router = replicas.ReplicaRouter()
+        request = self.request("get", "/api/tickets/")
+        token = replicas.start_request(request)
+        try:
+            self.assertEqual(router.db_for_read(Ticket), "default")
+            self.assertIsNone(router.db_for_read(TicketEvent))
+            self.assertEqual(router.db_for_write(Ticket), "default")
+        finally:
+            replicas.finish_request(token)
+        self.assertIsNone(router.db_for_read(Ticket))
+
+        self.assertEqual(replicas.choose(self.request("get", "/api/tickets/stats/")), "default")
+        self.assertIsNone(replicas.choose(self.request("get", "/api/tickets/events/")))
+        self.assertIsNone(replicas.choose(self.request("post", "/api/tickets/")))
+        pinned = self.request("get", "/api/tickets/", HTTP_COOKIE="tickets_primary=1")
+        self.assertIsNone(replicas.choose(pinned))
+
+        with override_settings(
+            DATABASE_ROUTING={**settings.DATABASE_ROUTING, "REPLICAS": ["replica_1"]}
+        ):
+            self.assertFalse(router.allow_migrate("replica_1", "tickets"))
+            self.assertIsNone(router.allow_migrate("default", "tickets"))
+
+    def test_ticket_writes_pin_the_client_to_the_primary(self):
+        client = APIClient()
+        response = client.post(
+            "/api/tickets/",
+            {"title": "t", "description": "d", "category": "general", "priority": "low"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201)
+        cookie = response.cookies["tickets_primary"]
+        self.assertEqual(cookie["max-age"], settings.DATABASE_ROUTING["STICKY_SECONDS"])
+
+        response = APIClient().get("/api/tickets/")
+        self.assertNotIn("tickets_primary", response.cookies)
+        response = APIClient().post("/api/tickets/", {}, format="json")
+        self.assertNotIn("tickets_primary", response.cookies)
+
+
+@override_settings(
+    DATABASE_ROUTING={**settings.DATABASE_ROUTING, "REPLICAS": ["replica_1"]},
+    RESPONSE_CACHE={**settings.RESPONSE_CACHE, "ENABLED": True},
+)
+class ReplicaResponseCacheTest(TestCase):
+    """Tests for cached responses with a primary and a lagging SQLite replica."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # A second real database that never receives the test's writes.
+        # Added after the test databases are set up, so it is used as is.
+        cls.replica_dir = tempfile.TemporaryDirectory()
+        connections.settings["replica_1"] = {
+            **connections.settings["default"],
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": os.path.join(cls.replica_dir.name, "replica.sqlite3"),
+            "OPTIONS": {},
+        }
+        with connections["replica_1"].schema_editor() as editor:
+            editor.create_model(Ticket)
+
+    @classmethod
+    def tearDownClass(cls):
+        connections["replica_1"].close()
+        del connections["replica_1"]
+        del connections.settings["replica_1"]
+        cls.replica_dir.cleanup()
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+
+    def test_replica_reads_are_not_served_to_pinned_clients(self):
+        writer, reader = APIClient(), APIClient()
+        response = writer.post(
+            "/api/tickets/",
+            {"title": "t", "description": "d", "category": "general", "priority": "low"},
+            format="json",
+        )
+        self.assertIn("tickets_primary", response.cookies)
+
+        stale = reader.get("/api/tickets/?status=open")
+        self.assertEqual(stale.data["results"], [])
+        fresh = writer.get("/api/tickets/?status=open")
+        self.assertEqual(len(fresh.data["results"]), 1)
+        self.assertNotEqual(fresh["ETag"], stale["ETag"])
+        # Each side is still cached on its own
+        self.assertEqual(reader.get("/api/tickets/?status=open").data["results"], [])
+        with self.assertNumQueries(0):
+            again = writer.get("/api/tickets/?status=open")
+        self.assertEqual(len(again.data["results"]), 1)
+
+
+class ConnectionPoolTest(TestCase):
+    """Tests for the pooled database connections (tickets.pool)."""
+
+    def test_reuses_checks_and_bounds_connections(self):
+        opened = []
+
+        def connect():
+            opened.append(sqlite3.connect(":memory:", check_same_thread=False))
+            return opened[-1]
+
+        connections = pool.ConnectionPool(max_size=2, timeout=0.01, health_check_interval=0)
+        first = connections.acquire(connect)
+        first.execute("CREATE TEMP TABLE t (x)")
+        first.execute("INSERT INTO t VALUES (1)")
+        connections.release(first)
+        # Handed back with the open transaction rolled back
+        self.assertIs(connections.acquire(connect), first)
+        self.assertEqual(first.execute("SELECT count(*) FROM t").fetchone(), (0,))
+
+        second = connections.acquire(connect)
+        with self.assertRaises(OperationalError):
+            connections.acquire(connect)
+        connections.release(second)
+        second.close()
+        # Broken while idle: replaced by a new connection
+        third = connections.acquire(connect)
+        self.assertIsNot(third, second)
+        self.assertEqual(len(opened), 3)
+        self.assertEqual(
+            {key: connections.stats()[key] for key in ("in_use", "idle", "reused", "unhealthy")},
+            {"in_use": 2, "idle": 0, "reused": 1, "unhealthy": 1},
+        )
+
+    def test_health_check_runs_outside_the_lock(self):
+        connections = pool.ConnectionPool(max_size=2, timeout=1, health_check_interval=0)
+
+        def connect():
+            return sqlite3.connect(":memory:", check_same_thread=False)
+
+        slow, fast = connections.acquire(connect), connections.acquire(connect)
+        connections.release(fast)
+        connections.release(slow)
+        checking, stalled = threading.Event(), threading.Event()
+        healthy = pool.ConnectionPool._healthy
+
+        def stall_on_slow(self, entry):
+            if entry.connection is slow:
+                checking.set()
+                stalled.wait(5)
+                return False
+            return healthy(self, entry)
+
+        with mock.patch.object(pool.ConnectionPool, "_healthy", stall_on_slow):
+            with ThreadPoolExecutor(1) as executor:
+                waiting = executor.submit(connections.acquire, connect)
+                self.assertTrue(checking.wait(5))
+                # Another thread checks out while the slow check is pending
+                self.assertIs(connections.acquire(connect), fast)
+                self.assertEqual(connections.stats()["in_use"], 2)
+                connections.release(fast)
+                stalled.set()
+                # The unhealthy one is dropped and the caller retries
+                self.assertIs(waiting.result(5), fast)
+        self.assertEqual(
+            {key: connections.stats()[key] for key in ("in_use", "idle", "unhealthy", "closed")},
+            {"in_use": 1, "idle": 0, "unhealthy": 1, "closed": 1},
+        )
+
+
+class BootTest(TestCase):
+    """Tests for committed migrations, manage.py boot and import_report."""
+
+    def test_migrations_are_committed(self):
+        try:
+            call_command("makemigrations", "tickets", check=True, dry_run=True, stdout=StringIO())
+        except SystemExit:
+            self.fail("Model changes without a migration; run makemigrations tickets.")
+
+    def test_boot_migrates_only_when_migrations_are_unapplied(self):
+        out = StringIO()
+        call_command("boot", "--check", stdout=out)
+        self.assertIn("Schema is current.", out.getvalue())
+        call_command("boot", "--skip-static", stdout=out)
+        self.assertIn("Schema is current; skipping migrate.", out.getvalue())
+
+        unapplied = [SimpleNamespace(app_label="tickets", name="0002_example")]
+        with mock.patch(
+            "tickets.management.commands.boot.pending_migrations", return_value=unapplied
+        ):
+            with self.assertRaisesMessage(CommandError, "1 unapplied migration(s)"):
+                call_command("boot", "--check", stdout=out)
+            self.assertIn("Unapplied: tickets.0002_example", out.getvalue())
+            with mock.patch("tickets.management.commands.boot.call_command") as run:
+                call_command("boot", "--skip-static", stdout=out)
+        self.assertIn("Applying 1 migration(s)", out.getvalue())
+        self.assertEqual([c.args[0] for c in run.call_args_list], ["migrate", "rebuild_stats"])
+
+    def test_boot_stops_when_the_schema_is_missing_tables_or_columns(self):
+        from .management.commands.boot import missing_schema
+
+        self.assertEqual(missing_schema(connection), [])
+        introspection = connection.introspection
+        tables = introspection.table_names(include_views=True)
+        description = introspection.get_table_description
+
+        def without_signature(cursor, table):
+            columns = description(cursor, table)
+            if table == "tickets_ticket":
+                return [column for column in columns if column.name != "signature"]
+            return columns
+
+        # A database whose recorded migrations ran against an older schema
+        with mock.patch.object(
+            introspection,
+            "table_names",
+            return_value=[table for table in tables if table != "tickets_ticketevent"],
+        ), mock.patch.object(
+            introspection, "get_table_description", side_effect=without_signature
+        ):
+            self.assertEqual(
+                missing_schema(connection),
+                ["tickets_ticket.signature", "tickets_ticketevent"],
+            )
+            out = StringIO()
+            with self.assertRaisesMessage(CommandError, "2 table(s) or column(s) missing"):
+                call_command("boot", "--check", stdout=out)
+            self.assertIn("Missing: tickets_ticketevent", out.getvalue())
+            with self.assertRaises(CommandError):
+                call_command("boot", "--skip-static", stdout=StringIO())
+
+    def test_import_report(self):
+        from .management.commands.import_report import parse_importtime, summarize
+
+        roots = parse_importtime(
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       100 |        100 |     json.decoder\n"
+            "import time:       200 |        300 |   json\n"
+            "import time:        50 |        350 | tickets.rows\n"
+            "import time:        10 |         10 | tickets.filters\n"
+        )
+        self.assertEqual([root.name for root in roots], ["tickets.rows", "tickets.filters"])
+        summary = summarize(roots, ("tickets",))
+        self.assertEqual((summary["self_us"], summary["cumulative_us"]), (60, 360))
+        self.assertEqual(
+            [(child.name, module.name) for child, module in summary["dependencies"]],
+            [("json", "tickets.rows")],
+        )
+
+        out = StringIO()
+        with self.assertRaisesMessage(CommandError, "Import time over budget: tickets"):
+            call_command("import_report", "--repeat", "1", "--budget-ms", "0", stdout=out)
+        self.assertIn("tickets.models", out.getvalue())
@@ -0,0 +1,108 @@
+"""Bulk status/category/priority updates with set-based writes.
+
+``update_tickets`` changes every matched ticket with ``QuerySet.update`` (one
+``UPDATE ... WHERE id IN (...)`` per chunk of ``chunk_size`` tickets, so a
+triage of up to a chunk is a single statement) instead of one PATCH per
+ticket. ``update`` bypasses the model signals, so the same transaction:
+
+- locks the matched rows (at most ``TICKET_BULK_UPDATE_MAX_IDS``, whether
+  selected by id or by filter), so concurrent single-ticket PATCHes cannot
+  move them between the bucket count and the write,
+- counts the changing tickets per rollup bucket and moves those counts to
+  the buckets they land in (``rollups.apply_deltas``),
+- reports one ``bulk_updated`` event with the stats delta, which also
+  invalidates cached list/stats responses (``tickets.events``), and
+- relabels the tickets in the near-duplicate index when it commits
+  (``tickets.duplicates``).
+"""
+from collections import Counter
+from dataclasses import dataclass, field
+from functools import reduce
+from itertools import islice
+from operator import or_
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+
+from . import duplicates, events, rollups
+from .models import Ticket
+
+
+@dataclass
+class UpdateResult:
+    matched: int = 0
+    updated: int = 0
+    not_found: list = field(default_factory=list)
+
+    def as_dict(self):
+        return {
+            "matched": self.matched,
+            "updated": self.updated,
+            "not_found": self.not_found,
+        }
+
+
+def _chunks(values, size):
+    values = iter(values)
+    while chunk := list(islice(values, size)):
+        yield chunk
+
+
+def _moved(bucket, changes):
+    """The rollup bucket a ticket in ``bucket`` lands in after ``changes``."""
+    return tuple(
+        changes.get(name, value) for name, value in zip(rollups.BUCKET_FIELDS, bucket)
+    )
+
+
+class TooManyTickets(ValueError):
+    """The selection matches more tickets than one update may lock."""
+
+    def __init__(self, limit):
+        super().__init__(
+            f"Matches more than {limit} tickets. Narrow the filter or update by ids."
+        )
+        self.limit = limit
+
+
+def update_tickets(queryset, changes, requested_ids=None, chunk_size=None, limit=None):
+    """Apply ``changes`` (field -> value for status/category/priority).
+
+    ``matched`` counts tickets selected, ``updated`` those that actually
+    changed. With ``requested_ids``, ids that matched no ticket are reported
+    in ``not_found``. Raises ``TooManyTickets``, changing nothing, when more
+    than ``limit`` tickets match (default ``TICKET_BULK_UPDATE_MAX_IDS``).
+    """
+    chunk_size = chunk_size or settings.TICKET_BULK_UPDATE_CHUNK_SIZE
+    limit = limit or settings.TICKET_BULK_UPDATE_MAX_IDS
+    # Tickets already in the target state are left alone (and uncounted)
+    differs = reduce(or_, (~Q(**{name: value}) for name, value in changes.items()))
+    result = UpdateResult()
+    deltas = Counter()
+    with transaction.atomic():
+        # One past the limit, so an oversized selection is detected without
+        # locking all of it
+        pks = list(
+            queryset.order_by("pk")
+            .select_for_update()
+            .values_list("pk", flat=True)[: limit + 1]
+        )
+        if len(pks) > limit:
+            raise TooManyTickets(limit)
+        result.matched = len(pks)
+        for chunk in _chunks(pks, chunk_size):
+            changing = Ticket.objects.filter(pk__in=chunk).filter(differs)
+            before = rollups.live_counts(changing)
+            result.updated += changing.update(**changes)
+            for bucket, count in before.items():
+                deltas[bucket] -= count
+                deltas[_moved(bucket, changes)] += count
+        if result.updated:
+            rollups.apply_deltas(deltas)
+            events.tickets_bulk_updated(deltas)
+            duplicates.tickets_updated(pks, changes)
+
+    if requested_ids is not None:
+        result.not_found = sorted(set(requested_ids) - set(pks))
+    return result
@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import TicketViewSet
@@ -8,3 +9,9 @@ router.register(r'tickets', TicketViewSet)
 urlpatterns = [
     path('', include(router.urls)),
 ]
+
+if settings.TICKET_ASYNC_VIEWS:
+    from .async_views import urlpatterns as async_urlpatterns
+
+    # Matched first: async list/stats/classify, everything else via the router
+    urlpatterns = async_urlpatterns + urlpatterns
@@ -1,103 +1,316 @@
-from django.db.models import Count, Avg, Q
-from django.db.models.functions import TruncDate
+import os
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
+from django.http import Http404, HttpResponse
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
-from rest_framework.filters import SearchFilter
+from rest_framework.exceptions import NotFound, UnsupportedMediaType, ValidationError
 from rest_framework.response import Response
 
-from .filters import TicketFilter
-from .models import Ticket
+from . import (
+    archive,
+    classification_cache,
+    duplicates,
+    events,
+    export,
+    ingest,
+    jobs,
+    metrics,
+    pool,
+    response_cache,
+    rollups,
+    rows,
+    updates,
+    windows,
+)
+from .filters import TicketFilter, TicketSearchFilter, filter_tickets
+from .models import AnyTicket, Ticket
+from .pagination import TicketPagination
 from .serializers import (
+    ClassificationJobSerializer,
+    ClassifyBatchRequestSerializer,
     ClassifyRequestSerializer,
+    TicketBulkUpdateSerializer,
     TicketSerializer,
     TicketUpdateSerializer,
 )
-from .services import classify_ticket
+from .services import classify_ticket, classify_tickets, tier_stats
+
+
+UNKNOWN_JOB = "Unknown or expired classification job."
+
+
+def requested_wait(request) -> float:
+    """Seconds of ``?wait=`` on the job status endpoint; raises ValidationError."""
+    try:
+        return float(request.query_params.get("wait", 0))
+    except ValueError:
+        raise ValidationError({"wait": ["A number of seconds is required."]})
 
 
 class TicketViewSet(viewsets.ModelViewSet):
     """
     ViewSet for support tickets.
 
-    list:   GET    /api/tickets/          — list all tickets (filterable, searchable)
-    create: POST   /api/tickets/          — create a ticket
+    list:   GET    /api/tickets/          — list all tickets (filterable, searchable;
+                                            ?pagination=cursor for keyset pages,
+                                            ?fields=a,b to select columns)
+    create: POST   /api/tickets/          — create a ticket (duplicate_of is set
+                                            when a recent ticket is near-identical)
     partial_update: PATCH /api/tickets/<id>/ — update status/category/priority
+    bulk:   POST   /api/tickets/bulk/     — stream NDJSON/CSV tickets in
+    bulk_update: PATCH /api/tickets/bulk/ — set status/category/priority on many
+    export: GET    /api/tickets/export/   — stream filtered tickets as CSV/NDJSON
     stats:  GET    /api/tickets/stats/    — aggregated statistics
+                                            (?from=&to=&bucket= for a window)
+    event_stream: GET /api/tickets/events/ — live changes as Server-Sent Events
     classify: POST /api/tickets/classify/ — LLM-based classification
+                                            (?async=1 queues a job instead)
+    classify_job: GET /api/tickets/classify/jobs/<id>/ — job status (?wait=N long-polls)
+    classify_batch: POST /api/tickets/classify/batch/ — classify many descriptions
+    cache:  GET    /api/tickets/cache/    — cache hit/miss counters (this worker)
+
+    list, retrieve and export read the hot tier only; ?include_archived=1
+    adds archived tickets (tickets.archive), which are read-only.
     """
 
     queryset = Ticket.objects.all()
     filterset_class = TicketFilter
     search_fields = ["title", "description"]
-    filter_backends = [DjangoFilterBackend, SearchFilter]
+    filter_backends = [DjangoFilterBackend, TicketSearchFilter]
+    pagination_class = TicketPagination
     http_method_names = ["get", "post", "patch", "head", "options"]
 
+    INGEST_CONTENT_TYPES = {
+        "application/x-ndjson": "ndjson",
+        "application/jsonl": "ndjson",
+        "text/csv": "csv",
+    }
+
+    ARCHIVE_ACTIONS = ("list", "retrieve", "export")
+
+    def get_queryset(self):
+        if self.action in self.ARCHIVE_ACTIONS and archive.requested(self.request):
+            return AnyTicket.objects.all()
+        queryset = super().get_queryset()
+        if self.action == "partial_update":
+            # Lock the row so concurrent PATCHes move rollup buckets in order
+            queryset = queryset.select_for_update()
+        return queryset
+
     def get_serializer_class(self):
         if self.action == "partial_update":
             return TicketUpdateSerializer
         return TicketSerializer
 
+    def list(self, request, *args, **kwargs):
+        return self.cached_response("list", lambda: self.list_rows(request))
+
+    def list_rows(self, request):
+        """List through the lean ``values()`` path (tickets.rows)."""
+        fields = rows.requested_fields(request)
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(rows.values(queryset, fields))
+        with metrics.phase("serialize"):
+            data = rows.encode(page, fields)
+        return self.get_paginated_response(data)
+
+    def cached_response(self, name, build):
+        """
+        Serve ``build()``'s data through tickets.response_cache: 304 when the
+        client's ETag is current, the cached data when the ticket table has
+        not changed, and ``build()`` otherwise.
+        """
+        request = self.request
+        if not response_cache.enabled(request):
+            return build()
+        found = response_cache.lookup(request, name, request.accepted_media_type)
+        if found.not_modified:
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=found.headers)
+        if found.data is None:
+            response = build()
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            response_cache.store(found, response.data)
+        return Response(found.data, headers=found.headers)
+
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        serializer.save()
+        found = duplicates.check(serializer.validated_data["description"])
+        with transaction.atomic():
+            serializer.save(**found.fields())
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
+    @action(detail=False, methods=["post"], url_path="bulk")
+    def bulk(self, request):
+        """
+        Ingest tickets streamed as NDJSON (application/x-ndjson) or CSV
+        (text/csv). Rows are validated and inserted in chunks; invalid rows
+        are reported by line number without aborting the rest.
+        """
+        fmt = self.INGEST_CONTENT_TYPES.get(request.content_type.split(";")[0].strip())
+        if fmt is None:
+            raise UnsupportedMediaType(request.content_type)
+        stream = request.stream
+        if stream is None:
+            return Response(ingest.IngestResult().as_dict())
+        result = ingest.ingest(ingest.iter_rows(stream, fmt))
+        return Response(result.as_dict(), status=status.HTTP_200_OK)
+
+    @bulk.mapping.patch
+    def bulk_update(self, request):
+        """
+        Set status/category/priority on the tickets listed in ``ids`` or
+        matching ``filter`` (list filter parameters) with set-based UPDATEs;
+        rollups, cached responses and the live feed are kept in step.
+        """
+        serializer = TicketBulkUpdateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = serializer.validated_data.get("ids")
+        if ids is not None:
+            queryset = Ticket.objects.filter(pk__in=ids)
+        else:
+            try:
+                queryset = filter_tickets(serializer.validated_data["filter"])
+            except ValidationError as exc:
+                raise ValidationError({"filter": exc.detail})
+        try:
+            result = updates.update_tickets(queryset, serializer.changes, ids)
+        except updates.TooManyTickets as exc:
+            raise ValidationError({"filter": [str(exc)]})
+        return Response(result.as_dict())
+
+    @action(detail=False, methods=["get"], url_path="export")
+    def export(self, request):
+        """
+        Stream every ticket matching the list filters and search, newest
+        first, as CSV (default) or NDJSON (?export_format=ndjson). ?fields=
+        selects columns as for the list.
+        """
+        fmt = request.query_params.get("export_format", "csv")
+        if fmt not in export.FORMATS:
+            raise ValidationError(
+                {"export_format": [f"Choose one of: {', '.join(export.FORMATS)}."]}
+            )
+        fields = rows.requested_fields(request)
+        queryset = self.filter_queryset(self.get_queryset())
+        # Rows stream after the request's replica routing ends (tickets.replicas)
+        queryset = queryset.using(queryset.db)
+        return export.export_response(queryset, fmt, fields)
+
+    @transaction.atomic
+    def partial_update(self, request, *args, **kwargs):
+        return super().partial_update(request, *args, **kwargs)
+
     @action(detail=False, methods=["get"], url_path="stats")
     def stats(self, request):
         """
-        Return aggregated ticket statistics using DB-level aggregation only.
-        No Python loops for aggregation.
+        Return aggregated ticket statistics from the TicketStat rollup table.
+        The rollups are maintained on every ticket write (see tickets.rollups),
+        so this is a single aggregate over days x buckets, not over tickets.
+        ``?from=&to=&bucket=`` restricts it to a window and adds a time
+        series (tickets.windows).
         """
-        qs = Ticket.objects.all()
+        if windows.requested(request):
+            window = windows.requested_window(request)
+            if window.relative:
+                # Cached under its query string it would freeze at this "now"
+                return Response(windows.summary(window))
+            return self.cached_response(
+                "stats", lambda: Response(windows.summary(window))
+            )
+        return self.cached_response("stats", lambda: Response(rollups.summary()))
 
-        # Total and open counts
-        totals = qs.aggregate(
-            total_tickets=Count("id"),
-            open_tickets=Count("id", filter=Q(status="open")),
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path="events",
+        renderer_classes=[events.EventStreamRenderer],
+    )
+    def event_stream(self, request):
+        """
+        Ticket changes after the client's ``Last-Event-ID`` as Server-Sent
+        Events. Under WSGI the response closes after the pending events and
+        the ``retry`` hint sets how soon EventSource asks again; the ASGI view
+        (tickets.async_views) keeps the stream open instead.
+        """
+        response = HttpResponse(
+            events.poll_response_body(request), content_type="text/event-stream"
         )
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"
+        return response
 
-        # Average tickets per day using TruncDate
-        daily_counts = (
-            qs.annotate(date=TruncDate("created_at"))
-            .values("date")
-            .annotate(count=Count("id"))
-            .aggregate(avg_tickets_per_day=Avg("count"))
-        )
+    @action(detail=False, methods=["post"], url_path="classify")
+    def classify(self, request):
+        """Classify a ticket description using the LLM service."""
+        serializer = ClassifyRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        description = serializer.validated_data["description"]
+        if request.query_params.get("async") in ("1", "true"):
+            return self._enqueue_classification(request, description)
+        result = classify_ticket(description)
+        return Response(result, status=status.HTTP_200_OK)
 
-        # Priority breakdown — single query with conditional counts
-        priority_breakdown = qs.aggregate(
-            **{
-                p.value: Count("id", filter=Q(priority=p.value))
-                for p in Ticket.Priority
-            }
+    def _enqueue_classification(self, request, description):
+        """Queue the LLM call for run_classification_worker; 202 until done."""
+        job, _ = jobs.enqueue(description)
+        data = ClassificationJobSerializer(job).data
+        data["status_url"] = request.build_absolute_uri(
+            f"{request.path.rstrip('/')}/jobs/{job.id}/"
         )
+        if job.status == job.Status.DONE:
+            return Response(data, status=status.HTTP_200_OK)
+        return Response(data, status=status.HTTP_202_ACCEPTED)
 
-        # Category breakdown — single query with conditional counts
-        category_breakdown = qs.aggregate(
-            **{
-                c.value: Count("id", filter=Q(category=c.value))
-                for c in Ticket.Category
-            }
+    @action(
+        detail=False, methods=["get"], url_path=r"classify/jobs/(?P<job_id>[0-9a-f-]+)"
+    )
+    def classify_job(self, request, job_id=None):
+        """
+        Status of an asynchronous classification. ?wait=N holds the request
+        until the job is done, for at most CLASSIFY_JOBS['SYNC_MAX_WAIT']
+        seconds here (the async view waits up to MAX_WAIT). A job still in
+        flight is returned with Retry-After.
+        """
+        wait = requested_wait(request)
+        try:
+            job = jobs.wait_for(job_id, wait) if wait > 0 else jobs.get_job(job_id)
+        except DjangoValidationError:
+            job = None
+        if job is None:
+            raise NotFound(UNKNOWN_JOB)
+        return Response(
+            ClassificationJobSerializer(job).data, headers=jobs.poll_headers(job)
         )
 
+    @action(detail=False, methods=["post"], url_path="classify/batch")
+    def classify_batch(self, request):
+        """Classify many descriptions; results are returned in input order."""
+        serializer = ClassifyBatchRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        results = classify_tickets(serializer.validated_data["descriptions"])
+        return Response({"results": results}, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=["get"], url_path="cache")
+    def cache_stats(self, request):
+        """Hit/miss counters of this worker's caches, classifier tiers and connection pools."""
         return Response(
             {
-                "total_tickets": totals["total_tickets"],
-                "open_tickets": totals["open_tickets"],
-                "avg_tickets_per_day": round(
-                    daily_counts["avg_tickets_per_day"] or 0.0, 2
-                ),
-                "priority_breakdown": priority_breakdown,
-                "category_breakdown": category_breakdown,
+                "pid": os.getpid(),
+                "classification": classification_cache.get_cache().stats(),
+                "responses": response_cache.stats(),
+                "classifier_tiers": tier_stats(),
+                "connection_pools": pool.stats(),
             }
         )
 
-    @action(detail=False, methods=["post"], url_path="classify")
-    def classify(self, request):
-        """Classify a ticket description using the LLM service."""
-        serializer = ClassifyRequestSerializer(data=request.data)
-        serializer.is_valid(raise_exception=True)
-        result = classify_ticket(serializer.validated_data["description"])
-        return Response(result, status=status.HTTP_200_OK)
+
+def metrics_view(request):
+    """This worker's request and LLM histograms in Prometheus text format."""
+    if not metrics.enabled():
+        raise Http404
+    return HttpResponse(metrics.render(), content_type=metrics.CONTENT_TYPE)
@@ -0,0 +1,255 @@
+"""Time-windowed ticket stats: ``GET /api/tickets/stats/?from=&to=&bucket=``.
+
+``requested_window`` parses the parameters. ``from``/``to`` take an ISO 8601
+date or datetime, or a duration back from now (``90m``, ``24h``, ``7d``,
+``4w``); ``to`` defaults to now and ``from`` to a span that suits the
+bucket. ``bucket`` (``hour``, ``day``, ``week``, ``month``) adds a
+zero-filled ``series`` of counts by category, priority and status.
+
+``summary`` answers a window in at most two grouped queries:
+
+- whole local days come from the ``TicketStat`` rollups (one row per day
+  and bucket, however many tickets), grouped by day, week or month,
+- partial days at either edge, and hourly series, are counted on the
+  tickets of both tiers (the ``AnyTicket`` view, see ``tickets.archive``).
+  Each table's ``(created_at, category, priority, status)`` index covers
+  that query, so it is a range scan that never reads ticket rows.
+
+Counts are by creation time and current status: ``open_tickets`` is the
+number of tickets created in the window that are open now.
+"""
+import re
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate, TruncHour, TruncMonth, TruncWeek
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.exceptions import ValidationError
+
+from .export import format_datetime
+from .models import AnyTicket, Ticket, TicketStat
+
+BUCKETS = ("hour", "day", "week", "month")
+DEFAULT_SPANS = {
+    None: timedelta(days=30),
+    "hour": timedelta(days=1),
+    "day": timedelta(days=30),
+    "week": timedelta(weeks=12),
+    "month": timedelta(days=365),
+}
+PARAMS = ("from", "to", "bucket")
+_DURATION_RE = re.compile(r"^(\d+)([mhdw])$")
+_UNITS = {"m": "minutes", "h": "hours", "d": "days", "w": "weeks"}
+_ROLLUP_TRUNC = {"day": F("day"), "week": TruncWeek("day"), "month": TruncMonth("day")}
+GROUP_FIELDS = ("category", "priority", "status")
+
+
+@dataclass(frozen=True)
+class Window:
+    start: datetime
+    end: datetime
+    bucket: str = None
+    # Resolved against the current time (a duration, or no ``to``): the same
+    # query string names a different window on the next request
+    relative: bool = False
+
+
+def _parse_bound(name, raw, now):
+    match = _DURATION_RE.match(raw)
+    if match:
+        return now - timedelta(**{_UNITS[match[2]]: int(match[1])})
+    try:
+        value = parse_datetime(raw)
+        if value is None and (day := parse_date(raw)) is not None:
+            value = datetime.combine(day, time.min)
+    except ValueError:
+        value = None
+    if value is None:
+        raise ValidationError(
+            {name: ["Use an ISO 8601 date or datetime, or a duration such as 24h or 7d."]}
+        )
+    if timezone.is_naive(value):
+        value = timezone.make_aware(value)
+    return value
+
+
+def requested(request) -> bool:
+    return any(request.query_params.get(name) for name in PARAMS)
+
+
+def requested_window(request) -> Window:
+    """The window named by ``?from=&to=&bucket=``; raises ValidationError."""
+    params = request.query_params
+    now = timezone.now()
+    bucket = params.get("bucket") or None
+    if bucket is not None and bucket not in BUCKETS:
+        raise ValidationError({"bucket": [f"Choose one of: {', '.join(BUCKETS)}."]})
+    end = _parse_bound("to", params["to"], now) if params.get("to") else now
+    if params.get("from"):
+        start = _parse_bound("from", params["from"], now)
+    else:
+        start = end - DEFAULT_SPANS[bucket]
+    if start >= end:
+        raise ValidationError({"from": ["Must be earlier than to."]})
+    relative = not params.get("to") or any(
+        _DURATION_RE.match(params.get(name) or "") for name in ("from", "to")
+    )
+    window = Window(start, end, bucket, relative)
+    if bucket and len(bucket_starts(window)) > settings.TICKET_STATS_MAX_BUCKETS:
+        raise ValidationError(
+            {
+                "bucket": [
+                    f"More than {settings.TICKET_STATS_MAX_BUCKETS} {bucket} buckets; "
+                    "narrow the window or use a coarser bucket."
+                ]
+            }
+        )
+    return window
+
+
+def _midnight(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def _bucket_of(value, bucket):
+    """The start of the ``bucket`` holding ``value`` (a local date or hour)."""
+    if bucket == "week":
+        return value - timedelta(days=value.weekday())
+    if bucket == "month":
+        return value.replace(day=1)
+    return value
+
+
+def bucket_starts(window) -> list:
+    """Every bucket start in the window, oldest first."""
+    if window.bucket == "hour":
+        current = timezone.localtime(window.start).replace(minute=0, second=0, microsecond=0)
+        step = timedelta(hours=1)
+        starts = []
+        while current < window.end:
+            starts.append(current)
+            # Step in UTC so DST transitions neither repeat nor skip an hour
+            current = timezone.localtime(current + step)
+        return starts
+
+    last = timezone.localtime(window.end - timedelta(microseconds=1)).date()
+    current = _bucket_of(timezone.localtime(window.start).date(), window.bucket)
+    starts = []
+    while current <= last:
+        starts.append(current)
+        if window.bucket == "week":
+            current += timedelta(weeks=1)
+        elif window.bucket == "month":
+            current = (current + timedelta(days=32)).replace(day=1)
+        else:
+            current += timedelta(days=1)
+    return starts
+
+
+def counts(window) -> Counter:
+    """Ticket counts per ``(bucket start, category, priority, status)``."""
+    bucket = window.bucket or "day"
+    result = Counter()
+    if bucket == "hour":
+        edges = Q(created_at__gte=window.start, created_at__lt=window.end)
+        _add_ticket_counts(result, edges, TruncHour("created_at"), bucket)
+        return result
+
+    # Whole local days from the rollups, partial days from the ticket table
+    first = timezone.localtime(window.start).date()
+    if _midnight(first) < window.start:
+        first += timedelta(days=1)
+    last = timezone.localtime(window.end).date()  # exclusive
+    if first < last:
+        rows = (
+            TicketStat.objects.filter(day__gte=first, day__lt=last, count__gt=0)
+            .annotate(bucket=_ROLLUP_TRUNC[bucket])
+            .values("bucket", *GROUP_FIELDS)
+            .annotate(n=Sum("count"))
+            .order_by()
+        )
+        for row in rows:
+            result[(row["bucket"], *(row[f] for f in GROUP_FIELDS))] += row["n"]
+        edges = Q(created_at__gte=window.start, created_at__lt=_midnight(first)) | Q(
+            created_at__gte=_midnight(last), created_at__lt=window.end
+        )
+    else:
+        edges = Q(created_at__gte=window.start, created_at__lt=window.end)
+    _add_ticket_counts(result, edges, TruncDate("created_at"), bucket)
+    return result
+
+
+def _add_ticket_counts(result, condition, trunc, bucket):
+    rows = (
+        AnyTicket.objects.filter(condition)
+        .annotate(bucket=trunc)
+        .values("bucket", *GROUP_FIELDS)
+        .annotate(n=Count("id"))
+        .order_by()
+    )
+    for row in rows:
+        start = row["bucket"]
+        if bucket == "hour":
+            start = timezone.localtime(start)
+        else:
+            start = _bucket_of(start, bucket)
+        result[(start, *(row[f] for f in GROUP_FIELDS))] += row["n"]
+
+
+def _breakdowns(items):
+    totals = {
+        "category": Counter({c: 0 for c in Ticket.Category.values}),
+        "priority": Counter({p: 0 for p in Ticket.Priority.values}),
+        "status": Counter({s: 0 for s in Ticket.Status.values}),
+    }
+    for (_start, category, priority, status), n in items:
+        totals["category"][category] += n
+        totals["priority"][priority] += n
+        totals["status"][status] += n
+    return {name: dict(counter) for name, counter in totals.items()}
+
+
+def _format_start(start):
+    return format_datetime(start) if isinstance(start, datetime) else start.isoformat()
+
+
+def summary(window) -> dict:
+    """The stats payload for ``window``, plus ``series`` when bucketed."""
+    found = counts(window)
+    overall = _breakdowns(found.items())
+    total = sum(found.values())
+    days = (window.end - window.start) / timedelta(days=1)
+    result = {
+        "total_tickets": total,
+        "open_tickets": overall["status"][Ticket.Status.OPEN],
+        "avg_tickets_per_day": round(total / days, 2),
+        "priority_breakdown": overall["priority"],
+        "category_breakdown": overall["category"],
+        "status_breakdown": overall["status"],
+        "window": {
+            "from": format_datetime(timezone.localtime(window.start)),
+            "to": format_datetime(timezone.localtime(window.end)),
+            "bucket": window.bucket,
+        },
+    }
+    if window.bucket:
+        by_start = {}
+        for key, n in found.items():
+            by_start.setdefault(key[0], []).append((key, n))
+        series = []
+        for start in bucket_starts(window):
+            items = by_start.get(start, [])
+            breakdowns = _breakdowns(items)
+            series.append(
+                {
+                    "start": _format_start(start),
+                    "total": sum(n for _key, n in items),
+                    **breakdowns,
+                }
+            )
+        result["series"] = series
+    return result
@@ -2,7 +2,7 @@ import axios from "axios";
 
 // In production (served via Nginx), API calls are proxied through /api/
 // In development, point directly to Django backend
-const API_BASE = process.env.REACT_APP_API_URL || "";
+export const API_BASE = process.env.REACT_APP_API_URL || "";
 
 const api = axios.create({
   baseURL: `${API_BASE}/api`,
@@ -19,7 +19,9 @@ export const fetchTickets = (params = {}) =>
 export const updateTicket = (id, data) =>
   api.patch(`/tickets/${id}/`, data);
 
-export const fetchStats = () => api.get("/tickets/stats/");
+export const bulkUpdateTickets = (data) => api.patch("/tickets/bulk/", data);
+
+export const fetchStats = (params = {}) => api.get("/tickets/stats/", { params });
 
 export const classifyTicket = (description) =>
   api.post("/tickets/classify/", { description });
@@ -1,31 +1,113 @@
 import React, { useState, useEffect, useCallback } from "react";
 import { fetchStats } from "../api";
+import { subscribe } from "../live";
+
+function addCounts(current = {}, delta = {}) {
+  const next = { ...current };
+  Object.entries(delta).forEach(([key, n]) => {
+    next[key] = (next[key] || 0) + n;
+  });
+  return next;
+}
+
+// Apply one event's stats delta (see rollups.summary_delta on the server).
+// active_days only changes on a ticket's first day, which the next refetch
+// picks up.
+function applyDelta(stats, delta) {
+  const total = stats.total_tickets + (delta.total_tickets || 0);
+  return {
+    ...stats,
+    total_tickets: total,
+    open_tickets: stats.open_tickets + (delta.open_tickets || 0),
+    avg_tickets_per_day: stats.active_days
+      ? Math.round((total / stats.active_days) * 100) / 100
+      : stats.avg_tickets_per_day,
+    priority_breakdown: addCounts(stats.priority_breakdown, delta.priority_breakdown),
+    category_breakdown: addCounts(stats.category_breakdown, delta.category_breakdown),
+  };
+}
+
+// Windows for ?from=&to=&bucket= (see tickets/windows.py on the server).
+// "all" is the all-time summary, the only one live deltas apply to.
+const WINDOWS = {
+  all: { label: "All time", params: {} },
+  "24h": { label: "Last 24 hours", params: { from: "24h", bucket: "hour" } },
+  "7d": { label: "Last 7 days", params: { from: "7d", bucket: "day" } },
+  "30d": { label: "Last 30 days", params: { from: "30d", bucket: "day" } },
+  "12w": { label: "Last 12 weeks", params: { from: "12w", bucket: "week" } },
+};
+
+function formatBucket(start, bucket) {
+  const date = new Date(start);
+  if (bucket === "hour") {
+    return date.toLocaleTimeString([], { hour: "2-digit", minute: "2-digit" });
+  }
+  return date.toLocaleDateString([], { month: "short", day: "numeric" });
+}
 
 export default function StatsDashboard({ refreshKey }) {
   const [stats, setStats] = useState(null);
   const [loading, setLoading] = useState(true);
+  const [windowKey, setWindowKey] = useState("all");
 
-  const load = useCallback(async () => {
-    setLoading(true);
-    try {
-      const { data } = await fetchStats();
-      setStats(data);
-    } catch {
-      setStats(null);
-    } finally {
-      setLoading(false);
-    }
-  }, [refreshKey]);
+  const load = useCallback(
+    async ({ quiet = false } = {}) => {
+      if (!quiet) setLoading(true);
+      try {
+        const { data } = await fetchStats(WINDOWS[windowKey].params);
+        setStats(data);
+      } catch {
+        setStats(null);
+      } finally {
+        setLoading(false);
+      }
+    },
+    [refreshKey, windowKey]
+  );
 
   useEffect(() => {
     load();
   }, [load]);
 
-  if (loading) return <div className="card"><p className="loading-text">⏳ Loading stats…</p></div>;
-  if (!stats) return <div className="card"><p className="empty-text">Unable to load statistics.</p></div>;
+  useEffect(
+    () =>
+      subscribe((kind, event) => {
+        if (kind === "reset") {
+          load();
+        } else if (windowKey !== "all") {
+          // Window counts go by creation time and current status, which a
+          // delta does not carry: refetch the window instead
+          load({ quiet: true });
+        } else if (event.stats) {
+          setStats((current) => current && applyDelta(current, event.stats));
+        }
+      }),
+    [load, windowKey]
+  );
+
+  const windowSelect = (
+    <div className="stats-window">
+      <select
+        aria-label="Time window"
+        value={windowKey}
+        onChange={(e) => setWindowKey(e.target.value)}
+      >
+        {Object.entries(WINDOWS).map(([key, w]) => (
+          <option key={key} value={key}>
+            {w.label}
+          </option>
+        ))}
+      </select>
+    </div>
+  );
+
+  if (loading) return <div className="card">{windowSelect}<p className="loading-text">⏳ Loading stats…</p></div>;
+  if (!stats) return <div className="card">{windowSelect}<p className="empty-text">Unable to load statistics.</p></div>;
 
   const maxPriority = Math.max(1, ...Object.values(stats.priority_breakdown || {}));
   const maxCategory = Math.max(1, ...Object.values(stats.category_breakdown || {}));
+  const series = stats.series || [];
+  const maxSeries = Math.max(1, ...series.map((point) => point.total));
 
   const priorityColors = {
     critical: "linear-gradient(90deg, #dc2626, #ef4444)",
@@ -38,6 +120,8 @@ export default function StatsDashboard({ refreshKey }) {
     <div className="card">
       <h2>Dashboard</h2>
 
+      {windowSelect}
+
       <div className="stats-grid">
         <div className="stat-card">
           <div className="stat-value">{stats.total_tickets}</div>
@@ -53,6 +137,31 @@ export default function StatsDashboard({ refreshKey }) {
         </div>
       </div>
 
+      {/* Tickets per bucket in the window */}
+      {series.length > 0 && (
+        <div className="breakdown-section">
+          <h4>Tickets per {stats.window.bucket}</h4>
+          <div className="series-chart">
+            {series.map((point) => (
+              <div
+                className="series-bar"
+                key={point.start}
+                title={`${formatBucket(point.start, stats.window.bucket)}: ${point.total}`}
+              >
+                <div
+                  className="bar-fill"
+                  style={{ height: `${(point.total / maxSeries) * 100}%` }}
+                />
+              </div>
+            ))}
+          </div>
+          <div className="series-axis">
+            <span>{formatBucket(series[0].start, stats.window.bucket)}</span>
+            <span>{formatBucket(series[series.length - 1].start, stats.window.bucket)}</span>
+          </div>
+        </div>
+      )}
+
       {/* Priority Breakdown */}
       <div className="breakdown-section">
         <h4>Priority Breakdown</h4>
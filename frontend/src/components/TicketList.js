@@ -1,5 +1,6 @@
 import React, { useState, useEffect, useCallback, useRef } from "react";
-import { fetchTickets, updateTicket } from "../api";
+import { bulkUpdateTickets, fetchTickets, updateTicket } from "../api";
+import { subscribe } from "../live";
 
 const CATEGORIES = ["", "billing", "technical", "account", "general"];
 const PRIORITIES = ["", "low", "medium", "high", "critical"];
@@ -44,6 +45,9 @@ export default function TicketList({ refreshKey }) {
   const [selectedTicket, setSelectedTicket] = useState(null);
   const [newStatus, setNewStatus] = useState("");
   const [updating, setUpdating] = useState(false);
+  // Multi-select triage: ids ticked on this page, set in one bulk request
+  const [checkedIds, setCheckedIds] = useState([]);
+  const [bulkStatus, setBulkStatus] = useState("resolved");
 
   const load = useCallback(async () => {
     setLoading(true);
@@ -77,11 +81,42 @@ export default function TicketList({ refreshKey }) {
     load();
   }, [load]);
 
+  // Live updates: patch changed rows in place; anything that can move rows
+  // between pages (new, deleted, bulk loads, reset) reloads the page, at most
+  // once per second.
+  const reloadTimerRef = useRef(null);
+  useEffect(() => {
+    const unsubscribe = subscribe((kind, event) => {
+      if (kind === "updated" && event.ticket) {
+        setTickets((current) =>
+          current.map((t) => (t.id === event.ticket.id ? event.ticket : t))
+        );
+        return;
+      }
+      if (!reloadTimerRef.current) {
+        reloadTimerRef.current = setTimeout(() => {
+          reloadTimerRef.current = null;
+          load();
+        }, 1000);
+      }
+    });
+    return () => {
+      unsubscribe();
+      clearTimeout(reloadTimerRef.current);
+      reloadTimerRef.current = null;
+    };
+  }, [load]);
+
   // Reset to page 1 when filters change
   useEffect(() => {
     setPage(1);
   }, [filters.category, filters.priority, filters.status, debouncedSearch]);
 
+  // A selection only covers the rows on screen
+  useEffect(() => {
+    setCheckedIds([]);
+  }, [filters.category, filters.priority, filters.status, debouncedSearch, page]);
+
   const handleFilterChange = (e) => {
     const { name, value } = e.target;
     if (name === "search") {
@@ -118,6 +153,25 @@ export default function TicketList({ refreshKey }) {
     }
   };
 
+  const toggleChecked = (id) => {
+    setCheckedIds((current) =>
+      current.includes(id) ? current.filter((c) => c !== id) : [...current, id]
+    );
+  };
+
+  const handleBulkStatusUpdate = async () => {
+    setUpdating(true);
+    try {
+      await bulkUpdateTickets({ ids: checkedIds, status: bulkStatus });
+      setCheckedIds([]);
+      load();
+    } catch {
+      // Handle silently
+    } finally {
+      setUpdating(false);
+    }
+  };
+
   return (
     <div className="card">
       <h2>Tickets</h2>
@@ -171,6 +225,34 @@ export default function TicketList({ refreshKey }) {
         />
       </div>
 
+      {/* Bulk triage */}
+      {checkedIds.length > 0 && (
+        <div className="bulk-bar">
+          <span>{checkedIds.length} selected</span>
+          <select
+            aria-label="New status"
+            value={bulkStatus}
+            onChange={(e) => setBulkStatus(e.target.value)}
+          >
+            {STATUS_OPTIONS.map((s) => (
+              <option key={s} value={s}>
+                {STATUS_LABELS[s]}
+              </option>
+            ))}
+          </select>
+          <button
+            className="btn btn-primary"
+            onClick={handleBulkStatusUpdate}
+            disabled={updating}
+          >
+            {updating ? "Saving…" : "Set status"}
+          </button>
+          <button className="btn btn-secondary" onClick={() => setCheckedIds([])}>
+            Clear
+          </button>
+        </div>
+      )}
+
       {/* Ticket List */}
       {loading ? (
         <p className="loading-text">⏳ Loading tickets…</p>
@@ -187,6 +269,14 @@ export default function TicketList({ refreshKey }) {
               >
                 <div className="ticket-item-header">
                   <span className="ticket-title">{t.title}</span>
+                  <input
+                    type="checkbox"
+                    className="ticket-select"
+                    aria-label={`Select ${t.title}`}
+                    checked={checkedIds.includes(t.id)}
+                    onClick={(e) => e.stopPropagation()}
+                    onChange={() => toggleChecked(t.id)}
+                  />
                 </div>
                 <p className="ticket-description">{truncate(t.description)}</p>
                 <div className="ticket-meta">
@@ -0,0 +1,40 @@
+import { API_BASE } from "./api";
+
+// One EventSource for the whole app, opened on the first subscription.
+// EventSource reconnects by itself and sends Last-Event-ID, so the server
+// replays anything missed; a "reset" means it could not and we must refetch.
+const KINDS = [
+  "created",
+  "updated",
+  "deleted",
+  "bulk_created",
+  "bulk_updated",
+  "reset",
+];
+
+const listeners = new Set();
+let source = null;
+
+function dispatch(kind, message) {
+  const event = message.data ? JSON.parse(message.data) : {};
+  listeners.forEach((listener) => listener(kind, event));
+}
+
+function open() {
+  source = new EventSource(`${API_BASE}/api/tickets/events/`);
+  KINDS.forEach((kind) =>
+    source.addEventListener(kind, (message) => dispatch(kind, message))
+  );
+}
+
+export function subscribe(listener) {
+  listeners.add(listener);
+  if (!source && typeof EventSource !== "undefined") open();
+  return () => {
+    listeners.delete(listener);
+    if (listeners.size === 0 && source) {
+      source.close();
+      source = null;
+    }
+  };
+}